@@ -0,0 +1,247 @@
+# alerts.py
+"""
+Alarm motoru (/izle): abonelikler bar kapanışında toplu değerlendirilir. Kurallar tek bir
+kayıt dizisinde (RULE_DTYPE) tutulur; interval → sembol → satır dizini sayesinde kapanışta
+yalnızca abone olunan semboller bir kez analiz edilir (zamanlayıcının evren taramasıyla
+paylaşılır) ve o interval'in bütün kuralları tek NumPy geçişinde değerlendirilir.
+
+Histerezis: tetiklenen kural, değer eşiğin `band` kadar gerisine dönmeden yeniden
+tetiklenmez; aynı bar kapanışı iki kez işlenirse ikinci kez bildirilmez.
+"""
+import itertools
+import json
+import logging
+import os
+import re
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from analyzers.signal import Signal
+from analyzers.targets import normalize_targets, normalize_targets_arrays
+from utils import normalize_bist
+
+logger = logging.getLogger(__name__)
+
+SCORE, RSI, PATTERN, TARGET = range(4)
+
+# alarm dilimi → analiz penceresi (ön ayarlarla aynı; zamanlayıcı taramasıyla paylaşılsın)
+PERIODS = {"15m": "14d", "30m": "30d", "60m": "60d", "90m": "90d", "1d": "180d"}
+DEFAULT_INTERVAL = "60m"
+
+MAX_PER_CHAT = int(os.getenv("ALERT_MAX_PER_CHAT", "50"))
+# yeniden kurulma bandı: skor 75'i geçip tetiklenen kural skor 70'in altına inmeden kurulmaz
+BANDS = {SCORE: float(os.getenv("ALERT_BAND_SCORE", "5")), RSI: float(os.getenv("ALERT_BAND_RSI", "2")),
+         PATTERN: 0.0, TARGET: 0.0}
+
+RULE_DTYPE = np.dtype([
+    ("id", "i8"), ("chat", "i8"), ("ticker", "U16"), ("interval", "U8"),
+    ("kind", "i1"), ("sign", "i1"),   # sign: 1 → değer ≥ eşik, -1 → değer ≤ eşik
+    ("level", "f8"), ("band", "f8"),
+    ("armed", "i1"),                  # 1 kurulu, 0 tetiklendi (band bekleniyor), -1 ilk gözlem bekleniyor
+    ("ref", "f8"), ("t1", "f8"), ("stop", "f8"),   # hedef kuralı: ilk gözlemdeki fiyat/H1/stop
+    ("fired", "i8"),                  # son tetiklenen bar kapanışı (epoch sn)
+])
+
+_COND_RE = re.compile(r"^(skor|score|rsi)(>=|≥|=>|<=|≤|=<|>|<)(\d+(?:\.\d+)?)$")
+USAGE = ("Kullanım: /izle TICKER koşul [interval]\n"
+         "Koşullar: skor>=75 | skor<=40 | rsi>50 (yukarı kesişim) | rsi<50 | formasyon | hedef (H1 ya da stop)\n"
+         f"Interval: {', '.join(PERIODS)} (varsayılan {DEFAULT_INTERVAL})")
+
+def parse_rule(tokens: list[str]) -> tuple[int, int, float, str]:
+    """["skor", ">=", "75", "1d"] → (kind, sign, level, interval). Geçersiz → ValueError."""
+    interval, cond = DEFAULT_INTERVAL, []
+    for tok in tokens:
+        if tok.lower() in PERIODS:
+            interval = tok.lower()
+        else:
+            cond.append(tok.lower())
+    text = "".join(cond)
+    m = _COND_RE.match(text)
+    if m:
+        kind = SCORE if m.group(1) in ("skor", "score") else RSI
+        return kind, 1 if ">" in m.group(2) or "≥" in m.group(2) else -1, float(m.group(3)), interval
+    if text.startswith(("formasyon", "pattern", "kırılım", "kirilim", "breakout")):
+        return PATTERN, 1, 0.5, interval
+    if text.startswith(("hedef", "t1", "stop")):
+        return TARGET, 1, 0.0, interval
+    raise ValueError(f"Anlaşılmayan koşul: {' '.join(cond) or '(boş)'}")
+
+def rule_text(r) -> str:
+    op = "≥" if r["sign"] > 0 else "≤"
+    kind = int(r["kind"])
+    if kind == SCORE:
+        return f"skor {op} {r['level']:.0f}"
+    if kind == RSI:
+        return f"RSI {r['level']:.0f} {'yukarı' if r['sign'] > 0 else 'aşağı'} kesişim"
+    if kind == PATTERN:
+        return "formasyon kırılımı"
+    return "H1 ya da stop"
+
+class AlertBook:
+    """
+    Kurallar + (interval, sembol) dizini. Değişiklikler JSON dosyasına yazılır (geçici
+    dosya + os.replace); tetikleme durumu (armed/fired/hedefler) da saklandığından yeniden
+    başlatmada aynı kapanış yeniden bildirilmez.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.rules = np.zeros(0, dtype=RULE_DTYPE)
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            rows = [tuple(r[f] for f in RULE_DTYPE.names) for r in raw.get("rules", [])]
+            if rows:
+                self.rules = np.array(rows, dtype=RULE_DTYPE)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Alarmlar okunamadı ({self.path}): {e}")
+        self._ids = itertools.count(int(self.rules["id"].max()) + 1 if len(self.rules) else 1)
+        self._reindex()
+
+    def _reindex(self) -> None:
+        index: dict[str, dict[str, list[int]]] = {}
+        for i, (itv, t) in enumerate(zip(self.rules["interval"].tolist(), self.rules["ticker"].tolist())):
+            index.setdefault(itv, {}).setdefault(t, []).append(i)
+        self._index = {itv: {t: np.array(p) for t, p in by_t.items()} for itv, by_t in index.items()}
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        rules = [dict(zip(RULE_DTYPE.names, r)) for r in self.rules.tolist()]
+        tmp.write_text(json.dumps({"rules": rules}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def intervals(self) -> list[str]:
+        return list(self._index)
+
+    def tickers(self, interval: str) -> list[str]:
+        return list(self._index.get(interval, {}))
+
+    def rsi_only(self, interval: str) -> set[str]:
+        """Bu interval'de yalnızca RSI kuralı olan semboller (formasyon/skor gerekmez)."""
+        out = set()
+        for t, p in self._index.get(interval, {}).items():
+            if (self.rules["kind"][p] == RSI).all():
+                out.add(t)
+        return out
+
+    def spec(self, interval: str) -> tuple[str, str]:
+        return interval, PERIODS[interval]
+
+    def for_chat(self, chat_id: int) -> np.ndarray:
+        return self.rules[self.rules["chat"] == chat_id]
+
+    def add(self, chat_id: int, ticker: str, kind: int, sign: int, level: float, interval: str) -> tuple[int, bool]:
+        """Dönüş: (kural id, yeni mi). Aynı kural varsa onun id'si; sohbet sınırı dolduysa ValueError."""
+        ticker = normalize_bist(ticker)
+        mine = self.for_chat(chat_id)
+        same = mine[(mine["ticker"] == ticker) & (mine["interval"] == interval) & (mine["kind"] == kind)
+                    & (mine["sign"] == sign) & (mine["level"] == level)]
+        if len(same):
+            return int(same["id"][0]), False
+        if len(mine) >= MAX_PER_CHAT:
+            raise ValueError(f"Bu sohbette en fazla {MAX_PER_CHAT} alarm olabilir.")
+        # kesişim ve hedef kuralları ilk gözlemde kurulur (o anki durum bildirilmez)
+        armed = -1 if kind in (RSI, TARGET) else 1
+        row = np.array([(next(self._ids), chat_id, ticker, interval, kind, sign, level, BANDS[kind],
+                         armed, np.nan, np.nan, np.nan, 0)], dtype=RULE_DTYPE)
+        self.rules = np.concatenate([self.rules, row])
+        self._reindex(); self._save()
+        return int(row["id"][0]), True
+
+    def remove(self, chat_id: int, rule_id: int | None = None) -> int:
+        """rule_id None → sohbetin tüm alarmları. Dönüş: silinen kural sayısı."""
+        drop = self.rules["chat"] == chat_id
+        if rule_id is not None:
+            drop &= self.rules["id"] == rule_id
+        n = int(drop.sum())
+        if n:
+            self.rules = self.rules[~drop]
+            self._reindex(); self._save()
+        return n
+
+    def evaluate(self, interval: str, records: np.ndarray, asof: pd.Timestamp) -> dict[int, list[str]]:
+        """
+        records: SIGNAL_DTYPE (bu interval'in kapanışındaki özetler). O interval'in bütün
+        kuralları birlikte değerlendirilir. Dönüş: sohbet → bildirim metinleri (HTML).
+        """
+        by_t = self._index.get(interval)
+        if not by_t or not len(records):
+            return {}
+        pos = np.concatenate(list(by_t.values()))
+        r = self.rules[pos]
+        order = np.argsort(records["ticker"])
+        keys = records["ticker"][order]
+        j = np.minimum(np.searchsorted(keys, r["ticker"]), len(keys) - 1)
+        found = keys[j] == r["ticker"]
+        rec = records[order[j]]
+
+        kind, sign = r["kind"], r["sign"].astype("f8")
+        price = rec["price"]
+        x = np.select([kind == SCORE, kind == RSI, kind == PATTERN],
+                      [rec["score"], rec["rsi"], (rec["pattern"] >= 0).astype("f8")], price)
+        with np.errstate(invalid="ignore"):
+            above = sign * x >= sign * r["level"]
+            below_band = sign * x < sign * r["level"] - r["band"]
+
+        # ilk gözlem: kesişim kuralı eşiğin hangi yanında olduğunu öğrenir, hedef kuralı
+        # normalize_targets ile H1/stop'u sabitler
+        first = found & (r["armed"] < 0) & ~np.isnan(x)
+        tgt = first & (kind == TARGET)
+        if tgt.any():
+            t1, _, stop = normalize_targets_arrays(price[tgt], rec["atr"][tgt], rec["bias"][tgt],
+                                                   rec["t1"][tgt], rec["t2"][tgt], rec["stop"][tgt])
+            r["ref"][tgt], r["t1"][tgt], r["stop"][tgt] = price[tgt], t1, stop
+        r["armed"][first] = np.where(above[first] & (kind[first] != TARGET), 0, 1)
+
+        # hedef/stop bar içinde görülür (backtest.simulate ile aynı: yüksek/düşük fiyat)
+        hi = np.where(np.isnan(rec["high"]), price, rec["high"])
+        lo = np.where(np.isnan(rec["low"]), price, rec["low"])
+        with np.errstate(invalid="ignore"):
+            up = r["t1"] >= r["ref"]
+            hit_target = (np.where(up, hi >= r["t1"], lo <= r["t1"])
+                          | np.where(up, lo <= r["stop"], hi >= r["stop"]))
+        hit = np.where(kind == TARGET, hit_target, above)
+        stamp = int(asof.timestamp())
+        fire = found & ~first & (r["armed"] == 1) & hit & (r["fired"] < stamp)
+        rearm = found & (r["armed"] == 0) & (kind != TARGET) & below_band
+        r["armed"][fire] = 0
+        r["armed"][rearm] = 1
+        r["fired"][fire] = stamp
+        self.rules[pos] = r
+
+        out: dict[int, list[str]] = {}
+        for k in np.flatnonzero(fire):
+            out.setdefault(int(r["chat"][k]), []).append(self._text(r[k], rec[k], interval))
+        done = np.zeros(len(self.rules), dtype=bool)
+        done[pos[fire & (kind == TARGET)]] = True   # hedef kuralı tek seferlik
+        if done.any():
+            self.rules = self.rules[~done]
+            self._reindex()
+        if first.any() or fire.any() or rearm.any():
+            self._save()
+        return out
+
+    @staticmethod
+    def _text(r, rec, interval: str) -> str:
+        s = normalize_targets(Signal.from_record(rec))
+        name = str(r["ticker"]).removesuffix(".IS")
+        head = f"🔔 <b>{name}</b> ({interval}) — {rule_text(r)} [#{r['id']}]"
+        if r["kind"] == TARGET:
+            hi = s.price if np.isnan(s.high) else s.high
+            lo = s.price if np.isnan(s.low) else s.low
+            up = r["t1"] >= r["ref"]
+            # aynı barda ikisi de görüldüyse stop sayılır (backtest ile aynı, muhafazakâr)
+            stopped = (lo <= r["stop"]) if up else (hi >= r["stop"])
+            hit_t1 = not stopped and ((hi >= r["t1"]) if up else (lo <= r["t1"]))
+            what = f"H1 {r['t1']:.2f} ulaşıldı 🎯" if hit_t1 else f"stop {r['stop']:.2f} görüldü 🛑"
+            return f"{head}\nFiyat: <b>{s.price:.2f}</b> (giriş {r['ref']:.2f}) → {what}"
+        return (f"{head}\nFiyat: <b>{s.price:.2f}</b> | Skor: <b>{s.score:.0f}</b> | RSI: {s.rsi:.0f}\n"
+                f"Öneri: {s.bias_text} | Durum: {s.pattern_text}\n"
+                f"H1: {s.t1:.2f} | H2: {s.t2:.2f} | Stop: {s.stop:.2f}")
+
+ALERTS = AlertBook(os.getenv("ALERTS_PATH", str(Path(__file__).with_name("cache") / "alerts.json")))
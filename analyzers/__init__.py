@@ -1,8 +1,18 @@
-from .plotting import draw_analysis
-from .indicators import add_indicators
-from .patterns import detect_all_patterns
-from .scoring import build_signal_summary
-from .plotting import draw_analysis
-from .indicators import add_indicators
-from .patterns import detect_all_patterns
-from .scoring import build_signal_summary
+# analyzers/__init__.py
+# Alt modüller ilk erişimde yüklenir: paketi (ör. analyzers.signal için) içe aktarmak
+# pandas/ta/matplotlib maliyetini açılışa yüklemesin.
+import importlib
+
+_EXPORTS = {
+    "draw_analysis": ".plotting",
+    "add_indicators": ".indicators",
+    "detect_all_patterns": ".patterns",
+    "build_signal_summary": ".scoring",
+}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    mod = _EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(mod, __name__), name)
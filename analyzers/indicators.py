@@ -9,7 +9,7 @@ def _series_1d(s: pd.Series) -> pd.Series:
     return pd.Series(getattr(s, "to_numpy")().ravel(), index=s.index, name=getattr(s, "name", None))
 
 def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    df = df.copy(deep=False)   # sığ kopya: OHLCV verisi paylaşılır (yalnız okunur), yeni sütunlar yalnız bu çerçevede
 
     close = _series_1d(df["close"])
     high  = _series_1d(df["high"])
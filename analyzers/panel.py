@@ -0,0 +1,211 @@
+# analyzers/panel.py
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+FIELDS = ("open", "high", "low", "close", "volume")
+# add_indicators ile aynı sütunlar (aynı sırada)
+INDICATOR_COLUMNS = (
+    "rsi", "macd", "macd_signal", "macd_hist", "adx",
+    "stoch_k", "stoch_d", "cmf", "atr", "vol_ma20",
+)
+
+@dataclass
+class Panel:
+    """
+    Sembol × bar OHLCV paneli. Her satır kendi geçmişini 0. sütundan başlatır
+    (sola hizalı); kısa geçmişlerin sonu NaN ile doldurulur. Böylece tüm semboller
+    aynı ısınma (warm-up) sütunlarını paylaşır ve özyinelemeler zaman ekseninde
+    tek döngüyle tüm evren için işler.
+    """
+    symbols: list[str]
+    lengths: np.ndarray     # (N,) her satırdaki gerçek bar sayısı
+    open: np.ndarray        # (N, T)
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.close.shape
+
+    def row_frame(self, i: int) -> pd.DataFrame:
+        """i. sembolün OHLCV'si (index'siz; formasyon dedektörleri için yeterli)."""
+        n = int(self.lengths[i])
+        return pd.DataFrame({c: getattr(self, c)[i, :n] for c in FIELDS})
+
+def panel_nbytes(n: int, t: int, dtype=np.float64) -> int:
+    return len(FIELDS) * n * t * np.dtype(dtype).itemsize
+
+def build_panel(frames: dict[str, pd.DataFrame], symbols: list[str] | None = None,
+                buffer=None, dtype=np.float64) -> Panel:
+    """
+    buffer verilirse (ör. SharedMemory.buf) diziler doğrudan onun üstüne yazılır;
+    boyutu en az panel_nbytes(N, T, dtype) olmalıdır. dtype=float32 → yarı bellek
+    (indikatör dizileri de float32 olur; özyinelemeler float64 biriktirir).
+    """
+    symbols = [s for s in (symbols or list(frames)) if frames.get(s) is not None and len(frames[s])]
+    lengths = np.array([len(frames[s]) for s in symbols], dtype=np.int64)
+    n, t = len(symbols), int(lengths.max()) if len(lengths) else 0
+    if buffer is None:
+        arrs = {c: np.full((n, t), np.nan, dtype=dtype) for c in FIELDS}
+    else:
+        arrs = panel_views(buffer, n, t, dtype)
+        for a in arrs.values():
+            a.fill(np.nan)
+    for i, s in enumerate(symbols):
+        df = frames[s]
+        for c, a in arrs.items():
+            a[i, :lengths[i]] = df[c].to_numpy().ravel()
+    return Panel(symbols, lengths, **arrs)
+
+def panel_views(buffer, n: int, t: int, dtype=np.float64) -> dict[str, np.ndarray]:
+    """Tampon üzerinde (kopyasız) OHLCV dizileri."""
+    dtype = np.dtype(dtype)
+    size = n * t * dtype.itemsize
+    return {c: np.ndarray((n, t), dtype=dtype, buffer=buffer, offset=k * size)
+            for k, c in enumerate(FIELDS)}
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int, start: int = 0) -> np.ndarray:
+    # pandas ewm(adjust=False) eşdeğeri; seri `start` sütununda başlar
+    out = np.full_like(x, np.nan)
+    if x.shape[1] <= start:
+        return out
+    y = x[:, start].astype(np.float64)   # float32 panelde de birikim float64
+    out[:, start] = y
+    k = 1.0 - alpha
+    for j in range(start + 1, x.shape[1]):
+        y = k * y + alpha * x[:, j]
+        out[:, j] = y
+    out[:, :start + min_periods - 1] = np.nan
+    return out
+
+def _wilder_seeded(x: np.ndarray, w: int, seed_at: int, seed: np.ndarray) -> np.ndarray:
+    # ta'nın ATR/ADX döngüsü: y[seed_at] = seed, y[t] = (y[t-1]*(w-1) + x[t]) / w, öncesi 0
+    out = np.zeros_like(x)
+    if x.shape[1] <= seed_at:
+        return out
+    y = seed.astype(np.float64)
+    out[:, seed_at] = y
+    for j in range(seed_at + 1, x.shape[1]):
+        y = (y * (w - 1) + x[:, j]) / w
+        out[:, j] = y
+    return out
+
+def _rolling(x: np.ndarray, w: int, fn) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= w:
+        out[:, w - 1:] = fn(sliding_window_view(x, w, axis=1), axis=-1)
+    return out
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:, 0] = np.nan
+    out[:, 1:] = x[:, :-1]
+    return out
+
+def _adx(high, low, close, w: int = 14) -> np.ndarray:
+    n, t = close.shape
+    out = np.zeros_like(close)
+    if t < 2 * w:
+        return out
+    pc = _shift(close)
+    tr = np.fmax(high, pc) - np.fmin(low, pc)          # ta: pdm - pdn (max/min kapanışla)
+    tr[:, 0] = np.nan
+    up = high - _shift(high)
+    dn = _shift(low) - low
+    pos = np.where((up > dn) & (up > 0), up, 0.0)
+    neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+
+    # Wilder toplamları: S[w] = x[1..w] toplamı, S[t] = S[t-1] - S[t-1]/w + x[t]
+    def smooth(x):
+        s = np.zeros_like(x)
+        acc = x[:, 1:w + 1].sum(axis=1, dtype=np.float64)
+        s[:, w] = acc
+        for j in range(w + 1, t):
+            acc = acc - acc / w + x[:, j]
+            s[:, j] = acc
+        return s
+
+    trs, dip_s, din_s = smooth(tr), smooth(pos), smooth(neg)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dip = np.where(trs != 0, 100 * dip_s / trs, 0.0)
+        din = np.where(trs != 0, 100 * din_s / trs, 0.0)
+        tot = dip + din
+        dx = np.where(tot != 0, 100 * np.abs((dip - din) / tot), 0.0)
+
+    seed = dx[:, w:2 * w].mean(axis=1)
+    adx = _wilder_seeded(dx, w, 2 * w - 1, seed)
+    out[:, 2 * w - 1:] = adx[:, 2 * w - 1:]
+    return out
+
+def panel_indicators(p: Panel) -> dict[str, np.ndarray]:
+    """add_indicators'ın ürettiği tüm sütunları (N, T) dizileri olarak tek geçişte hesaplar."""
+    h, l, c, v = p.high, p.low, p.close, p.volume
+    n, t = c.shape
+    ind: dict[str, np.ndarray] = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # RSI (Wilder, alpha=1/14); ilk fark 0 kabul edilir (ta ile aynı)
+        diff = c - _shift(c)
+        up = np.where(diff > 0, diff, 0.0)
+        dn = -np.where(diff < 0, diff, 0.0)
+        eu = _ewm(up, 1 / 14, 14)
+        ed = _ewm(dn, 1 / 14, 14)
+        ind["rsi"] = np.where(ed == 0, 100.0, 100 - 100 / (1 + eu / ed))
+
+        # MACD (12, 26, 9)
+        macd = _ewm(c, 2 / 13, 12) - _ewm(c, 2 / 27, 26)
+        sig = _ewm(macd, 2 / 10, 9, start=25)
+        ind["macd"], ind["macd_signal"], ind["macd_hist"] = macd, sig, macd - sig
+
+        ind["adx"] = _adx(h, l, c, 14)
+
+        # Stochastic (14, 3)
+        ll = _rolling(l, 14, np.min)
+        hh = _rolling(h, 14, np.max)
+        k = 100 * (c - ll) / (hh - ll)
+        ind["stoch_k"] = k
+        ind["stoch_d"] = _rolling(k, 3, np.mean)
+
+        # Chaikin Money Flow (20)
+        mfv = ((c - l) - (h - c)) / (h - l)
+        mfv = np.where(np.isnan(mfv), 0.0, mfv) * v
+        ind["cmf"] = _rolling(mfv, 20, np.sum) / _rolling(v, 20, np.sum)
+
+        # ATR (14): ilk değer ilk 14 TR'nin ortalaması
+        pc = _shift(c)
+        tr = np.fmax(np.fmax(h - l, np.abs(h - pc)), np.abs(l - pc))
+        ind["atr"] = _wilder_seeded(tr, 14, 13, tr[:, :14].mean(axis=1)) if t >= 14 else np.zeros_like(c)
+
+        ind["vol_ma20"] = _rolling(v, 20, np.mean)
+
+    # satır sonrası dolgu sütunlarını geçersiz yap
+    pad = np.arange(t)[None, :] >= p.lengths[:, None]
+    for a in ind.values():
+        a[pad] = np.nan
+    return {name: ind[name] for name in INDICATOR_COLUMNS}
+
+def valid_mask(p: Panel, ind: dict[str, np.ndarray]) -> np.ndarray:
+    """add_indicators'taki dropna ile aynı: tüm sütunları NaN olmayan barlar."""
+    m = ~(np.isnan(p.open) | np.isnan(p.high) | np.isnan(p.low) | np.isnan(p.close) | np.isnan(p.volume))
+    for a in ind.values():
+        m &= ~np.isnan(a)
+    return m
+
+def latest(p: Panel, ind: dict[str, np.ndarray], mask: np.ndarray | None = None) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    Her sembolün son geçerli barındaki değerler. Dönüş: (satır başına bar indeksi, -1 → yok;
+    sütun → (N,) dizi). Sütunlar: OHLCV + INDICATOR_COLUMNS.
+    """
+    if mask is None:
+        mask = valid_mask(p, ind)
+    n, t = mask.shape
+    last = np.where(mask.any(axis=1), t - 1 - np.argmax(mask[:, ::-1], axis=1), -1)
+    rows = np.arange(n)
+    col = np.maximum(last, 0)
+    cols = {"open": p.open, "high": p.high, "low": p.low, "close": p.close, "volume": p.volume, **ind}
+    vals = {k: np.where(last >= 0, a[rows, col], np.nan) for k, a in cols.items()}
+    return last, vals
@@ -13,13 +13,22 @@ class Pattern:
     meta: dict
 
 def _linreg(x, y):
-    x, y = np.array(x), np.array(y)
-    A = np.vstack([x, np.ones(len(x))]).T
-    m, c = np.linalg.lstsq(A, y, rcond=None)[0]
+    # En küçük kareler doğrusu, kapalı form (x = 0..n-1 için Σx, Σx² tam sayıdır)
+    x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+    n = len(x)
+    sx, sxx = x.sum(), (x * x).sum()
+    sy, sxy = y.sum(), (x * y).sum()
+    m = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    c = (sy - m * sx) / n
     return m, c
 
 def _last(df: pd.DataFrame, n: int) -> pd.DataFrame:
-    return df.iloc[-n:].copy()
+    return df.iloc[-n:]   # görünüm; dedektörler pencereyi değiştirmez
+
+def _vol_spike(w: pd.DataFrame) -> bool:
+    # volume.rolling(20).mean().iloc[-1] ile aynı, tüm pencereyi yuvarlamadan
+    v = w["volume"].to_numpy()
+    return len(v) >= 20 and v[-1] > v[-20:].mean() * 1.2
 
 def detect_pennant_flag(df: pd.DataFrame, win: int = 50):
     w = _last(df, win); idx = np.arange(len(w))
@@ -32,7 +41,7 @@ def detect_pennant_flag(df: pd.DataFrame, win: int = 50):
             upper = m_hi*last_x + c_hi
             lower = m_lo*last_x + c_lo
             close = w["close"].iloc[-1]
-            vol_spike = w["volume"].iloc[-1] > (w["volume"].rolling(20).mean().iloc[-1] * 1.2)
+            vol_spike = _vol_spike(w)
 
             if close > upper:
                 pole = w["close"].iloc[-1] - w["low"].iloc[0]
@@ -60,7 +69,7 @@ def detect_triangle(df: pd.DataFrame, win: int = 80):
         lower = m_lo*last_x + c_lo
         close = w["close"].iloc[-1]
         base = spread1
-        vol_spike = w["volume"].iloc[-1] > (w["volume"].rolling(20).mean().iloc[-1] * 1.2)
+        vol_spike = _vol_spike(w)
 
         if close > upper:
             t1, t2 = close + base*0.8, close + base*1.2
@@ -0,0 +1,170 @@
+# analyzers/patterns_panel.py
+import numpy as np
+from .panel import Panel
+from .patterns import Pattern, detect_all_patterns
+
+# Pencere en az bu kadar bar içermeli (iloc[-6:-1] dilimleri skaler sürümle aynı kalsın)
+_MIN_BARS = 6
+
+def _windows(p: Panel, rows: np.ndarray, end: np.ndarray, nbar: np.ndarray, W: int):
+    """
+    Her satırın son `nbar` barlık penceresini (R, W) dizilerine toplar; pencere sağa
+    yaslıdır, nbar < W ise baştaki sütunlar geçersizdir. x: pencere içi 0..n-1 konumu.
+    """
+    cols = end[:, None] - W + np.arange(W)[None, :]
+    valid = np.arange(W)[None, :] >= (W - nbar)[:, None]
+    cc = np.clip(cols, 0, None)
+    r = rows[:, None]
+    # pencereler küçük → float32 panelde de regresyon toplamları float64'te yapılır
+    get = lambda a: np.where(valid, a[r, cc].astype(np.float64, copy=False), np.nan)
+    x = np.where(valid, np.arange(W)[None, :] - (W - nbar)[:, None], 0).astype("float64")
+    return get(p.high), get(p.low), get(p.close), get(p.volume), x, valid
+
+def _fit(y: np.ndarray, x: np.ndarray, valid: np.ndarray, n: np.ndarray):
+    # Σx ve Σx² kapalı formda (x = 0..n-1); Σy ve Σxy maskeli toplamlardan
+    y0 = np.where(valid, y, 0.0)
+    sx = n * (n - 1) / 2.0
+    sxx = (n - 1) * n * (2 * n - 1) / 6.0
+    sy = y0.sum(axis=1)
+    sxy = (x * y0).sum(axis=1)
+    m = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    c = (sy - m * sx) / n
+    return m, c
+
+def _vol_spike(v: np.ndarray, nbar: np.ndarray) -> np.ndarray:
+    ma = v[:, -20:].mean(axis=1)
+    return (nbar >= 20) & (v[:, -1] > ma * 1.2)
+
+def channel_eval(hi, lo, cl, vo, x, valid, nbar, shrink, conf0, conf_max, t_mult, stop_n, triangle) -> dict:
+    """
+    Flama/bayrak ve üçgen için ortak vektörel değerlendirme; (R, W) pencere dizileri üzerinde
+    çalışır (satırlar semboller ya da aynı sembolün ardışık barları olabilir).
+    Dönüş: long/short maskeleri ve satır başına hedef/stop/güven/trend katsayıları.
+    """
+    W = hi.shape[1]
+    n = nbar.astype("float64")
+    m_hi, c_hi = _fit(hi, x, valid, n)
+    m_lo, c_lo = _fit(lo, x, valid, n)
+    spread0 = (m_hi * 0 + c_hi) - (m_lo * 0 + c_lo)
+    spread1 = (m_hi * n + c_hi) - (m_lo * n + c_lo)
+    close = cl[:, -1]
+    with np.errstate(invalid="ignore"):
+        if triangle:
+            ok = (spread1 < spread0 * shrink) & (spread1 / close < 0.08)
+        else:
+            ok = (m_hi < 0) & (m_lo > 0) & (spread1 < spread0 * shrink)
+        last_x = n - 1
+        upper = m_hi * last_x + c_hi
+        lower = m_lo * last_x + c_lo
+        long_ = ok & (close > upper)
+        short = ok & ~long_ & (close < lower)
+
+    if triangle:
+        size = spread1
+    else:
+        first_col = (W - nbar)[:, None]
+        size = np.where(long_, close - np.take_along_axis(lo, first_col, 1)[:, 0],
+                        np.take_along_axis(hi, first_col, 1)[:, 0] - close)
+    sign = np.where(long_, 1.0, -1.0)
+    stop = np.where(long_, np.maximum(lower, lo[:, -stop_n:-1].min(axis=1)),
+                    np.minimum(upper, hi[:, -stop_n:-1].max(axis=1)))
+    conf = np.minimum(conf0 + np.where(_vol_spike(vo, nbar), 0.1, 0.0), conf_max)
+    return {"long": long_, "short": short, "t1": close + sign * (size * t_mult[0]),
+            "t2": close + sign * (size * t_mult[1]), "stop": stop, "conf": conf,
+            "m_hi": m_hi, "c_hi": c_hi, "m_lo": m_lo, "c_lo": c_lo}
+
+def double_bottom_eval(hi, lo, cl, valid, tol=0.02) -> dict:
+    """İkili dip, (R, W) pencereler üzerinde. Dönüş: hit maskesi, pivotlar, boyun, dip, hedefler."""
+    R, W = lo.shape
+    close = cl[:, -1]
+    cols = np.arange(W)
+
+    # pivot dipleri: iki yanındaki ikişer bardan düşük (NaN karşılaştırmaları False)
+    piv = np.zeros((R, W), dtype=bool)
+    if W >= 5:
+        mid = lo[:, 2:-2]
+        piv[:, 2:-2] = (mid < lo[:, 1:-3]) & (mid < lo[:, 3:-1]) & (mid < lo[:, :-4]) & (mid < lo[:, 4:])
+    piv &= valid
+    cnt = piv.sum(axis=1)
+    i2 = np.where(cnt > 0, W - 1 - np.argmax(piv[:, ::-1], axis=1), 0)
+    low_i2 = lo[np.arange(R), i2]
+    denom = np.maximum(1e-8, close)
+    with np.errstate(invalid="ignore"):
+        cand = piv & (cols[None, :] <= (i2 - 5)[:, None]) & (np.abs(lo - low_i2[:, None]) / denom[:, None] < tol)
+    has = (cnt >= 2) & cand.any(axis=1)
+    i1 = np.where(has, W - 1 - np.argmax(cand[:, ::-1], axis=1), 0)
+    span = (cols[None, :] >= i1[:, None]) & (cols[None, :] <= i2[:, None])
+    neck = np.where(span, hi, -np.inf).max(axis=1)
+    with np.errstate(invalid="ignore"):
+        hit = has & (close > neck)
+    bottom = np.minimum(lo[np.arange(R), i1], low_i2)
+    depth = np.abs(neck - bottom)
+    return {"hit": hit, "i1": i1, "i2": i2, "neck": neck, "bottom": bottom,
+            "t1": neck + depth * 0.8, "t2": neck + depth * 1.2}
+
+def _channel(p, rows, end, body, W, shrink, name_long, name_short, conf0, conf_max, t_mult, stop_n, triangle):
+    nbar = np.minimum(W, body[rows])
+    hi, lo, cl, vo, x, valid = _windows(p, rows, end[rows], nbar, W)
+    r = channel_eval(hi, lo, cl, vo, x, valid, nbar, shrink, conf0, conf_max, t_mult, stop_n, triangle)
+    out: dict[int, Pattern] = {}
+    for k in np.flatnonzero(r["long"] | r["short"]):
+        is_long = bool(r["long"][k])
+        meta = {"upper": (r["m_hi"][k], r["c_hi"][k]), "lower": (r["m_lo"][k], r["c_lo"][k]),
+                "window": int(body[rows[k]] - nbar[k])}
+        out[int(rows[k])] = Pattern(name_long if is_long else name_short, float(r["conf"][k]),
+                                    "long" if is_long else "short", float(cl[k, -1]), float(r["stop"][k]),
+                                    [float(r["t1"][k]), float(r["t2"][k])], meta)
+    return out
+
+def _double_bottom(p, rows, end, body, W=200, tol=0.02):
+    nbar = np.minimum(W, body[rows])
+    hi, lo, cl, _, _, valid = _windows(p, rows, end[rows], nbar, W)
+    r = double_bottom_eval(hi, lo, cl, valid, tol)
+    out: dict[int, Pattern] = {}
+    first_col = W - nbar
+    for k in np.flatnonzero(r["hit"]):
+        a, b = int(r["i1"][k]), int(r["i2"][k])
+        meta = {"pivots": (a - int(first_col[k]), b - int(first_col[k])), "neckline": float(r["neck"][k]),
+                "window": int(body[rows[k]] - nbar[k])}
+        out[int(rows[k])] = Pattern("Double Bottom Breakout", 0.6, "long", float(cl[k, -1]), float(r["bottom"][k]),
+                                    [float(r["t1"][k]), float(r["t2"][k])], meta)
+    return out
+
+def detect_panel(p: Panel, mask: np.ndarray) -> list[list[Pattern]]:
+    """
+    detect_all_patterns'ın tüm panel için vektörel karşılığı. Her satırın gövdesi,
+    add_indicators(df).dropna() ile aynı barlardır (mask: panel.valid_mask).
+    Gövdesi boşluklu ya da çok kısa satırlar skaler dedektöre düşer.
+    """
+    N = len(p.symbols)
+    out: list[list[Pattern]] = [[] for _ in range(N)]
+    if N == 0:
+        return out
+    T = mask.shape[1]
+    L = p.lengths
+    inrow = np.arange(T)[None, :] < L[:, None]
+    m = mask & inrow
+    has = m.any(axis=1)
+    first = np.argmax(m, axis=1)
+    body = np.where(has, L - first, 0)
+    contiguous = m.sum(axis=1) == body
+
+    vec = np.flatnonzero(has & contiguous & (body >= _MIN_BARS))
+    for i in np.flatnonzero(has & ~(contiguous & (body >= _MIN_BARS))):
+        df = p.row_frame(i)
+        out[i] = detect_all_patterns(df[m[i, :L[i]]])
+    if len(vec) == 0:
+        return out
+
+    end = L
+    found = [
+        _channel(p, vec, end, body, 50, 0.7, "Bullish Pennant/Flag Breakout", "Bearish Pennant/Flag Breakdown",
+                 0.6, 0.9, (0.6, 1.0), 5, triangle=False),
+        _channel(p, vec, end, body, 80, 0.65, "Ascending/Symmetric Triangle Breakout",
+                 "Descending/Symmetric Triangle Breakdown", 0.55, 0.85, (0.8, 1.2), 6, triangle=True),
+        _double_bottom(p, vec, end, body),
+    ]
+    for res in found:
+        for i, pat in res.items():
+            out[i].append(pat)
+    return out
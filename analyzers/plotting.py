@@ -1,44 +1,135 @@
 # analyzers/plotting.py
 import io
-import matplotlib
-matplotlib.use("Agg")  # GUI backend kapalı (ana thread uyarıları biter)
-import matplotlib.pyplot as plt
+import os
+import threading
+import numpy as np
 import pandas as pd
-from .patterns import Pattern
-
-def _apply_style():
-    plt.rcParams["figure.figsize"] = (12, 6)
-    plt.rcParams["axes.grid"] = True
-
-def draw_analysis(df: pd.DataFrame, summary: dict) -> io.BytesIO:
-    _apply_style()
-    fig, ax = plt.subplots()
-    ax.plot(df.index, df["close"], label="Close")
-
-    pat: Pattern | None = summary.get("pattern")
-    if pat and "upper" in pat.meta and "lower" in pat.meta:
-        wlen = 60
-        idx = list(range(wlen))
-        m_hi, c_hi = pat.meta["upper"]; m_lo, c_lo = pat.meta["lower"]
-        xs = df.index[-wlen:]
-        upper = [m_hi*i + c_hi for i in idx]
-        lower = [m_lo*i + c_lo for i in idx]
-        ax.plot(xs, upper, linestyle="--", label="Üst trend")
-        ax.plot(xs, lower, linestyle="--", label="Alt trend")
-
-    price = float(summary["price"])
-    t1 = float(summary["t1"]); t2 = float(summary["t2"]); stop = float(summary["stop"])
-    ax.axhline(price, linewidth=1, label=f"Fiyat {price:.2f}")
-    ax.axhline(t1, linestyle=":", label=f"Hedef1 {t1:.2f}")
-    ax.axhline(t2, linestyle=":", label=f"Hedef2 {t2:.2f}")
-    ax.axhline(stop, linestyle="-.", label=f"Stop {stop:.2f}")
-
-    ax.legend(loc="best")
-    ax.set_title("Formasyon + Analiz")
-
-    buf = io.BytesIO()
-    fig.tight_layout()
-    fig.savefig(buf, format="png", dpi=160)
-    plt.close(fig)
+from PIL import Image, features
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.dates as mdates
+from .signal import Signal
+
+# Varsayılanlar env ile değiştirilebilir: CHART_SIZE="12x6", CHART_DPI=160, CHART_FORMAT=png|webp
+def _env_size() -> tuple[float, float]:
+    try:
+        w, h = os.getenv("CHART_SIZE", "12x6").lower().split("x")
+        return float(w), float(h)
+    except ValueError:
+        return 12.0, 6.0
+
+DEFAULT_SIZE = _env_size()
+DEFAULT_DPI = int(os.getenv("CHART_DPI", "160"))
+DEFAULT_FORMAT = os.getenv("CHART_FORMAT", "png").lower()
+FORMATS = ("png", "webp")
+# PNG sıkıştırma düzeyi (0-9): kodlama süresinin yarısı buradadır; 1 → ~%10 büyük dosya, ~4x hızlı
+PNG_LEVEL = int(os.getenv("CHART_PNG_LEVEL", "1"))
+WEBP_QUALITY = int(os.getenv("CHART_WEBP_QUALITY", "80"))
+# webp kodlayıcısı Pillow'un libwebp ile derlenmiş olmasını ister (resmi wheel'lerde vardır)
+HAS_WEBP = features.check("webp")
+
+_WLEN = 60  # trend çizgilerinin çizildiği son bar sayısı
+
+class ChartTemplate:
+    """
+    Bir kez kurulan figür (pyplot'suz, Figure + FigureCanvasAgg). Her çizimde yalnızca
+    çizgi verileri, etiketler ve eksen sınırları güncellenir; figür/eksen yeniden kurulmaz.
+    Şablonlar thread'e özeldir (bkz. _template) → thread/süreç havuzunda güvenli.
+    """
+
+    def __init__(self, size: tuple[float, float] = DEFAULT_SIZE, dpi: int = DEFAULT_DPI):
+        self.dpi = dpi
+        self.fig = Figure(figsize=size, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        # tight_layout her çizimde pahalı → sabit kenar boşlukları
+        self.fig.subplots_adjust(left=0.045, right=0.97, bottom=0.07, top=0.94)
+        ax = self.ax = self.fig.add_subplot()
+        ax.grid(True)
+        ax.xaxis_date()
+        ax.set_title("Formasyon + Analiz")
+
+        self.close, = ax.plot([], [], color="C0", label="Close")
+        self.upper, = ax.plot([], [], color="C1", linestyle="--", label="Üst trend")
+        self.lower, = ax.plot([], [], color="C2", linestyle="--", label="Alt trend")
+        self.price = ax.axhline(0, color="C0", linewidth=1)
+        self.t1 = ax.axhline(0, color="C0", linestyle=":")
+        self.t2 = ax.axhline(0, color="C0", linestyle=":")
+        self.stop = ax.axhline(0, color="C0", linestyle="-.")
+
+    def render(self, df: pd.DataFrame, sig: Signal, fmt: str = DEFAULT_FORMAT) -> bytes:
+        if fmt not in FORMATS:
+            raise ValueError(f"Desteklenmeyen grafik biçimi: {fmt}")
+        if fmt == "webp" and not HAS_WEBP:
+            raise RuntimeError("webp grafik için libwebp destekli Pillow gerekli; CHART_FORMAT=png kullanın")
+        x = _xdata(df.index)
+        self.close.set_data(x, df["close"].to_numpy(dtype="float64"))
+
+        trend = sig.has_trend
+        for line in (self.upper, self.lower):
+            line.set_visible(trend)
+        if trend:
+            wlen = min(_WLEN, len(x))
+            i = np.arange(wlen)
+            self.upper.set_data(x[-wlen:], sig.m_hi * i + sig.c_hi)
+            self.lower.set_data(x[-wlen:], sig.m_lo * i + sig.c_lo)
+        self.upper.set_label("Üst trend" if trend else "_Üst trend")
+        self.lower.set_label("Alt trend" if trend else "_Alt trend")
+
+        for line, y, label in ((self.price, sig.price, "Fiyat"), (self.t1, sig.t1, "Hedef1"),
+                               (self.t2, sig.t2, "Hedef2"), (self.stop, sig.stop, "Stop")):
+            line.set_ydata([y, y])
+            line.set_label(f"{label} {y:.2f}")
+
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        self.ax.legend(loc="best")
+
+        # Agg tamponu doğrudan Pillow'a: savefig'in ek kopyaları/ayarları atlanır
+        self.canvas.draw()
+        img = Image.frombuffer("RGBA", self.canvas.get_width_height(), self.canvas.buffer_rgba(),
+                               "raw", "RGBA", 0, 1).convert("RGB")
+        buf = io.BytesIO()
+        if fmt == "png":
+            img.save(buf, format="PNG", compress_level=PNG_LEVEL)
+        else:
+            img.save(buf, format="WEBP", quality=WEBP_QUALITY)
+        return buf.getvalue()
+
+def _xdata(idx) -> np.ndarray:
+    if isinstance(idx, pd.DatetimeIndex):
+        # .values tz'li index'te UTC'dir (matplotlib'in tarih dönüşümüyle aynı)
+        return mdates.date2num(idx.values)
+    return np.arange(len(idx), dtype="float64")
+
+_local = threading.local()
+
+def _template(size: tuple[float, float], dpi: int) -> ChartTemplate:
+    cache = getattr(_local, "templates", None)
+    if cache is None:
+        cache = _local.templates = {}
+    key = (tuple(size), dpi)
+    tpl = cache.get(key)
+    if tpl is None:
+        tpl = cache[key] = ChartTemplate(size, dpi)
+    return tpl
+
+def render_analysis(df: pd.DataFrame, sig: Signal, size: tuple[float, float] | None = None,
+                    dpi: int | None = None, fmt: str | None = None) -> bytes:
+    """Grafiği bayt olarak üretir (png|webp); şablon thread başına bir kez kurulur."""
+    return _template(size or DEFAULT_SIZE, dpi or DEFAULT_DPI).render(df, sig, (fmt or DEFAULT_FORMAT).lower())
+
+def draw_analysis(df: pd.DataFrame, sig: Signal, size: tuple[float, float] | None = None,
+                  dpi: int | None = None, fmt: str | None = None) -> io.BytesIO:
+    buf = io.BytesIO(render_analysis(df, sig, size, dpi, fmt))
     buf.seek(0)
     return buf
+
+def warm(size: tuple[float, float] | None = None, dpi: int | None = None) -> int:
+    """
+    Açılış ısınması: matplotlib font önbelleği, bu thread'in şablonu ve Pillow kodlayıcı
+    ilk gerçek /analiz'den önce hazırlanır. Dönüş: atılan grafiğin bayt sayısı.
+    """
+    n = 60
+    df = pd.DataFrame({"close": np.linspace(100.0, 110.0, n)},
+                      index=pd.date_range("2025-01-02 10:00", periods=n, freq="h", tz="Europe/Istanbul"))
+    return len(render_analysis(df, Signal(110.0, 1.0, 50.0, 0, 108.0, 112.0, 114.0), size, dpi))
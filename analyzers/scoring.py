@@ -1,9 +1,17 @@
 # analyzers/scoring.py
+from dataclasses import replace
+from typing import Mapping, Sequence
+import numpy as np
 import pandas as pd
+from .panel import FIELDS, INDICATOR_COLUMNS
 from .patterns import Pattern
+from .signal import PATTERN_CODES, SIGNAL_DTYPE, Signal, empty_records
 
-def _indicator_bias(df: pd.DataFrame) -> tuple[str, float]:
-    last = df.iloc[-1]
+# /tara anlık görüntüsü: özet alanları + son barın OHLCV/indikatör sütunları (add_indicators adlarıyla)
+SCREEN_COLUMNS = tuple(c for c in FIELDS + INDICATOR_COLUMNS if c not in SIGNAL_DTYPE.names)
+SCREEN_DTYPE = np.dtype(SIGNAL_DTYPE.descr + [(c, "f8") for c in SCREEN_COLUMNS])
+
+def _indicator_bias(last: Mapping) -> tuple[int, float]:
     score = 50.0
     long_pts = 0
     if last["rsi"] > 50: long_pts += 1; score += 10
@@ -12,43 +20,83 @@ def _indicator_bias(df: pd.DataFrame) -> tuple[str, float]:
     if last["cmf"] > 0: long_pts += 1; score += 5
     if last["volume"] > last["vol_ma20"] * 1.2: long_pts += 1; score += 5
 
-    if long_pts >= 3: return "AL (uzun eğilim)", min(score, 90.0)
-    if long_pts == 2: return "NÖTR/İZLE", 60.0
-    return "SAT (zayıf)", 45.0
-
-def _eta_by_atr(atr: float, price: float, target: float) -> str:
-    if atr <= 0: return "3-7 gün"
-    bars = abs(target - price) / max(atr, 1e-8)
-    days = bars / 24  # ~60m barlar için yaklaşık
-    if days < 2: return "1-2 gün"
-    if days < 6: return "2-5 gün"
-    return "5-10 gün"
+    if long_pts >= 3: return 1, min(score, 90.0)    # AL (uzun eğilim)
+    if long_pts == 2: return 0, 60.0                # NÖTR/İZLE
+    return -1, 45.0                                 # SAT (zayıf)
 
-def build_signal_summary(df: pd.DataFrame, patterns: list[Pattern]):
-    price = float(df["close"].iloc[-1])
-    atr = float(df["atr"].iloc[-1]) if "atr" in df.columns else 0.0
-    bias_text, bias_score = _indicator_bias(df)
+def indicator_bias_panel(v: Mapping[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """_indicator_bias'ın sütun sürümü (NaN karşılaştırmaları skaler sürümdeki gibi False)."""
+    big = [v["rsi"] > 50, (v["macd"] > v["macd_signal"]) & (v["macd_signal"] > 0),
+           (v["adx"] >= 20) & (v["adx"] <= 60)]
+    small = [v["cmf"] > 0, v["volume"] > v["vol_ma20"] * 1.2]
+    pts = sum(c.astype(np.int8) for c in big + small)
+    score = 50.0 + 10.0 * sum(c.astype(np.int8) for c in big) + 5.0 * sum(c.astype(np.int8) for c in small)
+    bias = np.where(pts >= 3, 1, np.where(pts == 2, 0, -1))
+    score = np.where(pts >= 3, np.minimum(score, 90.0), np.where(pts == 2, 60.0, 45.0))
+    return bias, score
 
+def _best_long(patterns: Sequence[Pattern]) -> Pattern | None:
     best = max(patterns, key=lambda p: p.confidence) if patterns else None
-    if best and best.direction == "long":
-        t1, t2 = best.targets
-        base_score = bias_score + best.confidence * 20
-        return {
-            "price": price, "atr": atr, "bias_text": bias_text,
-            "pattern_text": f"{best.name} (güven {best.confidence*100:.0f}%)",
-            "score": min(base_score, 100.0),
-            "buy_zone": f"{best.breakout_price:.2f} üstü",
-            "stop": f"{best.stop:.2f}", "t1": f"{t1:.2f}", "t2": f"{t2:.2f}",
-            "eta": _eta_by_atr(atr, price, t1), "pattern": best
-        }
-
-    t1 = price + atr * 1.5
-    t2 = price + atr * 3.0
-    stop_val = price - atr * 1.2
-    return {
-        "price": price, "atr": atr, "bias_text": bias_text,
-        "pattern_text": "Belirgin formasyon yok (indikatör bazlı öneri)",
-        "score": bias_score, "buy_zone": f"{price:.2f} ± {atr:.2f}",
-        "stop": f"{stop_val:.2f}", "t1": f"{t1:.2f}", "t2": f"{t2:.2f}",
-        "eta": _eta_by_atr(atr, price, t1), "pattern": None
+    return best if best and best.direction == "long" else None
+
+def _pattern_fields(best: Pattern, bias_score: float) -> dict:
+    t1, t2 = best.targets
+    out = {
+        "score": min(bias_score + best.confidence * 20, 100.0), "stop": round(best.stop, 2),
+        "t1": round(t1, 2), "t2": round(t2, 2),
+        "pattern": PATTERN_CODES.get(best.name, -1), "confidence": float(best.confidence),
     }
+    if "upper" in best.meta and "lower" in best.meta:
+        (m_hi, c_hi), (m_lo, c_lo) = best.meta["upper"], best.meta["lower"]
+        out.update(m_hi=float(m_hi), c_hi=float(c_hi), m_lo=float(m_lo), c_lo=float(c_lo))
+    return out
+
+def build_signal_summary(df: pd.DataFrame, patterns: list[Pattern]) -> Signal:
+    return summarize_last(df.iloc[-1], patterns)
+
+def summarize_last(last: Mapping, patterns: list[Pattern]) -> Signal:
+    """Son barın değerlerinden (satır ya da sözlük) özet üretir. Fiyatlar kuruşa yuvarlanır."""
+    price = float(last["close"])
+    atr = float(last["atr"]) if "atr" in last else 0.0
+    bias, bias_score = _indicator_bias(last)
+    sig = Signal(price, atr, bias_score, bias, stop=round(price - atr * 1.2, 2),
+                 t1=round(price + atr * 1.5, 2), t2=round(price + atr * 3.0, 2), rsi=float(last["rsi"]),
+                 high=float(last["high"]), low=float(last["low"]))
+
+    best = _best_long(patterns)
+    return replace(sig, **_pattern_fields(best, bias_score)) if best is not None else sig
+
+def summarize_panel(symbols: Sequence[str], last: np.ndarray, vals: Mapping[str, np.ndarray],
+                    patterns: Sequence[list[Pattern]], columns: bool = False) -> np.ndarray:
+    """
+    Panelin tüm sembolleri için özet, SIGNAL_DTYPE kayıt dizisi olarak (son geçerli barı
+    olmayanlar atlanır). İndikatör eğilimi sütun bazında; yalnızca formasyonlu satırlar döngüde.
+    columns: SCREEN_DTYPE döner (özet + son barın ham sütunları).
+    """
+    rows = np.flatnonzero(last >= 0)
+    out = empty_records(len(rows))
+    if not len(rows):
+        return np.zeros(0, dtype=SCREEN_DTYPE) if columns else out
+    v = {k: a[rows] for k, a in vals.items()}
+    price, atr = v["close"].astype("float64"), v["atr"].astype("float64")
+    bias, score = indicator_bias_panel(v)
+    out["ticker"] = [symbols[i] for i in rows]
+    out["price"], out["atr"], out["bias"], out["score"] = price, atr, bias, score
+    out["rsi"], out["high"], out["low"] = v["rsi"], v["high"], v["low"]
+    out["stop"] = np.round(price - atr * 1.2, 2)
+    out["t1"] = np.round(price + atr * 1.5, 2)
+    out["t2"] = np.round(price + atr * 3.0, 2)
+
+    for j, i in enumerate(rows):
+        best = _best_long(patterns[i])
+        if best is not None:
+            for k, val in _pattern_fields(best, float(score[j])).items():
+                out[k][j] = val
+    if not columns:
+        return out
+    wide = np.zeros(len(rows), dtype=SCREEN_DTYPE)
+    for f in SIGNAL_DTYPE.names:
+        wide[f] = out[f]
+    for c in SCREEN_COLUMNS:
+        wide[c] = v[c]
+    return wide
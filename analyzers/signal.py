@@ -0,0 +1,105 @@
+# analyzers/signal.py
+import math
+from dataclasses import dataclass, fields
+from typing import Iterable
+import numpy as np
+
+# Öneri kodu → metin (metin yalnızca gösterimde üretilir)
+BIAS_TEXT = {1: "AL (uzun eğilim)", 0: "NÖTR/İZLE", -1: "SAT (zayıf)"}
+
+# Formasyon kodu = bu demetteki sıra; -1 → formasyon yok
+PATTERN_NAMES = (
+    "Bullish Pennant/Flag Breakout", "Bearish Pennant/Flag Breakdown",
+    "Ascending/Symmetric Triangle Breakout", "Descending/Symmetric Triangle Breakdown",
+    "Double Bottom Breakout",
+)
+PATTERN_CODES = {name: i for i, name in enumerate(PATTERN_NAMES)}
+
+NAN = float("nan")
+
+@dataclass(slots=True)
+class Signal:
+    """
+    Son barın sayısal özeti. Fiyatlar kuruşa yuvarlı float; metinler (öneri, formasyon,
+    alım bölgesi, ETA) gösterim anında üretilir. Trend çizgisi katsayıları yalnızca
+    kanal formasyonlarında dolu (yoksa NaN). rsi, high, low: son barın RSI(14) değeri ve
+    bar içi en yüksek/en düşük fiyatı (alarm kuralları için; hedef/stop bar içinde görülür).
+    """
+    price: float
+    atr: float
+    score: float
+    bias: int                 # 1 AL, 0 NÖTR, -1 SAT
+    stop: float
+    t1: float
+    t2: float
+    pattern: int = -1         # PATTERN_NAMES indeksi
+    confidence: float = 0.0
+    m_hi: float = NAN
+    c_hi: float = NAN
+    m_lo: float = NAN
+    c_lo: float = NAN
+    rsi: float = NAN
+    high: float = NAN
+    low: float = NAN
+
+    @property
+    def side(self) -> str:
+        # eski metin tabanlı yön saptamasıyla aynı: yalnızca "SAT" önerisi short
+        return "short" if self.bias < 0 else "long"
+
+    @property
+    def has_trend(self) -> bool:
+        return not math.isnan(self.m_hi)
+
+    @property
+    def bias_text(self) -> str:
+        return BIAS_TEXT[self.bias]
+
+    @property
+    def pattern_name(self) -> str | None:
+        return PATTERN_NAMES[self.pattern] if self.pattern >= 0 else None
+
+    @property
+    def pattern_text(self) -> str:
+        if self.pattern < 0:
+            return "Belirgin formasyon yok (indikatör bazlı öneri)"
+        return f"{self.pattern_name} (güven {self.confidence*100:.0f}%)"
+
+    def record(self, ticker: str) -> np.void:
+        return np.array([(ticker, *self.values())], dtype=SIGNAL_DTYPE)[0]
+
+    def values(self) -> tuple:
+        return tuple(getattr(self, f) for f in _FIELDS)
+
+    @classmethod
+    def from_record(cls, r) -> "Signal":
+        return cls(*(r[f].item() for f in _FIELDS))
+
+_FIELDS = tuple(f.name for f in fields(Signal))
+_INT_FIELDS = {"bias": "i1", "pattern": "i1"}
+
+# Evren taramaları için kayıt dizisi: satır başına bir sembol, yalnızca sayısal alanlar + sembol
+SIGNAL_DTYPE = np.dtype([("ticker", "U16")] + [(f, _INT_FIELDS.get(f, "f8")) for f in _FIELDS])
+
+def empty_records(n: int = 0) -> np.ndarray:
+    a = np.zeros(n, dtype=SIGNAL_DTYPE)
+    for f in ("m_hi", "c_hi", "m_lo", "c_lo", "rsi", "high", "low"):
+        a[f] = np.nan
+    a["pattern"] = -1
+    return a
+
+def to_records(pairs: Iterable[tuple[str, Signal]]) -> np.ndarray:
+    """[(ticker, Signal)] → SIGNAL_DTYPE dizisi."""
+    rows = [(t, *s.values()) for t, s in pairs]
+    return np.array(rows, dtype=SIGNAL_DTYPE) if rows else empty_records()
+
+def stack(rows: Iterable) -> np.ndarray:
+    """Kayıt satırları (np.void, ör. önbellekten) → SIGNAL_DTYPE dizisi."""
+    rows = list(rows)
+    return np.array(rows, dtype=SIGNAL_DTYPE) if rows else empty_records()
+
+def rank(a: np.ndarray) -> np.ndarray:
+    """Deterministik sıra: skor ↓, eşitse sembol adı ↓."""
+    if not len(a):
+        return a
+    return a[np.lexsort((a["ticker"], a["score"]))[::-1]]
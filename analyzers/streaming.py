@@ -0,0 +1,272 @@
+# analyzers/streaming.py
+import json
+import math
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Mapping
+import pandas as pd
+from .panel import INDICATOR_COLUMNS
+
+NAN = float("nan")
+
+def _div(a: float, b: float) -> float:
+    # numpy/pandas bölme semantiği: x/0 → ±inf, 0/0 → NaN
+    if b == 0:
+        return NAN if a == 0 or a != a else math.copysign(math.inf, a)
+    return a / b
+
+class IndicatorState:
+    """
+    Tek (ticker, interval) için add_indicators'ın akışkan karşılığı.
+    EMA/Wilder birikimlerini ve kayan pencereleri tutar; her update(bar) O(1).
+    Özyinelemeler ta kütüphanesinin tanımlarıyla birebir aynıdır. Son bar işlenmeden
+    önceki durum saklanır; aynı zaman damgalı bar gelirse (ör. günlükte canlı bar
+    güncellendi) son bar yeniden hesaplanır.
+    """
+    W = 14          # RSI/ADX/ATR/Stochastic penceresi
+    CMF_W = 20
+    VOL_W = 20
+
+    def __init__(self):
+        self.n = 0                      # işlenen bar sayısı
+        self.ts: int | None = None      # son barın zaman damgası (epoch-ns)
+        self.bar = {"open": NAN, "high": NAN, "low": NAN, "close": NAN, "volume": NAN}
+        self.prev = None                # (high, low, close) bir önceki bar
+        # RSI
+        self.eu = 0.0; self.ed = 0.0
+        # MACD
+        self.ema12 = NAN; self.ema26 = NAN; self.sig = NAN
+        # ADX (Wilder toplamları + DX tohumu)
+        self.trs = 0.0; self.dip = 0.0; self.din = 0.0
+        self.dx_sum = 0.0; self.adx = 0.0
+        # ATR
+        self.tr_sum = 0.0; self.atr = 0.0
+        # pencereler
+        self.highs: deque = deque(maxlen=self.W)
+        self.lows: deque = deque(maxlen=self.W)
+        self.ks: deque = deque(maxlen=3)
+        self.mfv: deque = deque(maxlen=self.CMF_W)
+        self.vols: deque = deque(maxlen=max(self.CMF_W, self.VOL_W))
+        self._base: IndicatorState | None = None   # son bardan önceki durum (düzeltme için)
+
+    def _copy(self) -> "IndicatorState":
+        st = IndicatorState.__new__(IndicatorState)
+        for k, v in self.__dict__.items():
+            setattr(st, k, deque(v, maxlen=v.maxlen) if isinstance(v, deque) else v)
+        st._base = None
+        return st
+
+    # --- güncelleme ---
+    def update(self, bar: Mapping) -> dict:
+        """
+        Yeni barı işler; bar: open/high/low/close/volume (+ isteğe bağlı ts). Son barla
+        aynı ts → son bar bu değerlerle yeniden hesaplanır; daha eski ts → yok sayılır.
+        """
+        ts = bar.get("ts")
+        if ts is not None:
+            ts = int(pd.Timestamp(ts).as_unit("ns").value) if not isinstance(ts, int) else ts
+        if ts is not None and self.ts is not None and ts <= self.ts:
+            if ts < self.ts or self._base is None:
+                return self.snapshot()
+            base = self._base
+            self.__dict__.update(base._copy().__dict__)
+            self._base = base
+        else:
+            self._base = self._copy()
+        if ts is not None:
+            self.ts = ts
+
+        o, h, l, c, v = (float(bar[k]) for k in ("open", "high", "low", "close", "volume"))
+        t, w = self.n, self.W
+
+        # RSI: ilk fark 0 kabul edilir
+        diff = 0.0 if self.prev is None else c - self.prev[2]
+        up, dn = (diff if diff > 0 else 0.0), (-diff if diff < 0 else 0.0)
+        a = 1.0 / w
+        if t == 0:
+            self.eu, self.ed = up, dn
+        else:
+            self.eu = (1 - a) * self.eu + a * up
+            self.ed = (1 - a) * self.ed + a * dn
+
+        # MACD (12, 26, 9)
+        if t == 0:
+            self.ema12 = self.ema26 = c
+        else:
+            self.ema12 = (1 - 2 / 13) * self.ema12 + (2 / 13) * c
+            self.ema26 = (1 - 2 / 27) * self.ema26 + (2 / 27) * c
+        if t >= 25:
+            macd = self.ema12 - self.ema26
+            self.sig = macd if t == 25 else (1 - 0.2) * self.sig + 0.2 * macd
+
+        # ADX + ATR
+        if self.prev is None:
+            tr_atr = h - l
+        else:
+            ph, pl, pc = self.prev
+            tr_atr = max(h - l, abs(h - pc), abs(l - pc))
+            tr = max(h, pc) - min(l, pc)
+            du, dd = h - ph, pl - l
+            pos = du if (du > dd and du > 0) else 0.0
+            neg = dd if (dd > du and dd > 0) else 0.0
+            if t <= w:
+                self.trs += tr; self.dip += pos; self.din += neg
+            else:
+                self.trs = self.trs - self.trs / w + tr
+                self.dip = self.dip - self.dip / w + pos
+                self.din = self.din - self.din / w + neg
+            if t >= w:
+                dip = 100 * self.dip / self.trs if self.trs != 0 else 0.0
+                din = 100 * self.din / self.trs if self.trs != 0 else 0.0
+                dx = 100 * abs((dip - din) / (dip + din)) if dip + din != 0 else 0.0
+                if t < 2 * w - 1:
+                    self.dx_sum += dx
+                elif t == 2 * w - 1:
+                    self.adx = (self.dx_sum + dx) / w
+                else:
+                    self.adx = (self.adx * (w - 1) + dx) / w
+
+        if t < w - 1:
+            self.tr_sum += tr_atr
+        elif t == w - 1:
+            self.atr = (self.tr_sum + tr_atr) / w
+        else:
+            self.atr = (self.atr * (w - 1) + tr_atr) / w
+
+        # Stochastic
+        self.highs.append(h); self.lows.append(l)
+        k = NAN
+        if len(self.highs) == w:
+            ll, hh = min(self.lows), max(self.highs)
+            k = 100 * _div(c - ll, hh - ll)
+        self.ks.append(k)
+
+        # CMF / hacim ortalaması
+        m = _div((c - l) - (h - c), h - l)
+        self.mfv.append((0.0 if m != m else m) * v)
+        self.vols.append(v)
+
+        self.bar = {"open": o, "high": h, "low": l, "close": c, "volume": v}
+        self.prev = (h, l, c)
+        self.n += 1
+        return self.snapshot()
+
+    # --- okuma ---
+    def snapshot(self) -> dict:
+        """Son barın OHLCV + indikatör değerleri; ısınma bitmediyse NaN. 'valid' → dropna'dan geçer."""
+        t = self.n - 1
+        out = dict(self.bar)
+        out["rsi"] = NAN if t < self.W - 1 else (100.0 if self.ed == 0 else 100 - 100 / (1 + _div(self.eu, self.ed)))
+        macd = self.ema12 - self.ema26 if t >= 25 else NAN
+        out["macd"] = macd
+        out["macd_signal"] = self.sig if t >= 33 else NAN
+        out["macd_hist"] = macd - out["macd_signal"]
+        out["adx"] = self.adx if t >= 2 * self.W - 1 else 0.0
+        ks = list(self.ks)
+        out["stoch_k"] = ks[-1] if ks else NAN
+        out["stoch_d"] = sum(ks) / 3 if len(ks) == 3 else NAN
+        if len(self.mfv) == self.CMF_W:
+            out["cmf"] = _div(sum(self.mfv), sum(list(self.vols)[-self.CMF_W:]))
+        else:
+            out["cmf"] = NAN
+        out["atr"] = self.atr if t >= 0 else NAN
+        vols = list(self.vols)[-self.VOL_W:]
+        out["vol_ma20"] = sum(vols) / self.VOL_W if len(vols) == self.VOL_W else NAN
+        out["ts"] = self.ts
+        out["valid"] = t >= 0 and not any(out[c] != out[c] for c in INDICATOR_COLUMNS + ("open", "high", "low", "close", "volume"))
+        return out
+
+    # --- kalıcılık ---
+    def to_dict(self) -> dict:
+        d = {k: v for k, v in self.__dict__.items() if not isinstance(v, deque)}
+        d.update({k: list(v) for k, v in self.__dict__.items() if isinstance(v, deque)})
+        d["prev"] = list(self.prev) if self.prev else None
+        d["_base"] = self._base.to_dict() if self._base is not None else None
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IndicatorState":
+        st = cls()
+        for k, v in d.items():
+            cur = getattr(st, k, None)
+            if isinstance(cur, deque):
+                cur.extend(v)
+            else:
+                setattr(st, k, v)
+        st.prev = tuple(d["prev"]) if d.get("prev") else None
+        st._base = cls.from_dict(d["_base"]) if d.get("_base") else None
+        return st
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IndicatorState":
+        st = cls()
+        st.extend(df)
+        return st
+
+    def extend(self, df: pd.DataFrame) -> dict:
+        """Çerçevedeki son ts'li (düzeltme) ve daha yeni barları sırayla işler."""
+        ts = _stamps(df)
+        cols = [df[c].to_numpy(dtype="float64") for c in ("open", "high", "low", "close", "volume")]
+        for i, row in enumerate(zip(*cols)):
+            if ts[i] is not None and self.ts is not None and ts[i] < self.ts:
+                continue
+            self.update({"open": row[0], "high": row[1], "low": row[2], "close": row[3],
+                         "volume": row[4], "ts": None if ts[i] is None else int(ts[i])})
+        return self.snapshot()
+
+def _stamps(df: pd.DataFrame) -> list:
+    # DatetimeIndex → epoch-ns (UTC); başka index → None (sırayla işlenir)
+    idx = df.index
+    if not isinstance(idx, pd.DatetimeIndex):
+        return [None] * len(df)
+    return (idx.tz_convert("UTC") if idx.tz is not None else idx).as_unit("ns").asi8.tolist()
+
+class IndicatorStateStore:
+    """(ticker, interval) → IndicatorState; JSON dosyasına yazılır, yeniden başlatmada yüklenir."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._states: dict[tuple[str, str], IndicatorState] = {}
+        if self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                for key, d in raw.items():
+                    tic, itv = key.split("|", 1)
+                    self._states[(tic, itv)] = IndicatorState.from_dict(d)
+            except Exception:
+                self._states = {}
+
+    def get(self, ticker: str, interval: str) -> IndicatorState | None:
+        with self._lock:
+            return self._states.get((ticker, interval))
+
+    def sync(self, ticker: str, interval: str, df: pd.DataFrame) -> dict:
+        """
+        Çerçevede durumdan yeni olan barları (ve düzeltilmiş son barı) işler, güncel
+        snapshot'ı döner. Durumun son barı ikili aramayla bulunur; yalnızca o bar ve
+        sonrası işlenir (geçmiş taranmaz). Çerçevede yoksa (arada bar kaçtı) baştan kurulur.
+        """
+        with self._lock:
+            st = self._states.get((ticker, interval))
+            idx = df.index
+            if st is not None and st.ts is not None and isinstance(idx, pd.DatetimeIndex) and len(df):
+                last = pd.Timestamp(st.ts, tz="UTC")
+                last = last.tz_convert(idx.tz) if idx.tz is not None else last.tz_localize(None)
+                pos = int(idx.searchsorted(last))
+                if pos < len(idx) and idx[pos] == last:
+                    return st.extend(df.iloc[pos:])
+                st = None
+            if st is None:
+                st = self._states[(ticker, interval)] = IndicatorState()
+            return st.extend(df)
+
+    def save(self) -> None:
+        with self._lock:
+            raw = {f"{t}|{i}": st.to_dict() for (t, i), st in self._states.items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(raw), encoding="utf-8")
+        os.replace(tmp, self.path)
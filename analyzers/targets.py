@@ -1,40 +1,30 @@
-def normalize_targets(summary: dict, interval: str) -> dict:
+# analyzers/targets.py
+from dataclasses import replace
+import numpy as np
+from .signal import Signal
+
+def minutes_of(itv: str | None) -> float:
+    """interval → dakika ("15m", "1h", "1d", "1wk"); bilinmiyorsa 60."""
+    itv = (itv or "").lower()
+    if itv.endswith("m"): return float(itv[:-1])
+    if itv.endswith("h"): return float(itv[:-1]) * 60.0
+    if itv.endswith("d"): return float(itv[:-1]) * 60.0 * 24.0
+    if itv.endswith("wk"): return float(itv[:-2]) * 60.0 * 24.0 * 7.0
+    return 60.0
+
+def _atr(sig: Signal) -> float:
+    return sig.atr or 0.01  # 0'a bölünme önlemi
+
+def normalize_targets(sig: Signal) -> Signal:
     """
-    build_signal_summary çıktısını yön ile tutarlı hale getirir:
+    Özeti yön ile tutarlı hale getirir (yeni Signal döner, girdi değişmez):
     - Long ise H1/H2 fiyatın üzerinde, stop altında olur.
-    - Short ise H1/H2 fiyatın altında, stop üstünde olur.
+    - Short ise (yalnızca SAT önerisi) H1/H2 fiyatın altında, stop üstünde olur.
     Terslik varsa ATR tabanlı güvenli hedef/stop üretir.
-    Ayrıca ETA (T1'e ulaşım süresi) hesaplar ve okunur formatta döner.
     """
-    s = dict(summary or {})
-    price = float(s.get("price", 0) or 0)
-    atr   = float(s.get("atr", 0) or 0.01)  # 0'a bölünme önlemi
-    t1    = float(s.get("t1", 0) or 0)
-    t2    = float(s.get("t2", 0) or 0)
-    stop  = float(s.get("stop", 0) or 0)
-    bias_text = (s.get("bias_text") or "").upper()
-
-    # interval'i dakika cinsine çevir
-    def minutes_of(itv: str) -> float:
-        itv = (itv or "").lower()
-        if itv.endswith("m"): return float(itv[:-1])
-        if itv.endswith("h"): return float(itv[:-1]) * 60.0
-        if itv.endswith("d"): return float(itv[:-1]) * 60.0 * 24.0
-        if itv.endswith("wk"): return float(itv[:-2]) * 60.0 * 24.0 * 7.0
-        return 60.0  # varsayılan
-
-    # Yön saptama
-    if "SAT" in bias_text and "AL" not in bias_text:
-        side = "short"
-    elif "AL" in bias_text and "SAT" not in bias_text:
-        side = "long"
-    else:
-        # belirsizse long varsayıyoruz
-        side = "long"
-
-    # Long/Short düzeltmeleri
-    def fix_long():
-        nonlocal t1, t2, stop
+    price, atr = sig.price, _atr(sig)
+    t1, t2, stop = sig.t1, sig.t2, sig.stop
+    if sig.side == "long":
         # hedefler ters/yanlışsa ATR tabanlı üret
         if (t1 < price) or (t2 < price) or (t2 <= t1):
             t1 = round(price + 1.0 * atr, 2)
@@ -42,50 +32,44 @@ def normalize_targets(summary: dict, interval: str) -> dict:
         # stop fiyatın altında olmalı
         if stop >= price or stop == 0:
             stop = round(max(price - 1.5 * atr, 0), 2)
-        # alım bölgesi metni
-        s["buy_zone"] = f"{price:.2f} üstü" if price >= t1 else f"{price:.2f} ± {atr:.2f}"
-
-    def fix_short():
-        nonlocal t1, t2, stop
-        # hedefler ters/yanlışsa ATR tabanlı üret (aşağı)
+    else:
         if (t1 > price) or (t2 > price) or (t2 >= t1):
             t1 = round(price - 1.0 * atr, 2)
             t2 = round(price - 2.0 * atr, 2)
-        # stop fiyatın üstünde olmalı
         if stop <= price or stop == 0:
             stop = round(price + 1.5 * atr, 2)
-        # giriş metni (short)
-        s["buy_zone"] = f"{price:.2f} altı" if price <= t1 else f"{price:.2f} ± {atr:.2f}"
+    return replace(sig, t1=t1, t2=t2, stop=stop)
 
-    if side == "long":
-        fix_long()
-    else:
-        fix_short()
-
-    # ETA hesapla (T1'e mesafe/ATR → bar sayısı → süre)
-    dist = abs(t1 - price)
-    bars = max(dist / max(atr, 1e-6), 1.0)   # en az 1 bar
-    minutes = bars * minutes_of(interval)
-
-    # okunabilir ETA
-    if minutes < 90:
-        eta = f"{int(round(minutes))} dk"
-    elif minutes < 24*60:
-        eta = f"{round(minutes/60, 1)} saat"
-    else:
-        eta = f"{round(minutes/(60*24), 1)} gün"
+def normalize_targets_arrays(price, atr, bias, t1, t2, stop) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """normalize_targets'ın dizi sürümü (backtest: bar başına aynı kurallar). Dönüş: (t1, t2, stop)."""
+    atr = np.where(atr == 0, 0.01, atr)
+    short = bias < 0
+    sgn = np.where(short, -1.0, 1.0)
+    with np.errstate(invalid="ignore"):
+        bad = np.where(short, (t1 > price) | (t2 > price) | (t2 >= t1),
+                       (t1 < price) | (t2 < price) | (t2 <= t1))
+        bad_stop = np.where(short, stop <= price, stop >= price) | (stop == 0)
+    t1 = np.where(bad, np.round(price + sgn * atr, 2), t1)
+    t2 = np.where(bad, np.round(price + sgn * 2.0 * atr, 2), t2)
+    stop = np.where(bad_stop, np.where(short, np.round(price + 1.5 * atr, 2),
+                                       np.round(np.maximum(price - 1.5 * atr, 0), 2)), stop)
+    return t1, t2, stop
 
-    # düzenlenmiş alanlar
-    s["t1"] = t1
-    s["t2"] = t2
-    s["stop"] = stop
-    s["eta"] = eta
+# --- gösterim (yalnızca çıktı üretilirken) ---
 
-    # bias_text küçük düzeltmesi
-    orig_bias = s.get("bias_text", "")
-    if side == "short" and "AL" in (orig_bias.upper()):
-        s["bias_text"] = "SAT (kısa eğilim)"
-    elif side == "long" and "SAT" in (orig_bias.upper()):
-        s["bias_text"] = "AL (uzun eğilim)"
+def buy_zone_text(sig: Signal) -> str:
+    """normalize_targets uygulanmış özet için alım/giriş bölgesi metni."""
+    price, atr = sig.price, _atr(sig)
+    if sig.side == "long":
+        return f"{price:.2f} üstü" if price >= sig.t1 else f"{price:.2f} ± {atr:.2f}"
+    return f"{price:.2f} altı" if price <= sig.t1 else f"{price:.2f} ± {atr:.2f}"
 
-    return s
+def eta_text(sig: Signal, interval: str | None) -> str:
+    """T1'e tahmini süre: mesafe/ATR → bar sayısı (en az 1) → interval'e göre dk/saat/gün."""
+    bars = max(abs(sig.t1 - sig.price) / max(_atr(sig), 1e-6), 1.0)
+    minutes = bars * minutes_of(interval)
+    if minutes < 90:
+        return f"{int(round(minutes))} dk"
+    if minutes < 24 * 60:
+        return f"{round(minutes / 60, 1)} saat"
+    return f"{round(minutes / (60 * 24), 1)} gün"
@@ -0,0 +1,300 @@
+# backtest.py
+"""
+Skorlama kuralının (indikatör eğilimi + formasyon hedefleri) ileriye dönük testi.
+Her sembolün her geçmiş barında build_signal_summary + normalize_targets'ın ürettiği
+hedef/stop vektörel olarak hesaplanır; sonraki `horizon` bar içinde T1/T2/stop'a hangisinin
+önce değdiği simüle edilir. Sonuç: isabet oranları, T1'e ulaşma süresi ve skor kalibrasyonu.
+
+Notlar:
+- İndikatörler tüm geçmiş üzerinden bir kez hesaplanır (canlıdaki 60d pencerenin EMA ısınma
+  farkı yok sayılır); formasyonlar yalnızca tam pencereli barlarda (WARMUP) değerlendirilir.
+- Giriş sinyal barının kapanışı; aynı barda hem hedef hem stop görülürse stop sayılır.
+- Ardışık barların sinyalleri örtüşür (bağımsız değildir); oranlar bunu düzeltmez.
+Kullanım: python -m backtest [--specs 1d:10y 60m:730d] [--horizon N] [--limit N]
+"""
+import argparse
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view as windows
+
+import metrics
+from analyzers.indicators import add_indicators
+from analyzers.patterns_panel import channel_eval, double_bottom_eval
+from analyzers.scoring import indicator_bias_panel
+from analyzers.signal import PATTERN_CODES, PATTERN_NAMES
+from analyzers.targets import minutes_of, normalize_targets_arrays
+
+logger = logging.getLogger(__name__)
+
+# varsayılan dilimler: Yahoo'nun verdiği en uzun geçmiş (60m en fazla 730 gün)
+DEFAULT_SPECS = [("1d", "10y"), ("60m", "730d")]
+# ufuk (bar): günlükte ~1 ay, gün içinde ~2 hafta (BIST seansı 8 saat)
+HORIZON = {"1d": 20, "60m": 80, "30m": 160, "15m": 320}
+WARMUP = 200            # en uzun formasyon penceresi (ikili dip)
+CHUNK = 1024            # bar; (bar, pencere) dizilerinin bellek sınırı
+SCORE_EDGES = (50, 60, 70, 80, 90)
+BUCKET_LABELS = ("<50", "50-59", "60-69", "70-79", "80-89", "90+")
+OUTCOMES = ("n", "t1", "t2", "stop", "open")
+SIDES = ("long", "short")
+
+# formasyon → PATTERN_CODES (yalnızca long formasyonlar özete girer)
+_PENNANT, _TRIANGLE, _DOUBLE = (PATTERN_CODES["Bullish Pennant/Flag Breakout"],
+                                PATTERN_CODES["Ascending/Symmetric Triangle Breakout"],
+                                PATTERN_CODES["Double Bottom Breakout"])
+
+@dataclass
+class BacktestStats:
+    interval: str
+    horizon: int
+    symbols: int = 0
+    # (yön, skor kovası, OUTCOMES) sayaçları
+    counts: np.ndarray = field(default=None)
+    # (formasyon kodu + 1, OUTCOMES); satır 0: formasyonsuz (ATR tabanlı) sinyaller
+    patterns: np.ndarray = field(default=None)
+    # (yön, kova) ufuk sonu getiri toplamı, yöne göre işaretli (short'ta düşüş pozitif)
+    ret_sum: np.ndarray = field(default=None)
+    # (yön, bar) T1'e ulaşma süresi histogramı
+    t1_bars: np.ndarray = field(default=None)
+
+    def __post_init__(self):
+        nb = len(SCORE_EDGES) + 1
+        if self.counts is None:
+            self.counts = np.zeros((2, nb, len(OUTCOMES)), dtype=np.int64)
+        if self.patterns is None:
+            self.patterns = np.zeros((len(PATTERN_NAMES) + 1, len(OUTCOMES)), dtype=np.int64)
+        if self.ret_sum is None:
+            self.ret_sum = np.zeros((2, nb))
+        if self.t1_bars is None:
+            self.t1_bars = np.zeros((2, self.horizon + 1), dtype=np.int64)
+
+    def merge(self, other: "BacktestStats") -> "BacktestStats":
+        self.symbols += other.symbols
+        self.counts += other.counts
+        self.patterns += other.patterns
+        self.ret_sum += other.ret_sum
+        self.t1_bars += other.t1_bars
+        return self
+
+# --- bar başına sinyal (build_signal_summary + normalize_targets, vektörel) ---
+
+def _full_windows(a: np.ndarray, W: int, t: np.ndarray) -> np.ndarray:
+    """t konumlarında biten W barlık pencereler (R, W); görünüm, kopya yok."""
+    return windows(a, W)[t - W + 1]
+
+_COLUMNS = ("high", "low", "close", "volume", "atr", "rsi", "macd", "macd_signal", "adx", "cmf", "vol_ma20")
+
+def columns(ind: pd.DataFrame) -> dict[str, np.ndarray]:
+    return {c: ind[c].to_numpy(dtype="float64") for c in _COLUMNS}
+
+def signals(col: dict[str, np.ndarray], t: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    col: add_indicators çıktısının sütunları (columns); t: değerlendirilecek bar konumları
+    (>= WARMUP - 1). Dönüş: bar başına price, atr, bias, score, pattern ve normalize
+    edilmiş t1/t2/stop — build_signal_summary + normalize_targets ile aynı kurallar.
+    """
+    v = {k: a[t] for k, a in col.items()}
+    price, atr = v["close"], v["atr"]
+    bias, score = indicator_bias_panel(v)
+    R = len(t)
+    hi, lo, cl, vo = col["high"], col["low"], col["close"], col["volume"]
+
+    # formasyonlar: patterns_panel'in (R, W) değerlendiricileri, satırlar = barlar
+    found = []
+    for W, shrink, conf0, conf_max, t_mult, stop_n, tri in ((50, 0.7, 0.6, 0.9, (0.6, 1.0), 5, False),
+                                                             (80, 0.65, 0.55, 0.85, (0.8, 1.2), 6, True)):
+        x = np.arange(W, dtype="float64")[None, :]
+        valid = np.ones((1, W), dtype=bool)
+        found.append(channel_eval(_full_windows(hi, W, t), _full_windows(lo, W, t), _full_windows(cl, W, t),
+                                  _full_windows(vo, W, t), x, valid, np.full(R, W), shrink, conf0, conf_max,
+                                  t_mult, stop_n, tri))
+    valid = np.ones((1, WARMUP), dtype=bool)
+    db = double_bottom_eval(_full_windows(hi, WARMUP, t), _full_windows(lo, WARMUP, t),
+                            _full_windows(cl, WARMUP, t), valid)
+
+    # en güvenli formasyon (eşitlikte detect_all_patterns sırası); yalnızca long ise özete girer
+    pen, tri = found
+    conf = np.stack([np.where(pen["long"] | pen["short"], pen["conf"], -np.inf),
+                     np.where(tri["long"] | tri["short"], tri["conf"], -np.inf),
+                     np.where(db["hit"], 0.6, -np.inf)])
+    best = np.argmax(conf, axis=0)
+    is_long = np.stack([pen["long"], tri["long"], db["hit"]])[best, np.arange(R)]
+    use = np.isfinite(conf.max(axis=0)) & is_long
+    pick = lambda key: np.stack([pen[key], tri[key], db[key]])[best, np.arange(R)]
+    p_stop = np.stack([pen["stop"], tri["stop"], db["bottom"]])[best, np.arange(R)]
+
+    t1 = np.where(use, np.round(pick("t1"), 2), np.round(price + atr * 1.5, 2))
+    t2 = np.where(use, np.round(pick("t2"), 2), np.round(price + atr * 3.0, 2))
+    stop = np.where(use, np.round(p_stop, 2), np.round(price - atr * 1.2, 2))
+    score = np.where(use, np.minimum(score + conf.max(axis=0) * 20, 100.0), score)
+    pattern = np.where(use, np.array([_PENNANT, _TRIANGLE, _DOUBLE])[best], -1)
+    t1, t2, stop = normalize_targets_arrays(price, atr, bias, t1, t2, stop)
+    return {"price": price, "atr": atr, "bias": bias, "score": score, "pattern": pattern,
+            "t1": t1, "t2": t2, "stop": stop}
+
+# --- sonuç simülasyonu ---
+
+def _first(mask: np.ndarray) -> np.ndarray:
+    """Satır başına ilk True sütunu; yoksa sütun sayısı."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+def simulate(high, low, close, t, sig: dict, horizon: int) -> dict[str, np.ndarray]:
+    """t barında girilen sinyal için sonraki `horizon` barda T1/T2/stop sırası."""
+    fh = windows(high[1:], horizon)[t]
+    fl = windows(low[1:], horizon)[t]
+    short = (sig["bias"] < 0)[:, None]
+    with np.errstate(invalid="ignore"):
+        f1 = _first(np.where(short, fl <= sig["t1"][:, None], fh >= sig["t1"][:, None]))
+        f2 = _first(np.where(short, fl <= sig["t2"][:, None], fh >= sig["t2"][:, None]))
+        fs = _first(np.where(short, fh >= sig["stop"][:, None], fl <= sig["stop"][:, None]))
+    # aynı barda stop önce sayılır (muhafazakâr)
+    hit1, hit2 = f1 < fs, f2 < fs
+    stopped = (fs < horizon) & ~hit1
+    sgn = np.where(short[:, 0], -1.0, 1.0)
+    ret = sgn * (close[t + horizon] - close[t]) / close[t]
+    return {"t1": hit1, "t2": hit2, "stop": stopped, "open": ~(hit1 | stopped), "t1_bars": f1 + 1, "ret": ret}
+
+def backtest_frame(df: pd.DataFrame, interval: str, horizon: int | None = None) -> BacktestStats:
+    """Tek sembol (normalize OHLCV) → istatistik. Saf CPU işi; süreç havuzunda çalışır."""
+    horizon = horizon or HORIZON.get(interval, 40)
+    st = BacktestStats(interval, horizon)
+    if df is None or len(df) < WARMUP + horizon + 40:
+        return st
+    col = columns(add_indicators(df))
+    T = len(col["close"])
+    hi, lo, cl = col["high"], col["low"], col["close"]
+    st.symbols = 1
+    nb = len(SCORE_EDGES) + 1
+    for a in range(WARMUP - 1, T - horizon, CHUNK):
+        t = np.arange(a, min(a + CHUNK, T - horizon))
+        sig = signals(col, t)
+        ok = np.isfinite(sig["price"]) & np.isfinite(sig["atr"]) & (sig["price"] > 0)
+        if not ok.all():
+            t, sig = t[ok], {k: v[ok] for k, v in sig.items()}
+        out = simulate(hi, lo, cl, t, sig, horizon)
+        side = (sig["bias"] < 0).astype(np.int64)
+        bucket = np.searchsorted(SCORE_EDGES, sig["score"], side="right")
+        cell = side * nb + bucket
+        flags = [np.ones(len(t), dtype=bool), out["t1"], out["t2"], out["stop"], out["open"]]
+        for j, f in enumerate(flags):
+            st.counts[..., j] += np.bincount(cell[f], minlength=2 * nb).reshape(2, nb)
+            st.patterns[:, j] += np.bincount(sig["pattern"][f] + 1, minlength=len(PATTERN_NAMES) + 1)
+        st.ret_sum += np.bincount(cell, weights=out["ret"], minlength=2 * nb).reshape(2, nb)
+        for s in (0, 1):
+            m = out["t1"] & (side == s)
+            st.t1_bars[s] += np.bincount(out["t1_bars"][m], minlength=horizon + 1)[:horizon + 1]
+    return st
+
+def backtest_frames(frames: list[pd.DataFrame], interval: str, horizon: int | None = None) -> BacktestStats:
+    """Bir grup sembol (işçi başına tek görev → pickle/planlama yükü az)."""
+    st = BacktestStats(interval, horizon or HORIZON.get(interval, 40))
+    for df in frames:
+        st.merge(backtest_frame(df, interval, st.horizon))
+    return st
+
+# --- evren ---
+
+async def run_backtest(tickers: list[str], specs=None, horizon: int | None = None,
+                       group: int = 8) -> dict[str, BacktestStats]:
+    """Evrenin geçmişini indirir (depo/sınırlayıcı üzerinden) ve dilim başına istatistik döner."""
+    from compute import run_cpu
+    from data import fetch_frames
+
+    specs = [tuple(s) for s in (specs or DEFAULT_SPECS)]
+    with metrics.timer("backtest_fetch"):
+        by_spec = await fetch_frames(list(tickers), specs)
+    out = {}
+    for itv, per in specs:
+        frames = [df for t in tickers if (df := by_spec.get((itv, per), {}).get(t)) is not None]
+        st = BacktestStats(itv, horizon or HORIZON.get(itv, 40))
+        parts = [frames[i:i + group] for i in range(0, len(frames), group)]
+        with metrics.timer("backtest", interval=itv):
+            for res in await asyncio.gather(*(run_cpu(backtest_frames, p, itv, st.horizon) for p in parts)):
+                st.merge(res)
+        out[f"{itv}/{per}"] = st
+        logger.info(f"Backtest {itv}/{per}: {st.symbols} sembol, {int(st.counts[..., 0].sum())} sinyal")
+    return out
+
+# --- rapor ---
+
+def _pct(a, b) -> str:
+    return f"{100.0 * a / b:5.1f}%" if b else "    -"
+
+def _median_bars(hist: np.ndarray) -> float | None:
+    n = hist.sum()
+    if not n:
+        return None
+    return float(np.searchsorted(np.cumsum(hist), (n + 1) / 2))
+
+def _duration(bars: float | None, interval: str) -> str:
+    if bars is None:
+        return "-"
+    if interval == "1d":
+        return f"{bars:.0f} bar (~{bars:.0f} işlem günü)"
+    # gün içi: seans saati cinsinden (gece boşlukları sayılmaz)
+    return f"{bars:.0f} bar (~{bars * minutes_of(interval) / 60:.0f} seans saati)"
+
+def report_text(results: dict[str, BacktestStats]) -> str:
+    """Düz metin özet (/backtest ve CLI)."""
+    lines = []
+    for key, st in results.items():
+        n_all = int(st.counts[..., 0].sum())
+        lines.append(f"== {key} | {st.symbols} sembol | {n_all} sinyal | ufuk {st.horizon} bar ==")
+        for s, name in enumerate(SIDES):
+            c = st.counts[s].sum(axis=0)
+            if not c[0]:
+                continue
+            lines.append(f"{name:5s} n={c[0]:<7d} T1 {_pct(c[1], c[0])}  T2 {_pct(c[2], c[0])}  "
+                         f"stop {_pct(c[3], c[0])}  açık {_pct(c[4], c[0])}  "
+                         f"T1 süresi (medyan): {_duration(_median_bars(st.t1_bars[s]), st.interval)}")
+        lines.append("Skor kalibrasyonu (long+short):")
+        lines.append("  skor      n       T1      stop   ort.getiri")
+        tot = st.counts.sum(axis=0)
+        rets = st.ret_sum.sum(axis=0)
+        for b, label in enumerate(BUCKET_LABELS):
+            n = tot[b, 0]
+            if n:
+                lines.append(f"  {label:6s} {n:7d}  {_pct(tot[b, 1], n)}  {_pct(tot[b, 3], n)}  {100 * rets[b] / n:+7.2f}%")
+        lines.append("Formasyon:")
+        for code in range(-1, len(PATTERN_NAMES)):
+            row = st.patterns[code + 1]
+            if row[0]:
+                name = "formasyonsuz (ATR)" if code < 0 else PATTERN_NAMES[code]
+                lines.append(f"  {name[:32]:32s} n={row[0]:<7d} T1 {_pct(row[1], row[0])}  stop {_pct(row[3], row[0])}")
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+def parse_specs(tokens: list[str]) -> list[tuple[str, str]]:
+    """["1d:5y", "60m"] → [("1d", "5y"), ("60m", "730d")]; period verilmezse varsayılan en uzun geçmiş."""
+    out = []
+    for tok in tokens:
+        itv, _, per = tok.strip().lower().partition(":")
+        if itv not in HORIZON:
+            raise ValueError(f"Desteklenmeyen interval: {itv} ({', '.join(HORIZON)})")
+        out.append((itv, per or dict(DEFAULT_SPECS).get(itv, "60d")))
+    return out
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--specs", nargs="*", default=[f"{i}:{p}" for i, p in DEFAULT_SPECS])
+    ap.add_argument("--horizon", type=int)
+    ap.add_argument("--universe", help="bist30, bist100, bist250, birlesik, tum (varsayılan UNIVERSE env)")
+    ap.add_argument("--limit", type=int, help="evrenin ilk N sembolü")
+    a = ap.parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+    from compute import shutdown_pool
+    from symbols import universe
+    tickers = universe(a.universe)
+    tickers = tickers[:a.limit] if a.limit else tickers
+    try:
+        res = asyncio.run(run_backtest(tickers, parse_specs(a.specs), a.horizon))
+    finally:
+        shutdown_pool()
+    print(report_text(res))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# bench/ — ağsız mikro-benchmark'lar: python -m bench.<modül>
@@ -0,0 +1,53 @@
+# bench/backtest.py
+"""
+Backtest motoru (ağsız): sentetik evrende tüm barlarda sinyal + sonuç simülasyonu.
+Kullanım: python -m bench.backtest [--symbols 250] [--daily-bars 2500] [--hourly-bars 4200] [--out sonuc.json]
+"""
+import argparse
+import asyncio
+import time
+
+from backtest import BacktestStats, HORIZON, backtest_frames
+from compute import get_pool, run_cpu, shutdown_pool
+from .common import emit, meta
+from .synthetic import make_ohlcv, normalized, shape_for, stable_seed, universe
+
+async def _run(frames, interval: str, group: int) -> BacktestStats:
+    st = BacktestStats(interval, HORIZON[interval])
+    parts = [frames[i:i + group] for i in range(0, len(frames), group)]
+    for res in await asyncio.gather(*(run_cpu(backtest_frames, p, interval, st.horizon) for p in parts)):
+        st.merge(res)
+    return st
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--symbols", type=int, default=250)
+    # BIST: 10 yıl ≈ 2500 işlem günü; 730 gün × 8 saatlik seans ≈ 4200 saatlik bar
+    ap.add_argument("--daily-bars", type=int, default=2500)
+    ap.add_argument("--hourly-bars", type=int, default=4200)
+    ap.add_argument("--group", type=int, default=8, help="işçi görevi başına sembol")
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+
+    out = {"meta": meta(a)}
+    try:
+        pool = get_pool()
+        if pool is not None:
+            pool.warm()
+        for interval, bars in (("1d", a.daily_bars), ("60m", a.hourly_bars)):
+            frames = [normalized(make_ohlcv(bars, interval, stable_seed("bt", t, interval), shape_for(t)))
+                      for t in universe(a.symbols)]
+            t0 = time.perf_counter()
+            st = asyncio.run(_run(frames, interval, a.group))
+            dt = time.perf_counter() - t0
+            signals = int(st.counts[..., 0].sum())
+            out[interval] = {"seconds": dt, "symbols": st.symbols, "bars_per_symbol": bars, "signals": signals,
+                             "signals_per_s": signals / dt if dt else None,
+                             "t1_rate": float(st.counts[..., 1].sum() / max(signals, 1))}
+    finally:
+        shutdown_pool()
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# bench/botapi.py
+"""
+Bot API'nin yerel taklidi (ağsız): PTB'nin istek nesnesi yerine takılır. Her metoda en
+küçük geçerli yanıtı verir; getUpdates, `push` ile kuyruğa konan güncellemeleri döner.
+"""
+import asyncio
+import json
+import time
+from telegram.request import BaseRequest
+
+class LocalRequest(BaseRequest):
+    """
+    latency: çağrı başına yapay gecikme (sn, gerçek API'nin gidiş-dönüşü yerine).
+    on_call(metot, parametreler, an): her çağrıda (yanıttan önce) çağrılır.
+    """
+
+    def __init__(self, latency: float = 0.0, on_call=None):
+        self.latency = latency
+        self.on_call = on_call
+        self.calls: list[str] = []
+        self._updates: asyncio.Queue | None = None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def push(self, update: dict) -> None:
+        """getUpdates ile dağıtılacak güncelleme (Bot API JSON biçiminde)."""
+        if self._updates is None:
+            self._updates = asyncio.Queue()
+        self._updates.put_nowait(update)
+
+    async def _take(self, timeout: float, limit: int) -> list[dict]:
+        if self._updates is None:
+            self._updates = asyncio.Queue()
+        try:
+            out = [await asyncio.wait_for(self._updates.get(), timeout=max(timeout, 0.01))]
+        except asyncio.TimeoutError:
+            return []
+        while len(out) < limit and not self._updates.empty():
+            out.append(self._updates.get_nowait())
+        return out
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None, write_timeout=None,
+                         connect_timeout=None, pool_timeout=None):
+        name = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data is not None else {}
+        self.calls.append(name)
+        if self.on_call is not None:
+            self.on_call(name, params, time.perf_counter())
+        if name == "getUpdates":
+            # uzun yoklama: kuyruk boşsa en çok 1 sn bekle (kapanış gecikmesin)
+            res = await self._take(min(float(params.get("timeout") or 0), 1.0), int(params.get("limit") or 100))
+            return 200, json.dumps({"ok": True, "result": res}).encode()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if name == "getMe":
+            res = {"id": 1, "is_bot": True, "first_name": "bench", "username": "bench_bot",
+                   "can_join_groups": True, "can_read_all_group_messages": False,
+                   "supports_inline_queries": False}
+        elif name in ("sendMessage", "sendPhoto", "editMessageText"):
+            res = {"message_id": len(self.calls), "date": int(time.time()),
+                   "chat": {"id": int(params.get("chat_id") or 7), "type": "private"}, "text": "ok"}
+            if name == "sendPhoto":
+                res["photo"] = [{"file_id": f"photo-{len(self.calls)}", "file_unique_id": f"u{len(self.calls)}",
+                                 "width": 1, "height": 1}]
+        else:
+            res = True
+        return 200, json.dumps({"ok": True, "result": res}).encode()
+
+def command_update(i: int, chat: int, text: str) -> dict:
+    """Sohbet `chat`'ten gelen komut mesajı (Bot API Update JSON'u)."""
+    cmd = text.split()[0]
+    return {"update_id": i, "message": {
+        "message_id": i, "date": int(time.time()), "chat": {"id": chat, "type": "private"},
+        "from": {"id": chat, "is_bot": False, "first_name": "u"}, "text": text,
+        "entities": [{"type": "bot_command", "offset": 0, "length": len(cmd)}]}}
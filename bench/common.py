@@ -0,0 +1,50 @@
+# bench/common.py
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+def timeit(fn, n: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    ts = []
+    for _ in range(n):
+        t0 = time.perf_counter(); fn(); ts.append(time.perf_counter() - t0)
+    return summarize(ts)
+
+async def atimeit(fn, n: int, warmup: int = 1) -> dict:
+    """fn: argümansız coroutine fabrikası."""
+    for _ in range(warmup):
+        await fn()
+    ts = []
+    for _ in range(n):
+        t0 = time.perf_counter(); await fn(); ts.append(time.perf_counter() - t0)
+    return summarize(ts)
+
+def summarize(ts: list[float]) -> dict:
+    ts = sorted(ts)
+    return {"n": len(ts), "mean_ms": statistics.fmean(ts) * 1e3, "p50_ms": statistics.median(ts) * 1e3,
+            "p95_ms": ts[min(len(ts) - 1, int(len(ts) * 0.95))] * 1e3, "min_ms": ts[0] * 1e3}
+
+def meta(args=None) -> dict:
+    """Karşılaştırma için çalıştırma bilgisi."""
+    import numpy, pandas
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent.parent, timeout=5).stdout.strip() or None
+    except Exception:
+        rev = None
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "git": rev, "python": sys.version.split()[0],
+            "numpy": numpy.__version__, "pandas": pandas.__version__, "platform": platform.platform(),
+            "cpus": os.cpu_count(), "args": vars(args) if args is not None else None}
+
+def emit(out: dict, path: str | None) -> None:
+    text = json.dumps(out, indent=2, ensure_ascii=False, default=str)
+    if path:
+        Path(path).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
@@ -0,0 +1,68 @@
+# bench/fakeprovider.py
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from providers import FrameProvider
+from timeframes import period_start
+from .synthetic import TZ, make_ohlcv, shape_for, stable_seed
+
+class FakeProvider(FrameProvider):
+    """
+    yf.download yerine geçen ağsız sağlayıcı (data.set_provider ile takılır).
+    Çerçeveler sembol+interval'e göre deterministik üretilir ve "şimdi"ye kadar kapanmış
+    barlarla biter. latency/jitter: çağrı başına gecikme (sn); failure_rate: çağrının
+    istisna fırlatma olasılığı; empty_rate: sembolün boş dönme olasılığı.
+    """
+    name = "fake"
+
+    def __init__(self, bars: int = 600, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, empty_rate: float = 0.0, seed: int = 0, shapes_every: int = 4):
+        super().__init__({})
+        self.bars = bars
+        self.latency, self.jitter = latency, jitter
+        self.failure_rate, self.empty_rate = failure_rate, empty_rate
+        self.seed = seed
+        self.shapes_every = shapes_every
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+        self._made: dict[tuple[str, str], pd.DataFrame] = {}
+        self._end = pd.Timestamp.now(tz=TZ).floor("min")
+
+    def frame(self, ticker: str, interval: str) -> pd.DataFrame:
+        key = (ticker, interval)
+        df = self._made.get(key)
+        if df is None:
+            df = make_ohlcv(self.bars, interval, stable_seed(self.seed, ticker, interval),
+                            shape_for(ticker, self.shapes_every), end=self._end)
+            self._made[key] = df
+        return df
+
+    def download(self, tickers: list[str], interval: str,
+                 period: str | None = None, start=None) -> dict[str, pd.DataFrame]:
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self._rng.random() < self.failure_rate
+            empty = [t for t in tickers if self._rng.random() < self.empty_rate]
+        # üretim kilit dışında ve çağrıya özel sözlükte: eşzamanlı farklı interval
+        # indirmeleri birbirinin çerçevesini ezmez, büyük toplu istek küçükleri bekletmez
+        frames = {t: self.frame(t, interval) for t in tickers if t not in empty}
+        if delay:
+            time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.failures += 1
+            raise RuntimeError("fake provider: 429 Too Many Requests")
+        if start is None and period:
+            # Yahoo gibi: period → başlangıç (günlük index tz'sizdir)
+            start = period_start(period, self._end if interval != "1d" else self._end.tz_localize(None))
+        self.calls.append((tuple(tickers), interval, period, start))
+        return FrameProvider(frames).download(list(frames), interval, period, start)
+
+def install() -> None:
+    """Ayrı süreçler (tarama işçileri, SHARD_SETUP) için: FAKE_BARS/FAKE_LATENCY env'iyle takar."""
+    import data
+    data.set_provider(FakeProvider(bars=int(os.getenv("FAKE_BARS", "600")),
+                                   latency=float(os.getenv("FAKE_LATENCY", "0"))))
@@ -0,0 +1,139 @@
+# bench/load.py
+"""
+Yük testi (ağsız): güncellemeler yerel Bot API taklidinin getUpdates'inden gerçek
+Updater → Application yolundan geçer; yanıtlar yine taklide gider (çağrı başına
+--api-latency gecikmeyle). Aynı iş yükü sırayla işleme (CONCURRENT_UPDATES=0) ve
+eşzamanlı işlemeyle ayrı süreçlerde koşar. Komut türüne göre ilk yanıt (onay mesajı)
+ve bitiş (sohbetteki son çağrı) gecikmeleri ile kapanışta bekletilen iş sayısı raporlanır.
+Kullanım: python -m bench.load [--updates 200] [--rate 50] [--concurrency 0 32] [--out sonuc.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .common import emit, meta, summarize
+
+TICKERS = ("THYAO", "ASELS", "GARAN", "AKBNK", "EREGL", "SISE", "KCHOL", "BIMAS")
+
+def workload(n: int) -> list[tuple[str, str]]:
+    """(tür, komut): çoğunluk etkileşimli (/score, /analiz, /start), araya toplu /top10."""
+    out = []
+    for i in range(n):
+        t = TICKERS[i % len(TICKERS)]
+        if i % 25 == 0:
+            out.append(("top10", "/top10 bist30 60m 60d"))
+        elif i % 5 == 1:
+            out.append(("analiz", f"/analiz {t} 60m 60d"))
+        elif i % 5 == 3:
+            out.append(("start", "/start"))
+        else:
+            out.append(("score", f"/score {t} 1d 180d"))
+    return out
+
+def _child(a) -> None:
+    os.environ.update({"OHLCV_STORE": "off", "SCHED": "off", "WARMUP": "off", "METRICS_PORT": "",
+                       "YF_RATE": "1000", "YF_BURST": "1000", "SHUTDOWN_GRACE": str(a.grace),
+                       "CONCURRENT_UPDATES": str(a.concurrency)})
+    import main
+    import data
+    from priority import JOBS
+    from .botapi import LocalRequest, command_update
+    from .fakeprovider import FakeProvider
+    data.set_provider(FakeProvider(bars=a.bars, latency=a.data_latency))
+
+    first: dict[int, float] = {}
+    last: dict[int, float] = {}
+
+    def on_call(name, params, t):
+        chat = params.get("chat_id")
+        if chat is not None:
+            first.setdefault(int(chat), t)
+            last[int(chat)] = t
+
+    req, updates = LocalRequest(a.api_latency, on_call), LocalRequest()
+    app = main.build_app("1:bench", request=req, updates_request=updates)
+    jobs = workload(a.updates)
+    arrive: dict[int, float] = {}
+
+    async def run():
+        await app.initialize()
+        await app.post_init(app)
+        await app.updater.start_polling(poll_interval=0, timeout=1)
+        await app.start()
+        t0 = time.perf_counter()
+        for i, (_, text) in enumerate(jobs):
+            chat = 1000 + i
+            arrive[chat] = time.perf_counter()
+            updates.push(command_update(i + 1, chat, text))
+            await asyncio.sleep(1 / a.rate)
+        # bitiş: her sohbet yanıt aldı, iş kalmadı ve kısa süre yeni çağrı yok
+        n = -1
+        while len(first) < len(jobs) or JOBS.active() or n != len(req.calls):
+            n = len(req.calls)
+            await asyncio.sleep(0.3)
+        wall = time.perf_counter() - t0
+
+        # kapanış sırasında süren taramaların beklenmesi: bir toplu iş daha başlatıp hemen kapat
+        updates.push(command_update(len(jobs) + 1, 999, "/top10 bist100 60m 60d"))
+        while not JOBS.active():
+            await asyncio.sleep(0.05)
+        t1 = time.perf_counter()
+        await app.updater.stop()
+        await app.stop()
+        await app.post_stop(app)
+        drain = time.perf_counter() - t1
+        drained_reply = 999 in last and last[999] > t1
+        await app.shutdown()
+        await app.post_shutdown(app)
+        return wall, drain, drained_reply
+
+    wall, drain, drained_reply = asyncio.run(run())
+    by_kind: dict[str, dict] = {}
+    for i, (kind, _) in enumerate(jobs):
+        chat = 1000 + i
+        d = by_kind.setdefault(kind, {"first": [], "done": []})
+        d["first"].append(first[chat] - arrive[chat])
+        d["done"].append(last[chat] - arrive[chat])
+    print(json.dumps({
+        "concurrency": a.concurrency, "wall_s": wall, "updates_per_s": len(jobs) / wall,
+        "api_calls": len(req.calls), "shutdown_drain_s": drain, "drained_scan_replied": drained_reply,
+        "latency": {k: {"first_reply": summarize(v["first"]), "done": summarize(v["done"])} for k, v in by_kind.items()},
+    }))
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--updates", type=int, default=200)
+    ap.add_argument("--rate", type=float, default=50, help="güncelleme/sn geliş hızı")
+    ap.add_argument("--concurrency", nargs="*", default=["0", "32"], help="CONCURRENT_UPDATES değerleri")
+    ap.add_argument("--api-latency", type=float, default=0.02, help="Bot API çağrı gecikmesi (sn)")
+    ap.add_argument("--data-latency", type=float, default=0.05, help="sahte sağlayıcı indirme gecikmesi (sn)")
+    ap.add_argument("--bars", type=int, default=600)
+    ap.add_argument("--grace", type=float, default=60, help="SHUTDOWN_GRACE")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+    if a.child:
+        a.concurrency = a.concurrency[0]
+        _child(a)
+        return {}
+
+    root = Path(__file__).resolve().parent.parent
+    out = {"meta": meta(a), "runs": []}
+    for c in a.concurrency:
+        cmd = [sys.executable, "-m", "bench.load", "--child", "--concurrency", str(c),
+               "--updates", str(a.updates), "--rate", str(a.rate), "--api-latency", str(a.api_latency),
+               "--data-latency", str(a.data_latency), "--bars", str(a.bars), "--grace", str(a.grace)]
+        p = subprocess.run(cmd, cwd=root, capture_output=True, text=True, timeout=1800)
+        if p.returncode:
+            raise RuntimeError(f"alt süreç hatası:\n{p.stderr[-2000:]}")
+        out["runs"].append(json.loads(p.stdout.strip().splitlines()[-1]))
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
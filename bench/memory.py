@@ -0,0 +1,73 @@
+# bench/memory.py
+"""
+Bellek benchmark'ı (ağsız): aynı evren × dilimler için birleşik TOP 10 taraması normal
+modda ve düşük bellek modunda (LOW_MEMORY=1) ayrı süreçlerde çalıştırılır; her biri için
+tepe RSS (ru_maxrss), import sonrası taban ve süre raporlanır. Hesap bot sürecinde yapılır
+(COMPUTE_WORKERS=0) ki tepe bellek tek süreçte ölçülsün.
+Kullanım: python -m bench.memory [--symbols 500] [--bars 2000] [--chunk 100] [--out sonuc.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+SPECS = [("15m", "14d"), ("30m", "30d"), ("60m", "60d"), ("90m", "90d")]
+
+def _rss_mb() -> float:
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: KB
+
+def _child(a) -> None:
+    import asyncio
+    from .fakeprovider import install
+    install()
+    from compute import LOW_MEMORY
+    from fusion import fuse
+    from scanner import scan_fused, scan_presets
+    base = _rss_mb()
+    tickers = [f"SYN{i:05d}.IS" for i in range(a.symbols)]
+
+    async def run():
+        if LOW_MEMORY:
+            return await scan_fused(tickers, SPECS, k=10)
+        return fuse(await scan_presets(tickers, SPECS), SPECS)[:10]
+
+    t0 = time.perf_counter()
+    rows = asyncio.run(run())
+    print(json.dumps({"low_memory": LOW_MEMORY, "seconds": time.perf_counter() - t0, "base_rss_mb": base,
+                      "peak_rss_mb": _rss_mb(), "top": rows["ticker"].tolist()}))
+
+def _run(a, low: bool) -> dict:
+    env = dict(os.environ, OHLCV_STORE="off", YF_RATE="1000", YF_BURST="1000", COMPUTE_WORKERS="0",
+               SCAN_WORKERS="0", FAKE_BARS=str(a.bars), FAKE_LATENCY="0",
+               LOW_MEMORY="1" if low else "0", LOW_MEMORY_CHUNK=str(a.chunk))
+    cmd = [sys.executable, "-m", "bench.memory", "--child", "--symbols", str(a.symbols)]
+    res = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+    out = json.loads(res.stdout.strip().splitlines()[-1])
+    out["scan_rss_mb"] = out["peak_rss_mb"] - out["base_rss_mb"]
+    return out
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--symbols", type=int, default=500)
+    ap.add_argument("--bars", type=int, default=2000, help="sahte sağlayıcının taban bar sayısı")
+    ap.add_argument("--chunk", type=int, default=100, help="LOW_MEMORY_CHUNK")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+    if a.child:
+        _child(a)
+        return {}
+
+    from .common import emit, meta
+    out = {"meta": meta(a), "specs": [f"{i}/{p}" for i, p in SPECS],
+           "normal": _run(a, False), "low_memory": _run(a, True)}
+    out["same_top10"] = out["normal"]["top"] == out["low_memory"]["top"]
+    out["peak_ratio"] = out["low_memory"]["peak_rss_mb"] / out["normal"]["peak_rss_mb"]
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
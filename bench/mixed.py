@@ -0,0 +1,87 @@
+# bench/mixed.py
+"""
+Karışık yük benchmark'ı (ağsız): arka planda toplu taramalar sürerken /analiz yolunun
+(indir + özet + grafik) gecikmesi. Aynı yük öncelik sınıflarıyla ve sınıfsız (her şey
+toplu sınıfta, FIFO) ölçülür.
+Kullanım: python -m bench.mixed [--symbols 250] [--scans 2] [--requests 20] [--out sonuc.json]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# hız sınırı üretimdeki varsayılanlarla (YF_RATE/YF_BURST) kalır: kuyruk beklemesi ölçümün parçası
+os.environ.setdefault("OHLCV_STORE", "off")
+
+import cache
+import data
+from compute import get_pool, shutdown_pool
+from priority import BULK, INTERACTIVE, priority_class
+from scanner import analyze_ticker, scan_presets
+from .common import emit, meta, summarize
+from .fakeprovider import FakeProvider
+from .synthetic import universe
+
+def _clear() -> None:
+    for c in (cache.SUMMARIES, cache.ANALYSES, cache.FETCHES, cache.SCANS):
+        c.invalidate()
+
+async def _interactive(tickers: list[str], gap: float, cls: int) -> list[float]:
+    ts = []
+    for t in tickers:
+        t0 = time.perf_counter()
+        with priority_class(cls):
+            await analyze_ticker(t, "60m", "60d", render=True)
+        ts.append(time.perf_counter() - t0)
+        await asyncio.sleep(gap)
+    return ts
+
+async def _bulk(tickers: list[str], scans: int, specs) -> None:
+    with priority_class(BULK):
+        for i in range(scans):
+            cache.SUMMARIES.invalidate(); cache.FETCHES.invalidate()
+            await scan_presets(tickers, specs)
+
+async def _scenario(a, load: bool, cls: int) -> dict:
+    _clear()
+    data.set_provider(FakeProvider(bars=a.bars, latency=a.latency, jitter=a.latency))
+    # /analiz sembolleri evrenin dışından: tarama önbelleğinden yararlanmasın
+    scan_tickers = universe(a.symbols)
+    ask = [f"ASK{i:03d}.IS" for i in range(a.requests)]
+    specs = [("15m", "14d"), ("60m", "60d"), ("1d", "180d")]
+    bulk = asyncio.ensure_future(_bulk(scan_tickers, a.scans, specs)) if load else None
+    t0 = time.perf_counter()
+    if bulk is not None:
+        await asyncio.sleep(a.lead)   # taramalar kuyruğu doldursun
+    ts = await _interactive(ask, a.gap, cls)
+    if bulk is not None:
+        await bulk
+    return {"analiz": summarize(ts), "seconds": time.perf_counter() - t0}
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--symbols", type=int, default=250)
+    ap.add_argument("--bars", type=int, default=600)
+    ap.add_argument("--scans", type=int, default=2, help="arka arkaya toplu tarama sayısı")
+    ap.add_argument("--requests", type=int, default=20, help="/analiz isteği sayısı")
+    ap.add_argument("--gap", type=float, default=0.2, help="/analiz istekleri arası (sn)")
+    ap.add_argument("--lead", type=float, default=0.5, help="taramalar başladıktan sonra ilk /analiz (sn)")
+    ap.add_argument("--latency", type=float, default=0.05, help="sahte sağlayıcı çağrı gecikmesi (sn)")
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+
+    out = {"meta": meta(a)}
+    try:
+        pool = get_pool()
+        if pool is not None:
+            pool.warm()
+        out["idle"] = asyncio.run(_scenario(a, load=False, cls=INTERACTIVE))
+        out["mixed_priority"] = asyncio.run(_scenario(a, load=True, cls=INTERACTIVE))
+        out["mixed_fifo"] = asyncio.run(_scenario(a, load=True, cls=BULK))
+    finally:
+        shutdown_pool()
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench/render.py
+"""
+Grafik çizimi: eski pyplot yolu ile yeniden kullanılan Agg şablonu karşılaştırması.
+Kullanım: python -m bench.render [-n 30] [--bars 600] [--dpi 160] [--format png] [--json]
+"""
+import argparse
+import io
+import pandas as pd
+
+from analyzers.plotting import render_analysis
+from analyzers.signal import Signal
+from compute import analyze_single
+from .common import emit, meta, timeit
+from .synthetic import make_ohlcv, normalized
+
+def legacy_draw(df: pd.DataFrame, sig: Signal, dpi: int = 160) -> bytes:
+    """Eski analyzers.plotting.draw_analysis (pyplot durum makinesi) — karşılaştırma için."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.rcParams["figure.figsize"] = (12, 6)
+    plt.rcParams["axes.grid"] = True
+    fig, ax = plt.subplots()
+    ax.plot(df.index, df["close"], label="Close")
+    if sig.has_trend:
+        wlen = 60
+        idx = list(range(wlen))
+        m_hi, c_hi, m_lo, c_lo = sig.m_hi, sig.c_hi, sig.m_lo, sig.c_lo
+        xs = df.index[-wlen:]
+        ax.plot(xs, [m_hi*i + c_hi for i in idx], linestyle="--", label="Üst trend")
+        ax.plot(xs, [m_lo*i + c_lo for i in idx], linestyle="--", label="Alt trend")
+    price, t1, t2, stop = sig.price, sig.t1, sig.t2, sig.stop
+    ax.axhline(price, linewidth=1, label=f"Fiyat {price:.2f}")
+    ax.axhline(t1, linestyle=":", label=f"Hedef1 {t1:.2f}")
+    ax.axhline(t2, linestyle=":", label=f"Hedef2 {t2:.2f}")
+    ax.axhline(stop, linestyle="-.", label=f"Stop {stop:.2f}")
+    ax.legend(loc="best")
+    ax.set_title("Formasyon + Analiz")
+    buf = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format="png", dpi=dpi)
+    plt.close(fig)
+    return buf.getvalue()
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", type=int, default=30)
+    ap.add_argument("--bars", type=int, default=600)
+    ap.add_argument("--dpi", type=int, default=160)
+    ap.add_argument("--format", default="png", choices=("png", "webp"))
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--out", help="JSON dosyası (--json ile; verilmezse stdout)")
+    a = ap.parse_args(argv)
+
+    from analyzers.indicators import add_indicators
+    df = normalized(make_ohlcv(a.bars, "60m", seed=0, shape="triangle"))
+    summary, _ = analyze_single(df)
+    df = add_indicators(df)
+
+    out = {
+        "legacy_pyplot": timeit(lambda: legacy_draw(df, summary, a.dpi), a.n),
+        "agg_template": timeit(lambda: render_analysis(df, summary, dpi=a.dpi, fmt=a.format), a.n),
+    }
+    out["agg_template"]["bytes"] = len(render_analysis(df, summary, dpi=a.dpi, fmt=a.format))
+    out["legacy_pyplot"]["bytes"] = len(legacy_draw(df, summary, a.dpi))
+    out["speedup"] = out["legacy_pyplot"]["mean_ms"] / out["agg_template"]["mean_ms"]
+    if a.json:
+        emit({"meta": meta(a), "render": out}, a.out)
+    else:
+        for k in ("legacy_pyplot", "agg_template"):
+            r = out[k]
+            print(f"{k:14s} ort {r['mean_ms']:7.1f} ms | p50 {r['p50_ms']:7.1f} ms | {r['bytes'] / 1024:6.0f} KB")
+        print(f"hızlanma: {out['speedup']:.2f}x")
+    return out
+
+if __name__ == "__main__":
+    main()
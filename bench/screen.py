@@ -0,0 +1,67 @@
+# bench/screen.py
+"""
+/tara benchmark'ı (ağsız): sembol başına döngü (add_indicators + son satırda koşul) ile
+son bar anlık görüntüsü (panel, bar başına bir kez) + derlenmiş sorgu maskesi karşılaştırması.
+Kullanım: python -m bench.screen [--symbols 500] [--bars 600] [--out sonuc.json]
+"""
+import argparse
+import time
+
+from analyzers.indicators import add_indicators
+from compute import analyze_frames
+from screener import _compile, compile_query, screen
+from .common import emit, meta, summarize, timeit
+from .synthetic import make_ohlcv, normalized, shape_for, stable_seed, universe
+
+QUERY = 'rsi > 55 and 20 <= adx <= 60 and cmf > 0 and volume > 1.2*vol_ma20 and pattern != "none"'
+
+def _loop(frames: dict) -> list[str]:
+    # karşılaştırma: taramanın sembol başına yapılması (formasyon koşulu dışarıda)
+    out = []
+    for t, df in frames.items():
+        last = add_indicators(df).iloc[-1]
+        if (last["rsi"] > 55 and 20 <= last["adx"] <= 60 and last["cmf"] > 0
+                and last["volume"] > 1.2 * last["vol_ma20"]):
+            out.append(t)
+    return out
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--symbols", type=int, default=500)
+    ap.add_argument("--bars", type=int, default=600)
+    ap.add_argument("--interval", default="60m")
+    ap.add_argument("-n", type=int, default=50, help="sorgu tekrarı")
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+
+    tickers = universe(a.symbols)
+    frames = {t: normalized(make_ohlcv(a.bars, a.interval, stable_seed(0, t, a.interval), shape_for(t, 4)))
+              for t in tickers}
+    out = {"meta": meta(a)}
+
+    t0 = time.perf_counter()
+    loop_hits = _loop(frames)
+    out["per_symbol_loop_ms"] = (time.perf_counter() - t0) * 1e3
+
+    t0 = time.perf_counter()
+    snap = analyze_frames(frames, tickers, columns=True)
+    out["snapshot_ms"] = (time.perf_counter() - t0) * 1e3
+
+    _compile.cache_clear()
+    ts = []
+    for _ in range(a.n):
+        _compile.cache_clear()
+        t0 = time.perf_counter(); compile_query(QUERY); ts.append(time.perf_counter() - t0)
+    out["compile_cold"] = summarize(ts)
+    out["compile_cached"] = timeit(lambda: compile_query(QUERY), a.n)
+    q = compile_query(QUERY)
+    out["query"] = timeit(lambda: screen(snap, q, "adx"), a.n)
+    out["query_sorted_by_score"] = timeit(lambda: screen(snap, q), a.n)
+    out["matches"] = len(screen(snap, q))
+    out["loop_matches_without_pattern"] = len(loop_hits)
+    out["speedup_per_query"] = out["per_symbol_loop_ms"] / out["query"]["mean_ms"]
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
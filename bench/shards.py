@@ -0,0 +1,86 @@
+# bench/shards.py
+"""
+Parçalı tarama benchmark'ı (ağsız): aynı evren 0 (bot sürecinde), 1, 2, 4 … tarama
+işçisiyle taranır; işçiler sahte sağlayıcıyı SHARD_SETUP ile kendileri takar.
+Her tekrar yeni sembollerle yapılır (işçi önbellekleri ölçümü bozmasın).
+Ölçeklenme çekirdek sayısıyla sınırlıdır; meta.cpus'a bakın.
+Kullanım: python -m bench.shards [--symbols 500] [--workers 0 1 2 4] [--out sonuc.json]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# hız sınırı ölçülen şey değil: sahte sağlayıcıda kapatılır (her işçi kendi payını alır)
+os.environ.setdefault("OHLCV_STORE", "off")
+os.environ.setdefault("YF_RATE", "1000")
+os.environ.setdefault("YF_BURST", "1000")
+os.environ["SHARD_SETUP"] = "bench.fakeprovider:install"
+
+import cache
+from compute import shutdown_pool
+from scanner import scan_presets
+from shards import get_shards, shutdown_shards
+from .common import emit, meta, summarize
+from .fakeprovider import install
+
+SPECS = [("60m", "60d"), ("1d", "180d")]
+
+def _clear() -> None:
+    for c in (cache.SUMMARIES, cache.ANALYSES, cache.FETCHES, cache.SCANS):
+        c.invalidate()
+
+async def _run(a, workers: int) -> dict:
+    os.environ["SCAN_WORKERS"] = str(workers)
+    shutdown_shards()
+    t0 = time.perf_counter()
+    shards = get_shards()
+    spawn = time.perf_counter() - t0
+    # ısınma: işçilerde importlar + süreç havuzu (her işçiye en az bir parça)
+    await scan_presets([f"WRM{i:04d}.IS" for i in range(a.shard_size * max(1, workers) + 1)], SPECS)
+    ts, base = [], 0
+    for r in range(a.repeat):
+        _clear()
+        tickers = [f"SYN{base + i:05d}.IS" for i in range(a.symbols)]
+        base += a.symbols
+        t0 = time.perf_counter()
+        by_spec = await scan_presets(tickers, SPECS)
+        ts.append(time.perf_counter() - t0)
+        assert sum(len(rows) for rows, _ in by_spec.values()) > 0
+    s = summarize(ts)
+    out = {"workers": workers, "spawn_s": spawn, "scan": s,
+           "symbols_per_s": a.symbols / (s["p50_ms"] / 1e3)}
+    if shards is not None:
+        out["shards"] = shards.stats()
+    return out
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--symbols", type=int, default=500)
+    ap.add_argument("--workers", type=int, nargs="*", default=[0, 1, 2, 4])
+    ap.add_argument("--shard-size", type=int, default=50)
+    ap.add_argument("--bars", type=int, default=600)
+    ap.add_argument("--latency", type=float, default=0.05, help="sahte sağlayıcı çağrı gecikmesi (sn)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+
+    # işçiler spawn ile açılır ve bu env'i devralır
+    os.environ.update({"FAKE_BARS": str(a.bars), "FAKE_LATENCY": str(a.latency),
+                       "SHARD_SIZE": str(a.shard_size)})
+    install()
+    out = {"meta": meta(a), "runs": []}
+    try:
+        for w in a.workers:
+            out["runs"].append(asyncio.run(_run(a, w)))
+    finally:
+        shutdown_shards()
+        shutdown_pool()
+    base = out["runs"][0]["symbols_per_s"] if out["runs"] else None
+    for r in out["runs"]:
+        r["speedup"] = r["symbols_per_s"] / base if base else None
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# bench/stages.py
+"""
+Aşama aşama benchmark (ağsız): fetch_ohlcv, add_indicators, detect_all_patterns,
+build_signal_summary, normalize_targets, draw_analysis ve uçtan uca scan_many.
+Kullanım: python -m bench.stages [--sizes 250 500 1000] [--latency 0.05] [--out sonuc.json]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Depo ve hız sınırı benchmark'ı ölçmesin diye; env ile ezilebilir (data/ratelimit import'undan önce)
+os.environ.setdefault("OHLCV_STORE", "off")
+os.environ.setdefault("YF_RATE", "1000")
+os.environ.setdefault("YF_BURST", "1000")
+
+import data
+import cache
+from compute import shutdown_pool
+from ratelimit import LIMITER
+from scanner import scan_many
+from analyzers.indicators import add_indicators
+from analyzers.patterns import detect_all_patterns
+from analyzers.scoring import build_signal_summary
+from analyzers.targets import normalize_targets
+from analyzers.plotting import draw_analysis
+from .common import atimeit, emit, meta, timeit
+from .fakeprovider import FakeProvider
+from .synthetic import SHAPES, make_ohlcv, normalized, stable_seed, universe
+
+STAGES = ("fetch_ohlcv", "add_indicators", "detect_all_patterns", "build_signal_summary",
+          "normalize_targets", "draw_analysis")
+
+def _per_call(res: dict, k: int) -> dict:
+    out = {key: (v / k if key.endswith("_ms") else v) for key, v in res.items()}
+    out["calls_per_run"] = k
+    return out
+
+def bench_stages(a) -> dict:
+    shapes = [None, *SHAPES]
+    raw = [make_ohlcv(a.bars, a.interval, stable_seed("stage", i), shapes[i % len(shapes)]) for i in range(a.frames)]
+    dfs = [normalized(df) for df in raw]
+    ind = [add_indicators(df) for df in dfs]
+    pats = [detect_all_patterns(df) for df in ind]
+    sums = [build_signal_summary(df, p) for df, p in zip(ind, pats)]
+    k = len(dfs)
+
+    out = {}
+    want = set(a.stages)
+    if "add_indicators" in want:
+        out["add_indicators"] = _per_call(timeit(lambda: [add_indicators(df) for df in dfs], a.repeat), k)
+    if "detect_all_patterns" in want:
+        out["detect_all_patterns"] = _per_call(timeit(lambda: [detect_all_patterns(df) for df in ind], a.repeat), k)
+        planted = [i for i in range(k) if shapes[i % len(shapes)]]
+        out["detect_all_patterns"]["planted_hit_rate"] = sum(bool(pats[i]) for i in planted) / max(len(planted), 1)
+    if "build_signal_summary" in want:
+        out["build_signal_summary"] = _per_call(
+            timeit(lambda: [build_signal_summary(df, p) for df, p in zip(ind, pats)], a.repeat), k)
+    if "normalize_targets" in want:
+        out["normalize_targets"] = _per_call(timeit(lambda: [normalize_targets(s) for s in sums], a.repeat), k)
+    if "draw_analysis" in want:
+        n = min(k, 8)
+        out["draw_analysis"] = _per_call(
+            timeit(lambda: [draw_analysis(ind[i], normalize_targets(sums[i])) for i in range(n)],
+                   a.repeat), n)
+    if "fetch_ohlcv" in want:
+        out["fetch_ohlcv"] = asyncio.run(_bench_fetch(a))
+    return out
+
+async def _bench_fetch(a) -> dict:
+    prov = FakeProvider(a.bars, latency=a.latency, failure_rate=a.failure_rate, seed=a.seed)
+    data.set_provider(prov)
+    tickers = universe(a.frames)
+    it = iter(range(10 ** 9))
+    res = await atimeit(lambda: data.fetch_ohlcv(tickers[next(it) % len(tickers)], a.interval, a.period),
+                        a.repeat * len(tickers))
+    res["provider_calls"] = len(prov.calls)
+    return res
+
+async def _bench_scan(a) -> dict:
+    out = {}
+    for n in a.sizes:
+        row = {}
+        for phase in ("cold", "warm"):
+            prov = FakeProvider(a.bars, latency=a.latency, failure_rate=a.failure_rate, seed=a.seed)
+            data.set_provider(prov)
+            if phase == "cold":
+                cache.SUMMARIES.invalidate()
+            before = LIMITER.stats()
+            t0 = time.perf_counter()
+            results, skipped = await scan_many(universe(n), a.interval, a.period, return_skipped=True)
+            dt = time.perf_counter() - t0
+            after = LIMITER.stats()
+            row[phase] = {"seconds": dt, "symbols_per_s": n / dt if dt else None, "results": len(results),
+                          "skipped": len(skipped), "provider_calls": len(prov.calls),
+                          "retries": after["retries"] - before["retries"]}
+        out[str(n)] = row
+    return out
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="*", default=[250, 500, 1000])
+    ap.add_argument("--stages", nargs="*", default=list(STAGES), choices=STAGES)
+    ap.add_argument("--interval", default="60m")
+    ap.add_argument("--period", default="60d")
+    ap.add_argument("--bars", type=int, default=600)
+    ap.add_argument("--frames", type=int, default=40, help="aşama benchmark'larındaki seri sayısı")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--latency", type=float, default=0.05, help="sahte sağlayıcı çağrı gecikmesi (sn)")
+    ap.add_argument("--failure-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+
+    try:
+        out = {"meta": meta(a), "stages": bench_stages(a)}
+        if a.sizes:
+            out["scan_many"] = asyncio.run(_bench_scan(a))
+    finally:
+        shutdown_pool()
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# bench/startup.py
+"""
+Açılış benchmark'ı (ağsız): yeni süreçte `import main` → uygulama kurulumu → ilk /start
+yanıtı → ısınma → ilk /analiz. Bot API sahte istek nesnesiyle yerelde yanıtlanır.
+Kullanım: python -m bench.startup [--runs 5] [--no-warmup] [--out sonuc.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .common import emit, meta, summarize
+
+STEPS = ("import_main", "build_app", "initialize", "first_reply", "warmup", "first_analiz")
+
+def _child(a) -> None:
+    t0 = float(os.environ["BENCH_T0"])
+    marks: dict[str, float] = {}
+    mark = lambda k: marks.setdefault(k, time.time() - t0)
+    os.environ.update({"OHLCV_STORE": "off", "SCHED": "off", "YF_RATE": "1000", "YF_BURST": "1000",
+                       "WARMUP": "off" if a.no_warmup else "on", "METRICS_PORT": ""})
+
+    import main
+    mark("import_main")
+    from telegram import Update
+    from .botapi import LocalRequest, command_update
+
+    def on_call(name, params, t):
+        if name in ("sendMessage", "sendPhoto"):
+            mark("first_reply")
+
+    req = LocalRequest(on_call=on_call)
+    app = main.build_app("1:bench", request=req, updates_request=LocalRequest())
+    mark("build_app")
+
+    def update(i: int, text: str) -> Update:
+        return Update.de_json(command_update(i, 7, text), app.bot)
+
+    async def run():
+        await app.initialize()
+        await app.post_init(app)
+        mark("initialize")
+        await app.process_update(update(1, "/start"))
+        task = app.bot_data.get("warmup")
+        if task is not None:
+            await task
+        mark("warmup")
+        # sahte sağlayıcı pandas'ı yükler → ilk yanıt ölçüldükten sonra takılır
+        import data
+        from .fakeprovider import FakeProvider
+        data.set_provider(FakeProvider(bars=a.bars))
+        n = len(req.calls)
+        await app.process_update(update(2, "/analiz THYAO 1d 1y"))
+        if "sendPhoto" in req.calls[n:]:
+            mark("first_analiz")
+        await app.post_shutdown(app)
+        await app.shutdown()
+
+    asyncio.run(run())
+    print(json.dumps(marks))
+
+def main(argv=None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--bars", type=int, default=400, help="sahte sağlayıcının sembol başına bar sayısı")
+    ap.add_argument("--no-warmup", action="store_true", help="arka plan ısınmasını kapat (WARMUP=off)")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    a = ap.parse_args(argv)
+    if a.child:
+        _child(a)
+        return {}
+
+    root = Path(__file__).resolve().parent.parent
+    cmd = [sys.executable, "-m", "bench.startup", "--child", "--bars", str(a.bars)] + (["--no-warmup"] * a.no_warmup)
+    runs = []
+    for _ in range(a.runs):
+        env = dict(os.environ, BENCH_T0=repr(time.time()))
+        p = subprocess.run(cmd, cwd=root, env=env, capture_output=True, text=True, timeout=300)
+        if p.returncode:
+            raise RuntimeError(f"alt süreç hatası:\n{p.stderr[-2000:]}")
+        runs.append(json.loads(p.stdout.strip().splitlines()[-1]))
+
+    # süreç başlangıcından itibaren (yorumlayıcı açılışı dahil) her adımın varış süresi
+    out = {"meta": meta(a), "steps": {}}
+    for k in STEPS:
+        ts = [r[k] for r in runs if k in r]
+        if ts:
+            out["steps"][k] = summarize(ts)
+    emit(out, a.out)
+    return out
+
+if __name__ == "__main__":
+    main()
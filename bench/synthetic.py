@@ -0,0 +1,102 @@
+# bench/synthetic.py
+"""Deterministik sentetik OHLCV (yfinance biçimi) ve formasyon yerleştirme."""
+import zlib
+import numpy as np
+import pandas as pd
+from timeframes import MINUTES, SESSION_OPEN, SESSION_CLOSE
+
+TZ = "Europe/Istanbul"
+SHAPES = ("pennant", "triangle", "double_bottom")
+# deterministik varsayılan bitiş (provider'lar "şimdi"ye göre verir)
+DEFAULT_END = pd.Timestamp("2025-06-02 18:00", tz=TZ)
+
+def stable_seed(*parts) -> int:
+    """hash() süreçten sürece değişir; crc32 değişmez."""
+    return zlib.crc32("|".join(map(str, parts)).encode())
+
+def bar_index(n: int, interval: str, end: pd.Timestamp | None = None) -> pd.DatetimeIndex:
+    """Seansa hizalı (10:00–18:00, hafta içi) son `n` barın açılış zamanları; `end` dahil değil."""
+    end = DEFAULT_END if end is None else end
+    if interval == "1d":
+        return pd.bdate_range(end=end.tz_localize(None).normalize() - pd.Timedelta(days=1), periods=n)
+    step = pd.Timedelta(minutes=MINUTES[interval])
+    per_day = int(-(-(SESSION_CLOSE - SESSION_OPEN) // step))
+    days = pd.bdate_range(end=end.tz_localize(None).normalize(), periods=n // per_day + 2)
+    opens = (days.values[:, None] + SESSION_OPEN.to_timedelta64() + np.arange(per_day) * step.to_timedelta64()).ravel()
+    idx = pd.DatetimeIndex(opens).tz_localize(TZ)
+    idx = idx[idx + step <= end]
+    return idx[-n:]
+
+def _walk(n: int, rng, price: float):
+    c = price * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    rngs = c * rng.uniform(0.002, 0.01, n)
+    h = c + rngs * rng.uniform(0.3, 1.0, n)
+    l = c - rngs * rng.uniform(0.3, 1.0, n)
+    return h, l, c
+
+def _pennant(p0: float, rng, up: bool = True):
+    # 20 barlık direk + 50 barlık daralan bayrak; son bar kırılım
+    pole = p0 * np.linspace(1.0, 1.15 if up else 0.87, 20)
+    center = pole[-1]
+    a = center * np.linspace(0.03, 0.008, 50)
+    c = center + a * 0.6 * np.sin(np.arange(50) * 1.3)
+    h = np.r_[pole * 1.003, center + a * rng.uniform(0.85, 1.0, 50)]
+    l = np.r_[pole * 0.997, center - a * rng.uniform(0.85, 1.0, 50)]
+    c = np.r_[pole, c]
+    c[-1] = center * (1.04 if up else 0.96)
+    h[-1], l[-1] = max(c[-1], center) * 1.003, min(c[-1], center) * 0.997
+    return h, l, c
+
+def _triangle(p0: float, rng, up: bool = True):
+    # 80 barlık simetrik daralma (%3.5 → %0.6), son bar kırılım
+    a = p0 * np.linspace(0.035, 0.006, 80)
+    c = p0 + a * 0.6 * np.sin(np.arange(80) * 1.1)
+    h = p0 + a * rng.uniform(0.85, 1.0, 80)
+    l = p0 - a * rng.uniform(0.85, 1.0, 80)
+    c[-1] = p0 * (1.03 if up else 0.97)
+    h[-1], l[-1] = max(c[-1], p0) * 1.003, min(c[-1], p0) * 0.997
+    return h, l, c
+
+def _double_bottom(p0: float, rng, up: bool = True):
+    # düşüş → dip → boyun → ikinci dip (±%0.3) → yükseliş → boyun üstü kapanış
+    b = p0 * 0.9
+    neck = b * 1.08
+    c = np.r_[np.linspace(p0, b, 15), np.linspace(b, neck, 13)[1:], np.linspace(neck, b * 1.003, 13)[1:],
+              np.linspace(b * 1.003, neck * 0.995, 21)[1:], neck * 1.02]
+    return c * 1.004, c * 0.996, c
+
+_BUILDERS = {"pennant": _pennant, "triangle": _triangle, "double_bottom": _double_bottom}
+
+def make_ohlcv(n: int = 600, interval: str = "60m", seed: int = 0, shape: str | None = None,
+               end: pd.Timestamp | None = None, price: float = 100.0) -> pd.DataFrame:
+    """
+    yfinance.download biçiminde (Open/High/Low/Close/Adj Close/Volume) deterministik seri.
+    shape verilirse son barlara o formasyon yerleştirilir ve son barda hacim sıçraması olur.
+    """
+    rng = np.random.default_rng(seed)
+    h, l, c = _walk(n, rng, price)
+    if shape is not None:
+        sh, sl, sc = _BUILDERS[shape](float(c[-1]), rng)
+        k = min(len(sc), n)
+        h[-k:], l[-k:], c[-k:] = sh[-k:], sl[-k:], sc[-k:]
+    o = np.clip(np.r_[c[0], c[:-1]], l, h)
+    v = rng.integers(50_000, 200_000, n).astype("float64")
+    if shape is not None:
+        v[-1] *= 3
+    idx = bar_index(n, interval, end)
+    n = len(idx)
+    return pd.DataFrame({"Open": o[-n:], "High": h[-n:], "Low": l[-n:], "Close": c[-n:],
+                         "Adj Close": c[-n:], "Volume": v[-n:]}, index=idx)
+
+def shape_for(ticker: str, every: int = 4) -> str | None:
+    """Evrenin ~1/every'sine sırayla formasyon atar (ticker'a göre sabit)."""
+    k = stable_seed(ticker) % (every * len(SHAPES))
+    return SHAPES[k] if k < len(SHAPES) else None
+
+def universe(n: int) -> list[str]:
+    return [f"SYN{i:04d}.IS" for i in range(n)]
+
+def normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """data._normalize ile aynı küçük harfli sütunlar (aşama benchmark'ları için)."""
+    return df.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close",
+                              "Adj Close": "adj_close", "Volume": "volume"})
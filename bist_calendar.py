@@ -0,0 +1,103 @@
+# bist_calendar.py
+import os
+from datetime import date, timedelta
+import pandas as pd
+from timeframes import MINUTES, SESSION_OPEN, SESSION_CLOSE
+
+TZ = "Europe/Istanbul"
+
+# Resmî tatiller (tam gün kapalı). Dini bayramlar her yıl değişir; listede olmayan
+# yıllar için BIST_HOLIDAYS env'i ile eklenebilir.
+_FIXED = [(1, 1), (4, 23), (5, 1), (5, 19), (7, 15), (8, 30), (10, 29)]
+_RELIGIOUS = {
+    # Ramazan Bayramı, Kurban Bayramı
+    2025: ["2025-03-31", "2025-04-01", "2025-06-06", "2025-06-09"],
+    2026: ["2026-03-20", "2026-05-27", "2026-05-28", "2026-05-29"],
+    2027: ["2027-03-09", "2027-03-10", "2027-03-11", "2027-05-17", "2027-05-18", "2027-05-19"],
+}
+# Yarım gün (arife, 28 Ekim): seans 12:30'da biter
+HALF_DAY_CLOSE = pd.Timedelta(hours=12, minutes=30)
+_HALF = {
+    2025: ["2025-06-05"],
+    2026: ["2026-03-19", "2026-05-26"],
+    2027: ["2027-03-08"],
+}
+
+def _env_dates(name: str) -> set[date]:
+    out = set()
+    for tok in os.getenv(name, "").replace(";", ",").split(","):
+        tok = tok.strip()
+        if tok:
+            try:
+                out.add(date.fromisoformat(tok))
+            except ValueError:
+                pass
+    return out
+
+def holidays(year: int) -> set[date]:
+    days = {date(year, m, d) for m, d in _FIXED}
+    days |= {date.fromisoformat(s) for s in _RELIGIOUS.get(year, [])}
+    return days | {d for d in _env_dates("BIST_HOLIDAYS") if d.year == year}
+
+def half_days(year: int) -> set[date]:
+    days = {date(year, 10, 28)} | {date.fromisoformat(s) for s in _HALF.get(year, [])}
+    return days | {d for d in _env_dates("BIST_HALF_DAYS") if d.year == year}
+
+def is_trading_day(d: date) -> bool:
+    return d.weekday() < 5 and d not in holidays(d.year)
+
+def session_bounds(d: date) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """O günün seans açılış/kapanışı (Europe/Istanbul); işlem günü değilse None."""
+    if not is_trading_day(d):
+        return None
+    day = pd.Timestamp(d).tz_localize(TZ)
+    close = HALF_DAY_CLOSE if d in half_days(d.year) else SESSION_CLOSE
+    return day + SESSION_OPEN, day + close
+
+def is_open(now: pd.Timestamp | None = None) -> bool:
+    now = _now(now)
+    b = session_bounds(now.date())
+    return b is not None and b[0] <= now < b[1]
+
+def _now(now: pd.Timestamp | None) -> pd.Timestamp:
+    if now is None:
+        return pd.Timestamp.now(tz=TZ)
+    return now.tz_localize(TZ) if now.tzinfo is None else now.tz_convert(TZ)
+
+def bar_closes(interval: str, d: date) -> list[pd.Timestamp]:
+    """O gün `interval` barlarının kapanış anları (seans açılışına hizalı, kapanışta kırpılır)."""
+    b = session_bounds(d)
+    if b is None:
+        return []
+    opened, closed = b
+    if interval == "1d":
+        return [closed]
+    step = pd.Timedelta(minutes=MINUTES[interval])
+    out, t = [], opened + step
+    while t < closed:
+        out.append(t)
+        t += step
+    out.append(closed)
+    return out
+
+def next_bar_close(interval: str, now: pd.Timestamp | None = None, horizon_days: int = 15) -> pd.Timestamp | None:
+    """`now`dan sonraki ilk bar kapanışı; yalnızca işlem günleri/seans saatleri içinde."""
+    now = _now(now)
+    d = now.date()
+    for _ in range(horizon_days):
+        for t in bar_closes(interval, d):
+            if t > now:
+                return t
+        d += timedelta(days=1)
+    return None
+
+def last_bar_close(interval: str, now: pd.Timestamp | None = None, horizon_days: int = 15) -> pd.Timestamp | None:
+    """`now` itibarıyla kapanmış son bar."""
+    now = _now(now)
+    d = now.date()
+    for _ in range(horizon_days):
+        done = [t for t in bar_closes(interval, d) if t <= now]
+        if done:
+            return done[-1]
+        d -= timedelta(days=1)
+    return None
@@ -0,0 +1,182 @@
+# cache.py
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+import metrics
+
+class AsyncCache:
+    """
+    Süreç içi TTL + boyut sınırlı LRU önbellek; tek-uçuş (single-flight) birleştirme ile.
+    Aynı anahtar için eşzamanlı istekler tek hesaplamayı bekler. ttl <= 0 ise sonuç
+    saklanmaz, yalnızca eşzamanlı istekler birleştirilir. orphan_grace verilirse, bekleyen
+    herkes vazgeçtikten (iptal) bu kadar sn sonra hâlâ kimse katılmamışsa hesap da iptal edilir.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 900.0, cache_none: bool = False,
+                 orphan_grace: float | None = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_none = cache_none
+        self.orphan_grace = orphan_grace
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._refs: dict[Hashable, int] = {}
+        self.hits = self.misses = self.joins = self.evictions = self.orphans = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default=None):
+        ent = self._data.get(key)
+        if ent is None:
+            return default
+        if ent[0] <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return ent[1]
+
+    def put(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or (value is None and not self.cache_none):
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, pred: Callable[[Hashable], bool] | None = None) -> int:
+        keys = [k for k in self._data if pred is None or pred(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    async def get_or_compute(self, key: Hashable, factory: Callable[[], Awaitable[Any]]):
+        _miss = object()
+        val = self.get(key, _miss)
+        if val is not _miss:
+            self.hits += 1
+            return val
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.joins += 1
+            return await self._wait(key, fut)
+        self.misses += 1
+        # hesap ayrı görevde: ilk isteyen iptal edilse de bekleyenler sonucu alır
+        task = asyncio.ensure_future(self._run(key, factory))
+        self._inflight[key] = task
+        return await self._wait(key, task)
+
+    async def _wait(self, key, task):
+        self._refs[key] = self._refs.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._refs[key] -= 1
+            if not self._refs[key]:
+                del self._refs[key]
+                if self.orphan_grace is not None and not task.done():
+                    asyncio.get_running_loop().call_later(self.orphan_grace, self._reap, key, task)
+
+    def _reap(self, key, task) -> None:
+        if key not in self._refs and not task.done():
+            self.orphans += 1
+            task.cancel()
+
+    async def _run(self, key, factory):
+        try:
+            val = await factory()
+            self.put(key, val)
+            return val
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_many(self, keys: Iterable[Hashable],
+                       compute: Callable[[list], Awaitable[dict]]) -> dict:
+        """
+        Toplu sürüm: önbellekte olmayan ve başka yerde hesaplanmayan anahtarlar tek
+        compute(eksikler) çağrısıyla hesaplanır (dönüş: anahtar → değer).
+        """
+        _miss = object()
+        out: dict = {}
+        waiting: dict[Hashable, asyncio.Future] = {}
+        mine: list = []
+        loop = asyncio.get_running_loop()
+        for k in dict.fromkeys(keys):
+            val = self.get(k, _miss)
+            if val is not _miss:
+                self.hits += 1; out[k] = val
+            elif k in self._inflight:
+                self.joins += 1; waiting[k] = self._inflight[k]
+            else:
+                self.misses += 1; mine.append(k)
+                self._inflight[k] = waiting[k] = loop.create_future()
+
+        if mine:
+            try:
+                res = await compute(mine)
+            except BaseException as e:
+                # iptal bekleyenlere iptal olarak yayılmasın: onlar için yalnızca bu anahtarlar eksik kalır
+                err = RuntimeError(f"{self.name}: hesap iptal edildi") if isinstance(e, asyncio.CancelledError) else e
+                for k in mine:
+                    f = self._inflight.pop(k, None)
+                    if f is not None and not f.done():
+                        f.set_exception(err)
+                        f.exception()  # "retrieved" say; tekrar fırlatma bekleyenlere
+                raise
+            for k in mine:
+                val = res.get(k)
+                self.put(k, val)
+                f = self._inflight.pop(k, None)
+                if f is not None and not f.done():
+                    f.set_result(val)
+
+        for k, f in waiting.items():
+            try:
+                out[k] = await asyncio.shield(f)
+            except Exception:
+                out[k] = None
+        return out
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.joins
+        return {
+            "name": self.name, "size": len(self._data), "maxsize": self.maxsize,
+            "hits": self.hits, "misses": self.misses, "joins": self.joins,
+            "evictions": self.evictions, "orphans": self.orphans, "inflight": len(self._inflight),
+            "hit_ratio": (self.hits + self.joins) / total if total else 0.0,
+        }
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+# (ticker, interval, period, son kapanmış bar ts) → özet. Günlük son bar seans içinde
+# aynı ts ile güncellendiğinden TTL, depo yenileme aralığıyla aynı tutulur.
+SUMMARIES = AsyncCache("summaries", maxsize=int(_env_float("CACHE_SIZE", 5000)), ttl=_env_float("CACHE_TTL", 900))
+# /analiz: aynı anahtar + grafik
+ANALYSES = AsyncCache("analyses", maxsize=256, ttl=_env_float("CACHE_TTL", 900))
+# /analiz: aynı anahtar → (altyazı gövdesi, Telegram file_id); tekrar istek grafiği ne çizer ne yükler.
+# Yeni bar kapanınca aynı (ticker, interval, period) için eski anahtar silinir (main.analiz)
+PHOTOS = AsyncCache("photos", maxsize=1024, ttl=_env_float("CACHE_TTL", 900))
+# indirme ve tam tarama: yalnızca eşzamanlı istekleri birleştir
+FETCHES = AsyncCache("fetches", ttl=0)
+# taramalar ve backtest: isteyen herkes vazgeçince (iptal/süre aşımı) ORPHAN_GRACE sn sonra durdurulur;
+# bu arada aynı komut yeniden gelirse süren hesaba katılır
+_GRACE = _env_float("ORPHAN_GRACE", 5)
+SCANS = AsyncCache("scans", ttl=0, orphan_grace=_GRACE)
+# /backtest: evrenin tüm geçmişi → dakikalar; sonuç saatlerce geçerli
+BACKTESTS = AsyncCache("backtests", maxsize=8, ttl=_env_float("BACKTEST_TTL", 6 * 3600), orphan_grace=_GRACE)
+# /tara: (evren, interval, period, son bar kapanışı) → son bar sütunları; yeni kapanışta anahtar değişir
+SCREENS = AsyncCache("screens", maxsize=16, ttl=_env_float("CACHE_TTL", 900), orphan_grace=_GRACE)
+
+def all_stats() -> list[dict]:
+    return [c.stats() for c in (SUMMARIES, ANALYSES, PHOTOS, FETCHES, SCANS, BACKTESTS, SCREENS)]
+
+metrics.register_collector("cache", lambda: {s["name"]: {k: v for k, v in s.items() if k != "name"} for s in all_stats()})
@@ -0,0 +1,279 @@
+# compute.py
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+import metrics
+import priority
+from priority import PriorityGate
+from analyzers.indicators import add_indicators
+from analyzers.patterns import detect_all_patterns
+from analyzers.signal import empty_records
+from analyzers.scoring import SCREEN_DTYPE, build_signal_summary, summarize_panel
+from analyzers.targets import normalize_targets
+from analyzers.patterns_panel import detect_panel
+from analyzers.panel import (
+    FIELDS, Panel, build_panel, panel_indicators, panel_nbytes, panel_views, valid_mask, latest,
+)
+
+logger = logging.getLogger(__name__)
+
+# Düşük bellek modu (LOW_MEMORY=1, küçük sunucular): panel ve indikatör dizileri float32,
+# thread yolunda da evren BLOCK'luk panellere bölünür, taramalar parça parça yürür (scanner)
+LOW_MEMORY = os.getenv("LOW_MEMORY", "").strip().lower() in ("1", "true", "on", "yes")
+PANEL_DTYPE = np.float32 if LOW_MEMORY else np.float64
+
+# --- saf hesap (hem ana süreçte hem işçide çalışır) ---
+
+def _empty(columns: bool) -> np.ndarray:
+    return np.zeros(0, dtype=SCREEN_DTYPE) if columns else empty_records()
+
+def analyze_panel(p: Panel, columns: bool = False) -> np.ndarray:
+    """
+    Tüm panel için indikatörleri ve formasyonları tek vektörel geçişte hesaplar
+    (analyzers.panel, analyzers.patterns_panel). Sembol başına DataFrame kurulmaz.
+    Dönüş: SIGNAL_DTYPE kayıt dizisi (sonuç üretemeyen semboller yok); columns → SCREEN_DTYPE.
+    """
+    if not p.symbols:
+        return _empty(columns)
+    with metrics.timer("indicators", path="panel"):
+        ind = panel_indicators(p)
+        mask = valid_mask(p, ind)
+        last, vals = latest(p, ind, mask)
+    with metrics.timer("patterns", path="panel"):
+        pats = detect_panel(p, mask)
+    with metrics.timer("scoring", path="panel"):
+        return summarize_panel(p.symbols, last, vals, pats, columns)
+
+def analyze_frames(frames: dict[str, pd.DataFrame], tickers: list[str], columns: bool = False,
+                   dtype=None) -> np.ndarray:
+    return analyze_panel(build_panel(frames, tickers, dtype=dtype or PANEL_DTYPE), columns)
+
+def analyze_blocks(frames: dict[str, pd.DataFrame], tickers: list[str], columns: bool = False) -> np.ndarray:
+    """Thread yolu, düşük bellek: BLOCK'luk paneller sırayla (tepe bellek bir blok kadar)."""
+    tickers = [t for t in tickers if frames.get(t) is not None]
+    parts = [analyze_frames(frames, tickers[i:i + BLOCK], columns) for i in range(0, len(tickers), BLOCK)]
+    return np.concatenate(parts) if parts else _empty(columns)
+
+def analyze_single(df: pd.DataFrame, interval: str | None = None, render: bool = False):
+    """
+    /analiz ve /score zinciri: indikatör → formasyon → özet (→ grafik).
+    Dönüş: (Signal, png | None). Grafik normalize_targets uygulanmış özetle çizilir.
+    """
+    from analyzers.plotting import render_analysis
+    with metrics.timer("indicators", path="single"):
+        df = add_indicators(df)
+    with metrics.timer("patterns", path="single"):
+        pats = detect_all_patterns(df)
+    with metrics.timer("scoring", path="single"):
+        summary = build_signal_summary(df, pats)
+    img = None
+    if render:
+        with metrics.timer("targets", path="single"):
+            shown = normalize_targets(summary)
+        with metrics.timer("render"):
+            img = render_analysis(df, shown)
+    return summary, img
+
+# --- paylaşımlı bellek ---
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # İşçi yalnızca bağlanır; segmenti ana süreç unlink eder. İşçiler ana sürecin
+    # resource_tracker'ını paylaştığından (forkserver/spawn) çifte kayıt sorun olmaz.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+def _share_panel(frames: dict[str, pd.DataFrame], tickers: list[str]):
+    syms = [t for t in tickers if frames.get(t) is not None and len(frames[t])]
+    lengths = np.array([len(frames[t]) for t in syms], dtype=np.int64)
+    n, t = len(syms), int(lengths.max()) if len(syms) else 0
+    shm = shared_memory.SharedMemory(create=True, size=max(panel_nbytes(n, t, PANEL_DTYPE), 1))
+    build_panel(frames, syms, buffer=shm.buf, dtype=PANEL_DTYPE)
+    return shm, {"name": shm.name, "symbols": syms, "lengths": lengths, "shape": (n, t),
+                 "dtype": np.dtype(PANEL_DTYPE).str}
+
+def _share_frame(df: pd.DataFrame):
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max((len(FIELDS) + 1) * n * 8, 1))
+    arrs = panel_views(shm.buf, 1, n)
+    for c, a in arrs.items():
+        a[0, :] = df[c].to_numpy(dtype="float64").ravel()
+    idx = df.index
+    ts = np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=len(FIELDS) * n * 8)
+    ts[:] = (idx.tz_convert("UTC") if idx.tz is not None else idx).as_unit("ns").asi8
+    tz = None if idx.tz is None else str(idx.tz)
+    return shm, {"name": shm.name, "n": n, "tz": tz, "index_name": idx.name}
+
+# İşçiler (sonuç, aşama süreleri) döner; süreler ana süreçte metrics.merge ile kaydedilir.
+
+def _block_worker(spec: dict, columns: bool = False):
+    shm = _attach(spec["name"])
+    try:
+        n, t = spec["shape"]
+        p = Panel(spec["symbols"], spec["lengths"], **panel_views(shm.buf, n, t, spec.get("dtype", "<f8")))
+        with metrics.capture() as timings:
+            out = analyze_panel(p, columns)
+        del p
+        return out, timings
+    finally:
+        shm.close()
+
+def _single_worker(spec: dict, interval: str | None, render: bool):
+    shm = _attach(spec["name"])
+    try:
+        n = spec["n"]
+        arrs = panel_views(shm.buf, 1, n)
+        ts = np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=len(FIELDS) * n * 8)
+        idx = pd.to_datetime(ts, unit="ns", utc=spec["tz"] is not None)
+        if spec["tz"]:
+            idx = idx.tz_convert(spec["tz"])
+        # işçide kopya: shm kapanmadan önce çerçeve kendi belleğine sahip olmalı
+        df = pd.DataFrame({c: a[0].copy() for c, a in arrs.items()},
+                          index=pd.DatetimeIndex(idx, name=spec["index_name"]))
+        del arrs, ts
+        with metrics.capture() as timings:
+            out = analyze_single(df, interval, render)
+        return out, timings
+    finally:
+        shm.close()
+
+# --- süreç havuzu ---
+
+# toplu taramada işçiye giden blok başına en fazla sembol (COMPUTE_BLOCK)
+BLOCK = max(1, int(os.getenv("COMPUTE_BLOCK", "32")))
+
+# forkserver bu modülleri bir kez yükler; işçiler çatallanarak hazır gelir
+_PRELOAD = ["compute", "analyzers.plotting"]
+
+def _init_worker() -> None:
+    # işçi başına ilk grafik maliyeti (font önbelleği, şablon) ilk istekten önce ödenir
+    try:
+        from analyzers.plotting import warm
+        warm()
+    except Exception as e:
+        logger.warning(f"İşçi ısınması başarısız: {e}")
+
+class ComputePool:
+    """
+    CPU işi (indikatör/formasyon/özet/grafik) için süreç havuzu. OHLCV dizileri
+    işçilere pickle yerine paylaşımlı bellekle gider; I/O varsayılan thread havuzunda kalır.
+    Havuza en fazla `workers` iş gönderilir (PriorityGate): boşalan işçi önce etkileşimli
+    işe verilir, toplu taramalar küçük bloklara bölündüğü için bekleme bir blokla sınırlıdır.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(method)
+        if method == "forkserver":
+            ctx.set_forkserver_preload(_PRELOAD)
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker)
+        self.gate = PriorityGate("compute", workers)
+
+    async def analyze_frames(self, frames: dict[str, pd.DataFrame], tickers: list[str],
+                             columns: bool = False) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        tickers = [t for t in tickers if frames.get(t) is not None]
+        if not tickers:
+            return _empty(columns)
+        # işçi başına ~2 blok (yük dengesi / kopyalama maliyeti), ama en fazla BLOCK sembol:
+        # araya giren etkileşimli iş en çok bir blok bekler
+        nblk = max(1, min(len(tickers), max(self.workers * 2, -(-len(tickers) // BLOCK))))
+        size = -(-len(tickers) // nblk)
+        blocks = [tickers[i:i + size] for i in range(0, len(tickers), size)]
+
+        async def run(block):
+            shm, spec = _share_panel(frames, block)
+            try:
+                async with self.gate.slot():
+                    with metrics.inflight("compute_inflight", kind="block"):
+                        out, timings = await loop.run_in_executor(self._pool, _block_worker, spec, columns)
+                metrics.merge(timings)
+                return out
+            finally:
+                shm.close(); shm.unlink()
+
+        # işçiler kayıt dizisi döner: sembol başına nesne/sözlük pickle edilmez
+        return np.concatenate(await asyncio.gather(*(run(b) for b in blocks)))
+
+    async def analyze(self, df: pd.DataFrame, interval: str | None = None, render: bool = False):
+        loop = asyncio.get_running_loop()
+        shm, spec = _share_frame(df)
+        try:
+            async with self.gate.slot():
+                with metrics.inflight("compute_inflight", kind="single"):
+                    out, timings = await loop.run_in_executor(self._pool, _single_worker, spec, interval, render)
+            metrics.merge(timings)
+            return out
+        finally:
+            shm.close(); shm.unlink()
+
+    async def run(self, fn, *args):
+        """Genel CPU işi (ör. backtest); argümanlar pickle ile gider."""
+        loop = asyncio.get_running_loop()
+        async with self.gate.slot():
+            with metrics.inflight("compute_inflight", kind="task"):
+                return await loop.run_in_executor(self._pool, fn, *args)
+
+    def warm(self) -> None:
+        """İşçileri önceden başlatır (her biri _init_worker ile modülleri yükleyip bir grafik çizer)."""
+        for f in [self._pool.submit(os.getpid) for _ in range(self.workers)]:
+            f.result()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+_pool: ComputePool | None = None
+_pool_ready = False
+
+def get_pool() -> ComputePool | None:
+    """
+    COMPUTE_WORKERS env: işçi sayısı (varsayılan CPU sayısı). "0" → havuz yok,
+    hesap varsayılan thread havuzunda yapılır.
+    """
+    global _pool, _pool_ready
+    if not _pool_ready:
+        _pool_ready = True
+        raw = os.getenv("COMPUTE_WORKERS", "").strip()
+        workers = int(raw) if raw.isdigit() else (os.cpu_count() or 1)
+        if workers > 0:
+            try:
+                _pool = ComputePool(workers)
+            except Exception as e:
+                logger.warning(f"Süreç havuzu başlatılamadı, thread havuzu kullanılacak: {e}")
+    return _pool
+
+def shutdown_pool() -> None:
+    global _pool, _pool_ready
+    if _pool is not None:
+        _pool.shutdown()
+    _pool, _pool_ready = None, False
+
+metrics.register_collector("compute_gate", lambda: _pool.gate.stats() if _pool is not None else {})
+
+async def run_analyze_frames(frames: dict[str, pd.DataFrame], tickers: list[str],
+                             columns: bool = False) -> np.ndarray:
+    pool = get_pool()
+    if pool is not None:
+        return await pool.analyze_frames(frames, tickers, columns)
+    return await priority.to_thread(analyze_blocks if LOW_MEMORY else analyze_frames, frames, tickers, columns)
+
+async def run_analyze(df: pd.DataFrame, interval: str | None = None, render: bool = False):
+    pool = get_pool()
+    if pool is not None:
+        return await pool.analyze(df, interval, render)
+    return await priority.to_thread(analyze_single, df, interval, render)
+
+async def run_cpu(fn, *args):
+    """Modül düzeyindeki fn(*args)'ı süreç havuzunda (yoksa thread havuzunda) çalıştırır."""
+    pool = get_pool()
+    if pool is not None:
+        return await pool.run(fn, *args)
+    return await priority.to_thread(fn, *args)
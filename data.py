@@ -1,32 +1,67 @@
 # data.py
+import asyncio
+import os
 import time
 import logging
-import yfinance as yf
+import threading
+from pathlib import Path
 import pandas as pd
+import priority
+from store import OhlcvStore
+from providers import YahooProvider
+from ratelimit import LIMITER
+from timeframes import NATIVE_LIMIT_DAYS, MINUTES, period_start, plan_fetches, resample_ohlcv
 
 logger = logging.getLogger(__name__)
-_INTERVALS = {"30m": "30m", "60m": "60m", "120m": "120m", "1d": "1d"}
+_INTERVALS = {k: k for k in MINUTES}
+_INTRADAY = tuple(k for k in MINUTES if k != "1d")
+_BAR = {k: pd.Timedelta(minutes=m) for k, m in MINUTES.items()}
+# Günlük barda son bar seans boyunca canlıdır → bundan sık ağa çıkma (sn)
+_DAILY_MIN_REFRESH = 15 * 60
 
-def fetch_ohlcv(ticker: str, interval: str = "60m", period: str = "60d") -> pd.DataFrame | None:
-    interval = _INTERVALS.get(interval, "60m")
+# Toplu indirmede tek istekteki sembol sayısı
+_BATCH = 50
 
-    df = None
-    for attempt in range(3):
-        try:
-            df = yf.download(
-                ticker,
-                interval=interval,
-                period=period,
-                progress=False,
-                auto_adjust=False,
-                threads=False,
-            )
-            if df is not None and not df.empty:
-                break
-        except Exception as e:
-            logger.warning(f"YF indirme hatası ({ticker}, deneme {attempt+1}/3): {e}")
-        time.sleep(0.6)
+_provider = YahooProvider()
+_store: OhlcvStore | None = None
+_store_ready = False
+_store_lock = threading.Lock()
+
+def get_store() -> OhlcvStore | None:
+    """
+    Kalıcı OHLCV deposu. Yol OHLCV_STORE env ile verilir (varsayılan cache/ohlcv.sqlite);
+    "0"/"off" verilirse depo kapanır ve her çağrı tüm period'u indirir.
+    """
+    global _store, _store_ready
+    with _store_lock:
+        if not _store_ready:
+            path = os.getenv("OHLCV_STORE", str(Path(__file__).with_name("cache") / "ohlcv.sqlite"))
+            if path.strip().lower() not in ("", "0", "off", "none"):
+                try:
+                    _store = OhlcvStore(path)
+                except Exception as e:
+                    logger.warning(f"OHLCV deposu açılamadı ({path}): {e}")
+            _store_ready = True
+    return _store
+
+def set_provider(provider) -> None:
+    """İndirme arka ucunu değiştirir (ör. testlerde providers.FrameProvider)."""
+    global _provider
+    _provider = provider
+
+def get_provider():
+    return _provider
+
+async def _download(tickers: list[str], interval: str, period: str | None = None, start=None,
+                    attempts: int = 3) -> dict[str, pd.DataFrame] | None:
+    """None → istek hata verdi (tüm denemeler); {} → başarılı ama veri yok."""
+    # tüm Yahoo istekleri ortak sınırlayıcıdan geçer (ratelimit.LIMITER)
+    label = f"{', '.join(tickers[:3])}{'…' if len(tickers) > 3 else ''} {interval}"
+    out = await LIMITER.call(_provider.download, tickers, interval, period=period, start=start,
+                             attempts=attempts, label=label)
+    return out
 
+def _normalize(df: pd.DataFrame | None) -> pd.DataFrame | None:
     if df is None or df.empty:
         return None
 
@@ -35,16 +70,193 @@ def fetch_ohlcv(ticker: str, interval: str = "60m", period: str = "60d") -> pd.D
 
     df = df.rename(columns={
         "Open":"open","High":"high","Low":"low","Close":"close","Adj Close":"adj_close","Volume":"volume"
-    }).copy()
+    })   # pandas ≥3 (copy-on-write) ad değişikliğinde veriyi kopyalamaz; 2.x'te bir kopya alınır
 
     for col in ["open","high","low","close","adj_close","volume"]:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
     df = df.dropna()
+    return df if not df.empty else None
 
-    # 🔒 İntraday ise son (kapanmamış) barı at → tutarlı skor
-    if interval in ("30m", "60m", "120m") and len(df) > 1:
-        df = df.iloc[:-1]
+def _drop_unclosed(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    # 🔒 İntraday ise kapanmamış barı at → tutarlı skor.
+    # Index tz'li ise bar kapanışı zamana göre belirlenir (seans sonrası son bar da kapanmıştır).
+    if interval not in _INTRADAY or len(df) <= 1:
+        return df
+    if df.index.tz is None:
+        return df.iloc[:-1]
+    now = pd.Timestamp.now(tz=df.index.tz)
+    return df[df.index + _BAR[interval] <= now]
 
-    return df if not df.empty else None
+def _fresh(meta: dict, interval: str, last_ns: int, now: pd.Timestamp) -> bool:
+    age = time.time() - meta["updated_at"]
+    if interval not in _INTRADAY:
+        return age < _DAILY_MIN_REFRESH
+    bar = _BAR[interval]
+    # son kapanmış barın ardından gelen bar henüz kapanamaz
+    next_close = pd.Timestamp(last_ns, tz="UTC") + 2 * bar
+    return now < next_close or age < min(bar.total_seconds(), _DAILY_MIN_REFRESH)
+
+def _plan(st: OhlcvStore, ticker: str, interval: str, start_ns: int | None):
+    """Depo durumuna göre ne indirileceğine karar verir: ('local'|'full'|'tail', since)."""
+    meta = st.meta(ticker, interval)
+    last_ns = st.last_ts(ticker, interval) if meta else None
+    covered = (
+        meta is not None and last_ns is not None
+        and (meta["covered_from"] is None or (start_ns is not None and meta["covered_from"] <= start_ns))
+        and (start_ns is None or last_ns >= start_ns)
+    )
+    if not covered:
+        return "full", None
+    if _fresh(meta, interval, last_ns, pd.Timestamp.now(tz="UTC")):
+        return "local", None
+    # yalnızca son saklanan bardan itibaren iste; son bar da yeniden yazılır (canlı günlük bar)
+    return "tail", pd.Timestamp(last_ns, tz="UTC") if meta["tz"] else pd.Timestamp(last_ns)
+
+def _start_ns(interval: str, period: str) -> int | None:
+    # Günlük index tz'siz (yerel tarih), intraday tz'li gelir → kıyas aynı eksende yapılır
+    if interval in _INTRADAY:
+        start = period_start(period, pd.Timestamp.now(tz="UTC"))
+    else:
+        start = period_start(period, pd.Timestamp.now())
+        start = start.normalize() if start is not None else None
+    return None if start is None else start.as_unit("ns").value
+
+def _groups(tickers: list[str], interval: str, period: str):
+    """Depo durumuna göre sembolleri (tür, since) gruplarına ayırır."""
+    st = get_store()
+    start_ns = None
+    if st is not None:
+        try:
+            start_ns = _start_ns(interval, period)
+        except ValueError:
+            st = None  # depo period'u çözemedi → doğrudan Yahoo'ya sor
+
+    groups: dict[tuple, list[str]] = {}
+    for t in tickers:
+        kind, since = ("full", None)
+        if st is not None:
+            try:
+                kind, since = _plan(st, t, interval, start_ns)
+            except Exception as e:
+                logger.warning(f"OHLCV deposu hatası ({t} {interval}): {e}")
+        groups.setdefault((kind, since), []).append(t)
+    return st, start_ns, groups
+
+def _finish(st: OhlcvStore | None, group: list[str], kind: str, raw: dict, interval: str,
+            start_ns: int | None, failed: set[str] = frozenset()) -> dict[str, pd.DataFrame]:
+    """
+    İndirilenleri normalize eder, depoya yazar ve period'u depodan okur. failed: isteği hata
+    veren semboller; bunların kaydı tazelenmez (touch yok) → sonraki çağrı yeniden dener.
+    """
+    out: dict[str, pd.DataFrame] = {}
+    for t in group:
+        df = _normalize(raw.get(t))
+        df = _drop_unclosed(df, interval) if df is not None else None
+        if st is None:
+            if df is not None and not df.empty:
+                out[t] = df
+            continue
+        try:
+            if kind == "full":
+                if df is None or df.empty:
+                    continue
+                st.save(t, interval, df, covered_from=start_ns)
+            elif kind == "tail":
+                if df is not None and not df.empty:
+                    st.save(t, interval, df, covered_from=None, keep_coverage=True)
+                elif t not in failed:
+                    st.touch(t, interval)   # başarılı ama yeni bar yok
+            df = st.load(t, interval, start_ns)
+        except Exception as e:
+            logger.warning(f"OHLCV deposu hatası ({t} {interval}): {e}")
+        if df is not None and not df.empty:
+            out[t] = df
+    return out
+
+async def _fetch(tickers: list[str], interval: str, period: str, attempts: int) -> dict[str, pd.DataFrame]:
+    # depo (SQLite) ve pandas işi thread havuzunda (sınıfa göre, priority); ağ beklemesi event loop'ta
+    st, start_ns, groups = await priority.to_thread(_groups, tickers, interval, period)
+
+    async def one(kind, since, group):
+        raw: dict[str, pd.DataFrame] = {}
+        failed: set[str] = set()
+        if kind != "local":
+            batches = [group[i:i + _BATCH] for i in range(0, len(group), _BATCH)]
+            parts = await asyncio.gather(*(
+                _download(b, interval, period=period if kind == "full" else None, start=since, attempts=attempts)
+                for b in batches))
+            for b, part in zip(batches, parts):
+                if part is None:
+                    failed.update(b)
+                else:
+                    raw.update(part)
+        return await priority.to_thread(_finish, st, group, kind, raw, interval, start_ns, failed)
+
+    out: dict[str, pd.DataFrame] = {}
+    for part in await asyncio.gather(*(one(k, s, g) for (k, s), g in groups.items())):
+        out.update(part)
+    return out
+
+async def fetch_ohlcv(ticker: str, interval: str = "60m", period: str = "60d") -> pd.DataFrame | None:
+    interval = _INTERVALS.get(interval, "60m")
+    if interval not in NATIVE_LIMIT_DAYS:
+        return (await fetch_frames([ticker], [(interval, period)]))[(interval, period)].get(ticker)
+    return (await _fetch([ticker], interval, period, attempts=3)).get(ticker)
+
+async def fetch_many(tickers: list[str], interval: str = "60m", period: str = "60d") -> dict[str, pd.DataFrame]:
+    """
+    Evreni _BATCH'lik gruplar hâlinde tek seferde indirir. Toplu sonuçta eksik kalan
+    semboller için tekil fetch_ohlcv (yeniden denemeli) devreye girer.
+    """
+    interval = _INTERVALS.get(interval, "60m")
+    if interval not in NATIVE_LIMIT_DAYS:
+        return (await fetch_frames(tickers, [(interval, period)]))[(interval, period)]
+    out = await _fetch(list(tickers), interval, period, attempts=1)
+    missing = [t for t in tickers if t not in out]
+    for t, df in zip(missing, await asyncio.gather(*(fetch_ohlcv(t, interval, period) for t in missing))):
+        if df is not None:
+            out[t] = df
+    return out
+
+def _slice(df: pd.DataFrame, interval: str, period: str) -> pd.DataFrame:
+    now = pd.Timestamp.now(tz=df.index.tz)
+    start = period_start(period, now)
+    if start is None:
+        return df
+    if interval not in _INTRADAY:
+        start = start.normalize()
+    return df[df.index >= start]
+
+def _derive(base: dict[str, pd.DataFrame], plan) -> dict[tuple[str, str], dict[str, pd.DataFrame]]:
+    out = {}
+    for itv, per, asked in plan.targets:
+        frames = {}
+        for t, df in base.items():
+            df = _slice(df, itv, per) if per != plan.period else df
+            if itv != plan.base:
+                df = resample_ohlcv(df, itv)
+            if not df.empty:
+                frames[t] = df
+        out[(itv, asked)] = frames
+    return out
+
+async def fetch_frames(tickers: list[str], specs: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, pd.DataFrame]]:
+    """
+    Birden çok (interval, period) için veriyi tek seferde hazırlar: her sembol, gereken
+    en ince taban dilimde ve en geniş period'da bir kez çekilir; diğer dilimler
+    yeniden örneklenir, kısa period'lar dilimlenir. Dönüş: (interval, period) → sembol → df.
+    """
+    async def run(plan):
+        base = await fetch_many(tickers, plan.base, plan.period)
+        return await priority.to_thread(_derive, base, plan)
+
+    out: dict[tuple[str, str], dict[str, pd.DataFrame]] = {}
+    plans = plan_fetches([(_INTERVALS.get(i, "60m"), p) for i, p in specs])
+    for part in await asyncio.gather(*(run(p) for p in plans)):
+        out.update(part)
+    # çağıranın verdiği anahtarlarla da erişilebilsin (ör. tanımsız interval → 60m)
+    for i, p in specs:
+        out.setdefault((i, p), out.get((_INTERVALS.get(i, "60m"), p), {}))
+    return out
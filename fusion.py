@@ -0,0 +1,105 @@
+# fusion.py
+"""
+Çoklu zaman dilimi birleştirme: aynı sembolün dilim özetlerinden tek sıralı liste.
+Ağırlıklı skor, yön uyumu ve hedeflerin en ilgili dilimden seçilmesi kayıt dizileri
+üzerinde (np.unique + bincount) vektörel yapılır.
+"""
+import math
+import os
+import numpy as np
+import pandas as pd
+from analyzers.signal import SIGNAL_DTYPE
+from timeframes import MINUTES, period_start
+
+MAX_SPECS = 4
+
+def _env_weights(raw: str) -> dict[str, float]:
+    out = {}
+    for tok in raw.split(","):
+        itv, _, w = tok.strip().partition(":")
+        try:
+            out[itv] = float(w)
+        except ValueError:
+            pass
+    return out
+
+# MTF_WEIGHTS: "15m:1,1d:3" gibi elle ağırlık; verilmeyen dilimler tf_weight ile
+_WEIGHTS = _env_weights(os.getenv("MTF_WEIGHTS", ""))
+
+def tf_weight(interval: str) -> float:
+    """Kaba dilim daha ağır, ama yavaş artar: 15m → 1, 60m → 2, 1d → ~4.3."""
+    if interval in _WEIGHTS:
+        return _WEIGHTS[interval]
+    return 1.0 + math.log(max(MINUTES.get(interval, 60), 15) / 15, 4)
+
+def fused_dtype(k: int) -> np.dtype:
+    # gösterim alanları seçilen dilimden; scores: dilim sırasıyla skorlar (veri yoksa NaN)
+    return np.dtype(SIGNAL_DTYPE.descr + [
+        ("fused", "f8"), ("wscore", "f8"), ("agree", "f8"), ("direction", "i1"),
+        ("n", "i1"), ("interval", "U8"), ("scores", "f4", (k,)),
+    ])
+
+def fuse(by_spec: dict, specs, weights: dict[str, float] | None = None) -> np.ndarray:
+    """
+    by_spec: (interval, period) → (results, skipped) (scan_presets çıktısı).
+    wscore: dilim ağırlıklı ortalama skor; direction: ağırlıklı öneri yönü (1/0/-1);
+    agree: bu yöndeki dilimlerin ağırlık payı (verisi olmayan dilim uyumsuz sayılır);
+    fused = wscore × (0.5 + 0.5 × agree). Hedefler yönle uyumlu dilimlerden ağırlık × skoru
+    en yüksek olandan alınır. Dönüş: fused ↓ / sembol ↓ sıralı dizi.
+    """
+    specs = [tuple(s) for s in specs]
+    dt = fused_dtype(len(specs))
+    parts = [by_spec[s][0] for s in specs]
+    if not any(len(p) for p in parts):
+        return np.zeros(0, dtype=dt)
+    wmap = weights or {}
+    W = np.array([wmap.get(itv, tf_weight(itv)) for itv, _ in specs])
+    rows = np.concatenate(parts)
+    src = np.repeat(np.arange(len(parts)), [len(p) for p in parts])
+    _, inv = np.unique(rows["ticker"], return_inverse=True)
+    m = int(inv.max()) + 1
+    w = W[src]
+    bias = rows["bias"].astype("f8")
+
+    wsum = np.bincount(inv, weights=w, minlength=m)
+    wscore = np.bincount(inv, weights=w * rows["score"], minlength=m) / wsum
+    direction = np.sign(np.bincount(inv, weights=w * bias, minlength=m)).astype("i1")
+    agrees = rows["bias"] == direction[inv]
+    agree = np.bincount(inv, weights=w * agrees, minlength=m) / W.sum()
+
+    # grup içinde en ilgili satır: önce yön uyumu, sonra ağırlık × skor (lexsort son anahtar birincil)
+    order = np.lexsort((w * rows["score"], agrees, inv))
+    last = np.r_[inv[order][1:] != inv[order][:-1], True]
+    pick = order[last]                       # inv sırasıyla sembol başına bir satır
+
+    out = np.zeros(m, dtype=dt)
+    for f in SIGNAL_DTYPE.names:
+        out[f] = rows[f][pick]
+    out["wscore"] = wscore
+    out["agree"] = agree
+    out["direction"] = direction
+    out["fused"] = wscore * (0.5 + 0.5 * agree)
+    out["n"] = np.bincount(inv, minlength=m)
+    out["interval"] = np.array([itv for itv, _ in specs])[src[pick]]
+    scores = np.full((m, len(specs)), np.nan, dtype="f4")
+    scores[inv, src] = rows["score"]
+    out["scores"] = scores
+    return out[np.lexsort((out["ticker"], out["fused"]))[::-1]]
+
+def parse_specs(tokens: list[str]) -> list[tuple[str, str]]:
+    """["15m:14d,60m:60d", "1d:1y"] → [("15m", "14d"), ("60m", "60d"), ("1d", "1y")]"""
+    out = []
+    for tok in ",".join(tokens).split(","):
+        itv, _, per = tok.strip().lower().partition(":")
+        if not itv:
+            continue
+        if itv not in MINUTES:
+            raise ValueError(f"Desteklenmeyen interval: {itv} ({', '.join(MINUTES)})")
+        if not per:
+            raise ValueError(f"Period eksik: {itv} (ör. {itv}:60d)")
+        period_start(per, pd.Timestamp.now())   # geçersiz period → ValueError
+        out.append((itv, per))
+    out = list(dict.fromkeys(out))
+    if not 2 <= len(out) <= MAX_SPECS:
+        raise ValueError(f"2–{MAX_SPECS} dilim gerekli")
+    return out
@@ -1,31 +1,44 @@
 # main.py
 import asyncio
+import html
+import math
 import os
 import logging
+import re
+import sys
+import time
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
+# modüller env'i import anında okuyabilir → önce .env
+load_dotenv()
+
 from telegram import Update
 from telegram.constants import ParseMode
+from telegram.error import BadRequest, RetryAfter
+from telegram.request import HTTPXRequest
 from telegram.ext import Application, CommandHandler, ContextTypes
 
+import metrics
+from cache import ANALYSES, BACKTESTS, PHOTOS
+from priority import BULK, INTERACTIVE, JOBS, current_job
+from symbols import UNIVERSES, universe, universe_name
 from utils import normalize_bist
-from data import fetch_ohlcv
-from analyzers.indicators import add_indicators
-from analyzers.patterns import detect_all_patterns
-from analyzers.scoring import build_signal_summary
-from analyzers.plotting import draw_analysis
-from analyzers.targets import normalize_targets
-from scanner import scan_many
-from symbols import BIST_LIST
+from watchlists import WATCHLISTS
+
+# Ağır modüller (pandas, ta, matplotlib; scanner/compute/backtest …) burada içe aktarılmaz:
+# polling hemen başlar, warmup.warm_up bunları arka planda yükler. Komutlar ihtiyaç
+# duydukları modülü fonksiyon içinde alır; ısınma bitmişse bu yalnızca sözlük aramasıdır.
 
 # --- Logging & env ---
-load_dotenv()
 logging.basicConfig(
     format="%(asctime)s %(levelname)s:%(name)s: %(message)s",
     level=logging.INFO,
 )
 logger = logging.getLogger("bot")
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+# /stats yetkisi: virgülle ayrılmış Telegram kullanıcı id'leri
+ADMIN_IDS = {int(x) for x in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if x.lstrip("-").isdigit()}
 
 HELP = (
     "Komutlar:\n"
@@ -34,7 +47,15 @@ HELP = (
     "/top10 [interval] [period]\n"
     "/top10kisa  (15m/14d + 30m/30d)\n"
     "/top10orta  (60m/60d + 90m/90d)\n"
-    "/top10uzun  (1d/180d + 1d/365d)"
+    "/top10uzun  (1d/180d + 1d/365d)\n"
+    "/top10mtf interval:period,...  (2–4 dilim, birleşik skor)\n"
+    "/backtest [1d:10y] [60m:730d]  (skorlama kuralının geçmiş performansı)\n"
+    "/liste [ekle|sil TICKER …] [temizle]  (sohbetin izleme listesi)\n"
+    "/tara [interval period] ifade [sırala alan]  (ör. /tara rsi > 60 ve cmf > 0 sırala adx)\n"
+    "/izle TICKER koşul [interval]  (alarm: skor>=75, rsi>50, formasyon, hedef; /izle → liste)\n"
+    "Tarama komutlarına evren eklenebilir: bist30, bist100, bist250, birlesik (üç listenin birleşimi), "
+    "tum (symbols_tum.txt ile tüm pay piyasası), liste "
+    "(ör. /top10 universe=bist100 1d 180d)"
 )
 
 def pct_str(price: float, target: float, side: str = "long") -> str:
@@ -64,38 +85,53 @@ async def analiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"⏳ Analiz: {raw} → {ticker} | {interval}/{period}"
     )
 
-    loop = asyncio.get_running_loop()
     try:
-        df = await loop.run_in_executor(None, fetch_ohlcv, ticker, interval, period)
-        if df is None or df.empty:
-            await note.edit_text("Veri bulunamadı."); return
-
-        df = await loop.run_in_executor(None, add_indicators, df)
-        pats = await loop.run_in_executor(None, detect_all_patterns, df)
-        summary = await loop.run_in_executor(None, build_signal_summary, df, pats)
-
-        # Yön/tutarlılık + Zaman dilimine göre ATR ölçeklemesi
-        summary = normalize_targets(summary, interval)
-
-        img_bytes = await loop.run_in_executor(None, draw_analysis, df, summary)
+        from analyzers.targets import buy_zone_text, eta_text, normalize_targets
+        from scanner import analysis_key, analyze_ticker
 
-        p = float(summary["price"])
-        h1 = float(summary["t1"]); h2 = float(summary["t2"])
-        stop = float(summary["stop"])
+        df, key = await analysis_key(ticker, interval, period)
+        if df is None:
+            await note.edit_text("Veri bulunamadı."); return
+        head = f"<b>{raw}</b> ({ticker}) — {interval}/{period}\n"
+
+        # aynı bar için daha önce yüklendiyse: çizim ve yükleme yok, Telegram file_id ile gönder
+        hit = PHOTOS.get(key)
+        if hit is not None:
+            body, file_id = hit
+            try:
+                await update.message.reply_photo(photo=file_id, caption=head + body, parse_mode=ParseMode.HTML)
+                metrics.inc("analiz_photos_total", source="file_id")
+                await note.delete(); return
+            except BadRequest as e:
+                logger.warning(f"file_id geçersiz ({ticker} {interval}/{period}), yeniden çizilecek: {e}")
+                PHOTOS.invalidate(lambda k: k == key)
+
+        # CPU zinciri (indikatör → formasyon → özet → grafik) süreç havuzunda; sonuç önbellekli
+        _, sig, img_bytes = await analyze_ticker(ticker, interval, period, render=True, df=df, key=key)
+
+        # Yön/tutarlılık; metinler (alım bölgesi, ETA) yalnızca burada üretilir
+        s = normalize_targets(sig)
         # bias'a göre işaret doğal; sadece formatı ekliyoruz
-        h1pct = pct_str(p, h1)
-        h2pct = pct_str(p, h2)
-
-        caption = (
-            f"<b>{raw}</b> ({ticker}) — {interval}/{period}\n"
-            f"Fiyat: <b>{summary['price']:.2f}</b> | ATR: {summary['atr']:.2f}\n"
-            f"Öneri: <b>{summary['bias_text']}</b> | Skor: <b>{summary['score']:.0f}/100</b>\n"
-            f"Durum: {summary['pattern_text']}\n"
-            f"Alım Bölgesi: {summary['buy_zone']} | Stop: <b>{stop:.2f}</b>\n"
-            f"Hedef1: <b>{h1:.2f}</b> ({h1pct}) | Hedef2: <b>{h2:.2f}</b> ({h2pct}) | ETA: {summary['eta']}"
+        h1pct = pct_str(s.price, s.t1)
+        h2pct = pct_str(s.price, s.t2)
+
+        body = (
+            f"Fiyat: <b>{s.price:.2f}</b> | ATR: {s.atr:.2f}\n"
+            f"Öneri: <b>{s.bias_text}</b> | Skor: <b>{s.score:.0f}/100</b>\n"
+            f"Durum: {s.pattern_text}\n"
+            f"Alım Bölgesi: {buy_zone_text(s)} | Stop: <b>{s.stop:.2f}</b>\n"
+            f"Hedef1: <b>{s.t1:.2f}</b> ({h1pct}) | Hedef2: <b>{s.t2:.2f}</b> ({h2pct}) | ETA: {eta_text(s, interval)}"
         )
-        await update.message.reply_photo(photo=img_bytes, caption=caption, parse_mode=ParseMode.HTML)
+        msg = await update.message.reply_photo(photo=img_bytes, caption=head + body, parse_mode=ParseMode.HTML)
+        metrics.inc("analiz_photos_total", source="upload")
+        if msg is not None and msg.photo:
+            # bar döndüyse aynı dilimin eski kayıtları; PNG artık gerekmez (file_id yeterli)
+            PHOTOS.invalidate(lambda k: k[:3] == key[:3] and k != key)
+            PHOTOS.put(key, (body, msg.photo[-1].file_id))
+            ANALYSES.invalidate(lambda k: k == key)
         await note.delete()
+    except asyncio.CancelledError:
+        await note.edit_text(f"⛔ Analiz durduruldu: {_cancel_reason()}"); raise
     except Exception as e:
         logger.exception("Analiz hatası: %s", e)
         await note.edit_text(f"❌ Hata: {e}")
@@ -113,130 +149,522 @@ async def score_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"⏳ Skor hesaplanıyor: {raw} → {ticker} | {interval}/{period}"
     )
 
-    loop = asyncio.get_running_loop()
     try:
-        df = await loop.run_in_executor(None, fetch_ohlcv, ticker, interval, period)
-        if df is None or df.empty:
-            await note.edit_text("Veri bulunamadı."); return
+        from analyzers.targets import eta_text, normalize_targets
+        from scanner import analyze_ticker
 
-        df = await loop.run_in_executor(None, add_indicators, df)
-        pats = await loop.run_in_executor(None, detect_all_patterns, df)
-        s = await loop.run_in_executor(None, build_signal_summary, df, pats)
-        s = normalize_targets(s, interval)
+        df, sig, _ = await analyze_ticker(ticker, interval, period)
+        if df is None:
+            await note.edit_text("Veri bulunamadı."); return
 
-        p = float(s["price"]); h1 = float(s["t1"]); h2 = float(s["t2"])
-        h1pct = pct_str(p, h1); h2pct = pct_str(p, h2)
+        s = normalize_targets(sig)
+        h1pct = pct_str(s.price, s.t1); h2pct = pct_str(s.price, s.t2)
 
         await note.edit_text(
             f"<b>{raw}</b> ({ticker}) — {interval}/{period}\n"
-            f"Skor: <b>{s['score']:.0f}</b> | Öneri: {s['bias_text']} | Fiyat: {s['price']:.2f}\n"
-            f"H1: <b>{h1:.2f}</b> ({h1pct}) | H2: <b>{h2:.2f}</b> ({h2pct}) | ETA: {s['eta']}",
+            f"Skor: <b>{s.score:.0f}</b> | Öneri: {s.bias_text} | Fiyat: {s.price:.2f}\n"
+            f"H1: <b>{s.t1:.2f}</b> ({h1pct}) | H2: <b>{s.t2:.2f}</b> ({h2pct}) | ETA: {eta_text(s, interval)}",
             parse_mode=ParseMode.HTML
         )
+    except asyncio.CancelledError:
+        await note.edit_text(f"⛔ Skor durduruldu: {_cancel_reason()}"); raise
     except Exception as e:
         await note.edit_text(f"❌ Hata: {e}")
 
+# iptal nedeni (priority.Job.reason) → kullanıcıya gösterilen metin
+CANCEL_TEXT = {"superseded": "aynı komut yeniden gönderildi", "deadline": "süre sınırı doldu",
+               "shutdown": "bot yeniden başlıyor"}
+
+def _cancel_reason() -> str:
+    job = current_job()
+    return CANCEL_TEXT.get(job.reason if job else None, "iptal edildi")
+
+def _stamp(snap) -> str:
+    return (f"\n<i>🕒 {snap.asof:%d.%m %H:%M} bar kapanışı itibarıyla "
+            f"(hesap: {snap.built_at:%H:%M:%S})</i>")
+
+def top10_text(results, skipped, interval: str, period: str) -> str:
+    """results: sıralı SIGNAL_DTYPE dizisi; yalnızca ilk 10 satır biçimlenir."""
+    from analyzers.signal import Signal
+    from analyzers.targets import buy_zone_text, eta_text, normalize_targets
+    top10_list = results[:10]
+    cutoff = float(top10_list[-1]["score"])
+
+    lines = []
+    for i, row in enumerate(top10_list, start=1):
+        s = normalize_targets(Signal.from_record(row))
+        h1pct = pct_str(s.price, s.t1); h2pct = pct_str(s.price, s.t2)
+        lines.append(
+            f"{i:02d}. <b>{row['ticker']}</b> — Skor: <b>{s.score:.0f}</b> | "
+            f"Öneri: {s.bias_text} | Fiyat: {s.price:.2f}\n"
+            f"Alım: {buy_zone_text(s)} | Stop: {s.stop:.2f} | "
+            f"H1: {s.t1:.2f} ({h1pct}) | H2: {s.t2:.2f} ({h2pct}) | ETA: {eta_text(s, interval)}"
+        )
+
+    txt = f"🔥 <b>TOP 10</b> — {interval}/{period}\n" + "\n".join(lines)
+    txt += f"\n\n<i>Cutoff (10. sıra) skor:</i> <b>{cutoff:.0f}</b>"
+
+    if skipped:
+        txt += f"\n\n<i>Atlanan:</i> {', '.join(skipped[:12])}"
+    return txt
+
+# --- Evrenler ---
+WATCHLIST = "liste"
+_UNIVERSE_KEYS = ("universe", "evren", "u")
+
+def pick_universe(update: Update, args: list[str]) -> tuple[list[str], str, list[str]]:
+    """
+    Argümanlardan evren seçimi: "bist100", "universe=bist100" (evren=/u= de olur) ya da
+    "liste" (sohbetin izleme listesi). Dönüş: (semboller, evren adı, kalan argümanlar).
+    Bilinmeyen evren ya da boş izleme listesi → ValueError.
+    """
+    name, rest = None, []
+    for a in args:
+        key, eq, val = a.lower().partition("=")
+        explicit = bool(eq) and key in _UNIVERSE_KEYS
+        tok = val if explicit else a.lower()
+        if tok == WATCHLIST or universe_name(tok):
+            name = tok if tok == WATCHLIST else universe_name(tok)
+        elif explicit:
+            raise ValueError(f"Bilinmeyen evren: {val} ({', '.join(UNIVERSES)}, {WATCHLIST})")
+        else:
+            rest.append(a)
+    if name == WATCHLIST:
+        tickers = WATCHLISTS.get(update.effective_chat.id if update.effective_chat else 0)
+        if not tickers:
+            raise ValueError("İzleme listesi boş: /liste ekle THYAO ASELS …")
+        return tickers, name, rest
+    name = universe_name(name)
+    return universe(name), name, rest
+
+async def liste(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    chat = update.effective_chat.id if update.effective_chat else 0
+    op, syms = (context.args[0].lower(), context.args[1:]) if context.args else ("", [])
+    if op == "ekle" and syms:
+        cur = WATCHLISTS.add(chat, syms)
+    elif op == "sil" and syms:
+        cur = WATCHLISTS.remove(chat, syms)
+    elif op == "temizle":
+        WATCHLISTS.clear(chat); cur = []
+    elif not op:
+        cur = WATCHLISTS.get(chat)
+    else:
+        await update.message.reply_text("Kullanım: /liste [ekle|sil TICKER …] [temizle]"); return
+    if not cur:
+        await update.message.reply_text("İzleme listesi boş. Eklemek için: /liste ekle THYAO ASELS"); return
+    await update.message.reply_text(
+        f"📋 İzleme listesi ({len(cur)}): " + ", ".join(s.removesuffix(".IS") for s in cur)
+        + f"\nTaramak için: /top10 {WATCHLIST}")
+
+# --- Tarayıcı ---
+_PERIOD_TOKEN = re.compile(r"^(\d+(d|wk|mo|y)|max|ytd)$", re.IGNORECASE)
+
+async def tara(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    from screener import USAGE, compile_query, fmt_value, screen, snapshot, split_sort
+    from timeframes import MINUTES
+    try:
+        tickers, name, args = pick_universe(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(str(e)); return
+    interval, period = "60m", "60d"
+    if args and args[0].lower() in MINUTES:
+        interval, args = args[0].lower(), args[1:]
+        if args and _PERIOD_TOKEN.match(args[0]):
+            period, args = args[0].lower(), args[1:]
+    try:
+        expr, sort, desc = split_sort(" ".join(args))
+        query = compile_query(expr)
+    except ValueError as e:
+        await update.message.reply_text(f"{e}\n\n{USAGE}"); return
+
+    note = await update.message.reply_text(f"🔎 Tarama hazırlanıyor: {len(tickers)} sembol ({name}) | {interval}/{period}")
+    try:
+        snap = await snapshot(tickers, interval, period)
+        t0 = time.perf_counter()
+        rows = screen(snap, query, sort, desc)
+        ms = (time.perf_counter() - t0) * 1e3
+    except asyncio.CancelledError:
+        await note.edit_text(f"⛔ Tarama durduruldu: {_cancel_reason()}."); raise
+    except Exception as e:
+        logger.exception("Tarama hatası: %s", e)
+        await note.edit_text(f"❌ Hata: {e}"); return
+
+    cols = list(dict.fromkeys([*([sort] if sort else []), *query.fields, "score", "price"]))[:5]
+    lines = [f"{i:02d}. <b>{str(r['ticker']).removesuffix('.IS')}</b> — "
+             + " | ".join(f"{c} {fmt_value(c, r[c])}" for c in cols) for i, r in enumerate(rows[:20], start=1)]
+    head = (f"🔎 <b>Tarama</b> — {interval}/{period} | {name}: {len(rows)}/{len(snap)} eşleşti ({ms:.1f} ms)\n"
+            f"<code>{html.escape(query.text)}</code>"
+            + (f"\nSıralama: {sort} {'↓' if desc else '↑'}" if sort else ""))
+    await note.edit_text(head + "\n\n" + ("\n".join(lines) or "Eşleşen sembol yok."), parse_mode=ParseMode.HTML)
+
+# --- Alarmlar ---
+async def izle(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    from alerts import ALERTS, USAGE, parse_rule, rule_text
+    chat = update.effective_chat.id if update.effective_chat else 0
+    args = context.args
+    if not args:
+        rules = ALERTS.for_chat(chat)
+        if not len(rules):
+            await update.message.reply_text("Alarm yok.\n\n" + USAGE); return
+        lines = [f"#{r['id']} {str(r['ticker']).removesuffix('.IS')} ({r['interval']}) — {rule_text(r)}" for r in rules]
+        await update.message.reply_text("🔔 Alarmlar:\n" + "\n".join(lines)
+                                        + "\n\nSilmek için: /izle sil ID | /izle temizle"); return
+    op = args[0].lower()
+    if op == "sil" and len(args) > 1 and args[1].lstrip("#").isdigit():
+        n = ALERTS.remove(chat, int(args[1].lstrip("#")))
+        await update.message.reply_text("Alarm silindi." if n else "Bu sohbette böyle bir alarm yok."); return
+    if op == "temizle":
+        n = ALERTS.remove(chat)
+        await update.message.reply_text(f"{n} alarm silindi."); return
+    try:
+        kind, sign, level, interval = parse_rule(args[1:])
+        rid, new = ALERTS.add(chat, args[0], kind, sign, level, interval)
+    except ValueError as e:
+        await update.message.reply_text(f"{e}\n\n{USAGE}"); return
+    cond = rule_text({"kind": kind, "sign": sign, "level": level})
+    await update.message.reply_text(
+        f"🔔 Alarm #{rid} {'kuruldu' if new else 'zaten var'}: {normalize_bist(args[0])} ({interval}) — {cond}\n"
+        f"Seans içinde her {interval} bar kapanışında kontrol edilir.")
+
 async def top10(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    interval = context.args[0] if len(context.args) > 0 else "60m"
-    period   = context.args[1] if len(context.args) > 1 else "60d"
+    try:
+        tickers, name, args = pick_universe(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(str(e)); return
+    interval = args[0] if len(args) > 0 else "60m"
+    period   = args[1] if len(args) > 1 else "60d"
+    from scheduler import SNAPSHOTS, spec_key
+
+    # zamanlayıcının son bar kapanışında hazırladığı sıralama (varsayılan evren) varsa beklemeden yanıtla
+    snap = SNAPSHOTS.get(spec_key(interval, period)) if name == universe_name() else None
+    if snap is not None and len(snap.rows):
+        await update.message.reply_text(top10_text(snap.rows, snap.skipped, interval, period) + _stamp(snap),
+                                        parse_mode=ParseMode.HTML)
+        return
 
     note = await update.message.reply_text(
-        f"⏳ Taramaya başlandı: {len(BIST_LIST)} sembol | {interval}/{period}"
+        f"⏳ Taramaya başlandı: {len(tickers)} sembol ({name}) | {interval}/{period}"
     )
     try:
-        results, skipped = await scan_many(BIST_LIST, interval, period, limit=None, return_skipped=True)
-        if not results:
-            await note.edit_text("Sonuç yok."); return
-
-        results = sorted(results, key=lambda x: (x[1].get("score",0), x[0]), reverse=True)
-        top10_list = results[:10]
-        cutoff = top10_list[-1][1].get("score", 0)
-
-        lines = []
-        for i, (tic, s) in enumerate(top10_list, start=1):
-            s = normalize_targets(s, interval)
-            p = float(s["price"]); h1 = float(s["t1"]); h2 = float(s["t2"])
-            h1pct = pct_str(p, h1); h2pct = pct_str(p, h2)
-            lines.append(
-                f"{i:02d}. <b>{tic}</b> — Skor: <b>{s['score']:.0f}</b> | "
-                f"Öneri: {s['bias_text']} | Fiyat: {s['price']:.2f}\n"
-                f"Alım: {s['buy_zone']} | Stop: {s['stop']} | "
-                f"H1: {h1:.2f} ({h1pct}) | H2: {h2:.2f} ({h2pct}) | ETA: {s['eta']}"
-            )
+        await stream_top10(note, interval, period, tickers)
+    except Exception as e:
+        await note.edit_text(f"❌ Hata: {e}")
 
-        txt = f"🔥 <b>TOP 10</b> — {interval}/{period}\n" + "\n".join(lines)
-        txt += f"\n\n<i>Cutoff (10. sıra) skor:</i> <b>{cutoff:.0f}</b>"
+# Telegram aynı mesajı sık düzenlemeyi sınırlar (~20/dk) → ara düzenlemeler en az bu aralıkla
+EDIT_INTERVAL = float(os.getenv("EDIT_INTERVAL", "3"))
 
-        if skipped:
-            txt += f"\n\n<i>Atlanan:</i> {', '.join(skipped[:12])}"
+def _progress_text(pr, interval: str, period: str) -> str:
+    lines = [f"{i:02d}. <b>{r['ticker']}</b> — {r['score']:.0f}" for i, r in enumerate(pr.top.items(), start=1)]
+    return (f"⏳ Taranıyor: {pr.done}/{pr.total} | {interval}/{period}\n"
+            f"<i>Geçici sıralama:</i>\n" + "\n".join(lines))
 
+async def _edit(note, txt: str) -> bool:
+    try:
         await note.edit_text(txt, parse_mode=ParseMode.HTML)
-    except Exception as e:
-        await note.edit_text(f"❌ Hata: {e}")
+        return True
+    except RetryAfter as e:
+        logger.info(f"Düzenleme sınırı, {e.retry_after} sn atlandı")
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
+    return False
+
+async def stream_top10(note, interval: str, period: str, tickers: list[str]):
+    """Tarama parça parça ilerlerken geçici top10'u gösterir; düzenlemeler EDIT_INTERVAL ile kısılır."""
+    from scanner import scan_stream
+    raw_slack = os.getenv("SCAN_EARLY_STOP", "").strip()
+    slack = float(raw_slack) if raw_slack else None
+    chunk = int(os.getenv("SCAN_CHUNK", "25"))
+
+    last_edit, pr = time.monotonic(), None
+    try:
+        async for pr in scan_stream(tickers, interval, period, k=10, chunk=chunk, slack=slack):
+            now = time.monotonic()
+            if pr.done < pr.total and not pr.stopped and len(pr.top) and now - last_edit >= EDIT_INTERVAL:
+                if await _edit(note, _progress_text(pr, interval, period)):
+                    last_edit = now
+    except asyncio.CancelledError:
+        # iptal/süre aşımı: o ana kadar taranan parçaların sıralaması kısmi sonuç olarak kalır
+        txt = f"⛔ Tarama durduruldu: {_cancel_reason()}."
+        if pr is not None and len(pr.top):
+            txt = (top10_text(pr.top.items(), pr.skipped, interval, period)
+                   + f"\n\n<i>Kısmi sonuç ({pr.done}/{pr.total} sembol). {txt}</i>")
+        await note.edit_text(txt, parse_mode=ParseMode.HTML)
+        raise
 
-# --- Preset Top10 (multi timeframe) ---
-async def run_presets(update: Update, presets, title: str):
-    note = await update.message.reply_text(f"⏳ {title} için tarama başlıyor…")
-    combined = {}
-
-    for interval, period in presets:
-        results, _ = await scan_many(BIST_LIST, interval, period, limit=None, return_skipped=True)
-        for tic, s in results:
-            if tic not in combined:
-                combined[tic] = {"scores": [], "data": s, "interval": interval}
-            combined[tic]["scores"].append(s["score"])
-
-    averaged = []
-    for tic, val in combined.items():
-        avg_score = sum(val["scores"]) / max(len(val["scores"]), 1)
-        data = normalize_targets(val["data"], val["interval"])
-        averaged.append((tic, avg_score, data))
-
-    averaged.sort(key=lambda x: x[1], reverse=True)
-    top10 = averaged[:10]
+    if pr is None or not len(pr.top):
+        await note.edit_text("Sonuç yok."); return
+    txt = top10_text(pr.top.items(), pr.skipped, interval, period)
+    if pr.stopped:
+        txt += f"\n<i>Erken bitti: kalan {pr.total - pr.done} sembolün aynı bardaki son skoru top10 tabanının altında.</i>"
+    await note.edit_text(txt, parse_mode=ParseMode.HTML)
 
+# --- Preset Top10 (multi timeframe) ---
+def fused_text(rows, specs, title: str) -> str:
+    """rows: fusion.fuse çıktısı (sıralı); specs: rows["scores"] sütunlarının dilimleri."""
+    from analyzers.signal import Signal
+    from analyzers.targets import buy_zone_text, eta_text, normalize_targets
+    k = len(specs)
     lines = []
-    for i, (tic, score, s) in enumerate(top10, start=1):
-        p = float(s["price"]); h1 = float(s["t1"]); h2 = float(s["t2"])
-        h1pct = pct_str(p, h1); h2pct = pct_str(p, h2)
+    for i, row in enumerate(rows[:10], start=1):
+        s = normalize_targets(Signal.from_record(row))
+        h1pct = pct_str(s.price, s.t1); h2pct = pct_str(s.price, s.t2)
+        tfs = " · ".join(f"{itv} {'–' if math.isnan(sc) else f'{sc:.0f}'}" for (itv, _), sc in zip(specs, row["scores"]))
         lines.append(
-            f"{i:02d}. <b>{tic}</b> — Ortalama Skor: <b>{score:.0f}</b>\n"
-            f"Öneri: {s['bias_text']} | Fiyat: {s['price']:.2f}\n"
-            f"Alım: {s['buy_zone']} | Stop: {s['stop']}\n"
-            f"H1: {h1:.2f} ({h1pct}) | H2: {h2:.2f} ({h2pct}) | ETA: {s['eta']}\n"
+            f"{i:02d}. <b>{row['ticker']}</b> — Birleşik Skor: <b>{row['fused']:.0f}</b> "
+            f"(uyum {row['agree']*100:.0f}%, {row['n']}/{k} dilim)\n"
+            f"Skorlar: {tfs}\n"
+            f"Öneri: {s.bias_text} | Fiyat: {s.price:.2f} | Hedef dilimi: {row['interval']}\n"
+            f"Alım: {buy_zone_text(s)} | Stop: {s.stop:.2f}\n"
+            f"H1: {s.t1:.2f} ({h1pct}) | H2: {s.t2:.2f} ({h2pct}) | ETA: {eta_text(s, str(row['interval']))}\n"
         )
-
-    txt = f"🔥 <b>TOP 10 {title}</b>\n\n" + "\n".join(lines)
-    await note.edit_text(txt, parse_mode=ParseMode.HTML)
+    if not lines:
+        return f"🔥 <b>TOP 10 {title}</b>\n\nSonuç yok (veri gelmedi)."
+    return f"🔥 <b>TOP 10 {title}</b>\n\n" + "\n".join(lines)
+
+async def run_fused(update: Update, specs, title: str, tickers: list[str], name: str,
+                    snap_key: str | None = None):
+    from compute import LOW_MEMORY
+    from fusion import fuse
+    from scanner import scan_fused, scan_presets
+    from scheduler import SNAPSHOTS
+    snap = SNAPSHOTS.get(snap_key) if snap_key and name == universe_name() else None
+    if snap is not None and len(snap.rows):
+        await update.message.reply_text(fused_text(snap.rows, specs, title) + _stamp(snap), parse_mode=ParseMode.HTML)
+        return
+
+    note = await update.message.reply_text(f"⏳ {title} için tarama başlıyor: {len(tickers)} sembol ({name})…")
+    # tek indirme planı; dilimler eşzamanlı analiz edilir, sonra sembol bazında birleşir
+    try:
+        if LOW_MEMORY:
+            rows = await scan_fused(tickers, specs, k=10)   # yalnızca en iyi 10 tutulur
+        else:
+            rows = fuse(await scan_presets(tickers, specs), specs)
+    except asyncio.CancelledError:
+        await note.edit_text(f"⛔ {title} taraması durduruldu: {_cancel_reason()}."); raise
+    await note.edit_text(fused_text(rows, specs, title), parse_mode=ParseMode.HTML)
+
+async def run_presets(update: Update, context: ContextTypes.DEFAULT_TYPE, preset: str):
+    from scanner import PRESETS
+    try:
+        tickers, name, _ = pick_universe(update, context.args)
+    except ValueError as e:
+        await update.message.reply_text(str(e)); return
+    title, presets = PRESETS[preset]
+    await run_fused(update, presets, title, tickers, name, snap_key=preset)
+
+async def top10mtf(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    from fusion import parse_specs
+    try:
+        tickers, name, args = pick_universe(update, context.args)
+        specs = parse_specs(args)
+    except ValueError as e:
+        await update.message.reply_text(f"{e}\nKullanım: /top10mtf 15m:14d,60m:60d,1d:180d [bist100]"); return
+    await run_fused(update, specs, "MTF " + " + ".join(f"{i}/{p}" for i, p in specs), tickers, name)
 
 async def top10kisa(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    presets = [("15m", "14d"), ("30m", "30d")]
-    await run_presets(update, presets, "Kısa Vade")
+    await run_presets(update, context, "kisa")
 
 async def top10orta(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    # 120m Yahoo'da desteklenmiyor → 90m kullanalım
-    presets = [("60m", "60d"), ("90m", "90d")]
-    await run_presets(update, presets, "Orta Vade")
+    await run_presets(update, context, "orta")
 
 async def top10uzun(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    presets = [("1d", "180d"), ("1d", "365d")]
-    await run_presets(update, presets, "Uzun Vade")
+    await run_presets(update, context, "uzun")
+
+# --- Backtest ---
+async def backtest_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    from backtest import DEFAULT_SPECS, parse_specs, report_text, run_backtest
+    try:
+        tickers, name, args = pick_universe(update, context.args)
+        specs = parse_specs(args) if args else list(DEFAULT_SPECS)
+    except ValueError as e:
+        await update.message.reply_text(f"{e}\nKullanım: /backtest [1d:10y] [60m:730d] [bist100]"); return
+
+    note = await update.message.reply_text(
+        f"⏳ Backtest: {', '.join(f'{i}/{p}' for i, p in specs)} | {len(tickers)} sembol ({name}) "
+        f"(ilk çalıştırma birkaç dakika sürebilir)"
+    )
+    try:
+        # aynı dilimler için eşzamanlı istekler tek hesabı bekler; sonuç BACKTEST_TTL boyunca saklanır
+        res = await BACKTESTS.get_or_compute((tuple(tickers), tuple(specs)), lambda: run_backtest(tickers, specs))
+        txt = html.escape(report_text(res))
+        if len(txt) > 3800:
+            txt = txt[:3800] + "\n…"
+        await note.edit_text(f"📈 <b>Backtest</b>\n<pre>{txt}</pre>", parse_mode=ParseMode.HTML)
+    except asyncio.CancelledError:
+        await note.edit_text(f"⛔ Backtest durduruldu: {_cancel_reason()}."); raise
+    except Exception as e:
+        logger.exception("Backtest hatası: %s", e)
+        await note.edit_text(f"❌ Hata: {e}")
+
+# --- Admin ---
+async def stats_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user = update.effective_user
+    if user is None or user.id not in ADMIN_IDS:
+        return  # yetkisiz kullanıcıya komutun varlığını belli etme
+    if not metrics.ENABLED:
+        await update.message.reply_text("Metrikler kapalı (METRICS=0)."); return
+    txt = html.escape(metrics.stats_text())
+    if len(txt) > 3900:
+        txt = txt[:3900] + "\n…"
+    await update.message.reply_text(f"<pre>{txt}</pre>", parse_mode=ParseMode.HTML)
+
+# --- Enstrümantasyon ---
+class TimedRequest(HTTPXRequest):
+    """Bot API çağrılarının (gönder/düzenle/sil) süresi: telegram_send{method=…}."""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        with metrics.timer("telegram_send", method=url.rsplit("/", 1)[-1]):
+            return await super().do_request(url, method, *args, **kwargs)
+
+def tracked(name: str, fn):
+    """Komut sayacı, süren komut göstergesi ve uçtan uca komut süresi."""
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        metrics.inc("commands_total", command=name)
+        with metrics.inflight("commands_inflight", command=name), metrics.timer("command", command=name):
+            return await fn(update, context)
+    return wrapper
+
+def _deadline(name: str, default: float) -> float | None:
+    v = float(os.getenv(name, default))
+    return v if v > 0 else None
+
+# sınıf başına süre sınırı (sn; 0 → yok). Backtest tüm geçmişi taradığı için ayrı.
+DEADLINES = {INTERACTIVE: _deadline("DEADLINE_INTERACTIVE", 120), BULK: _deadline("DEADLINE_BULK", 600)}
+
+def scheduled(name: str, fn, cls: int, deadline: float | None = None):
+    """
+    Komutu priority.JOBS üzerinden çalıştırır. Toplu işler ayrı görevde başlar (işleyici
+    hemen döner, sıradaki güncellemeler beklemez); etkileşimli işler beklenir. Aynı
+    sohbette aynı komut (etkileşimlide: aynı argümanlarla) gelirse eskisi iptal edilir.
+    """
+    deadline = deadline or DEADLINES[cls]
+
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        chat = update.effective_chat.id if update.effective_chat else 0
+        key = name if cls == BULK else " ".join([name, *context.args])
+        work = lambda: fn(update, context)
+        if cls == BULK:
+            ok = JOBS.start(chat, key, cls, work, deadline) is not None
+        else:
+            ok = await JOBS.run(chat, key, cls, work, deadline)
+        if not ok and JOBS.closed:
+            await update.message.reply_text("🔁 Bot yeniden başlatılıyor; birazdan tekrar deneyin.")
+        elif not ok:
+            await update.message.reply_text(
+                "⏳ Bu sohbette süren istekler sınırda; biri bitince tekrar deneyin "
+                "(aynı komutu yeniden göndermek eskisini iptal eder).")
+    return wrapper
 
 # --- App bootstrap ---
+async def on_startup(app: Application):
+    port = os.getenv("METRICS_PORT", "").strip()
+    if metrics.ENABLED and port.isdigit():
+        try:
+            app.bot_data["metrics_server"] = await metrics.start_http(int(port))
+        except OSError as e:
+            logger.warning(f"Metrik uç noktası açılamadı (:{port}): {e}")
+
+    # polling'i bekletmeden: ısınma + zamanlayıcı arka planda
+    app.bot_data["warmup"] = asyncio.create_task(background_start(app))
+
+async def background_start(app: Application):
+    t0 = time.perf_counter()
+    if os.getenv("WARMUP", "on").strip().lower() not in ("0", "off", "false"):
+        import warmup
+        try:
+            await warmup.warm_up()
+        except Exception as e:
+            logger.exception(f"Isınma hatası: {e}")
+
+    from scheduler import build_scheduler
+
+    async def notify(chat_id: int, text: str):
+        await app.bot.send_message(chat_id, text, parse_mode=ParseMode.HTML)
+
+    sched = build_scheduler(universe(), notify=notify)
+    if sched is not None:
+        if app.job_queue is None:
+            logger.warning("JobQueue yok (python-telegram-bot[job-queue] kurulu değil); zamanlayıcı kapalı.")
+        else:
+            sched.start(app.job_queue)
+    metrics.observe("startup_background", time.perf_counter() - t0)
+
+# kapanışta süren taramaların bitmesi için beklenecek en uzun süre (sn); sonra iptal edilirler
+SHUTDOWN_GRACE = float(os.getenv("SHUTDOWN_GRACE", "30"))
+
+async def on_stop(app: Application):
+    # güncelleme alımı ve JobQueue durdu, bot hâlâ mesaj gönderebilir → süren işler sonuçlarını yazar
+    left = await JOBS.drain(SHUTDOWN_GRACE)
+    if left:
+        logger.warning(f"Kapanış: {left} iş süre dolduğu için iptal edildi.")
+
+async def on_shutdown(app: Application):
+    task = app.bot_data.pop("warmup", None)
+    if task is not None and not task.done():
+        task.cancel()
+    await JOBS.cancel_all("shutdown")
+    server = app.bot_data.pop("metrics_server", None)
+    if server is not None:
+        server.close()
+    from compute import shutdown_pool
+    shutdown_pool()
+    if "shards" in sys.modules:
+        from shards import shutdown_shards
+        shutdown_shards()
+
+def concurrent_updates() -> int | bool:
+    """
+    CONCURRENT_UPDATES env: aynı anda işlenen en fazla güncelleme (varsayılan 32).
+    "0"/"off" → sırayla (PTB varsayılanı). Sohbet başına sınırlar ayrıca JOBS'ta.
+    """
+    raw = os.getenv("CONCURRENT_UPDATES", "32").strip().lower()
+    if raw in ("", "0", "off", "false"):
+        return False
+    return max(1, int(raw))
+
+def build_app(token: str, request=None, updates_request=None) -> Application:
+    """Uygulama + komutlar. request/updates_request: Bot API istek nesneleri (benchmark'ta sahte)."""
+    builder = (
+        Application.builder().token(token)
+        # getUpdates uzun yoklaması ayrı istek nesnesinde → telegram_send süresine karışmaz
+        .request(request or TimedRequest(connection_pool_size=256))
+        # bir /top10 ya da yavaş /analiz diğer kullanıcıların komutlarını bekletmesin
+        .concurrent_updates(concurrent_updates())
+        .post_init(on_startup).post_stop(on_stop).post_shutdown(on_shutdown)
+    )
+    if updates_request is not None:
+        builder = builder.get_updates_request(updates_request)
+    app = builder.build()
+    # ad → (işleyici, öncelik sınıfı, süre sınırı; None → sınıfın varsayılanı)
+    commands = {
+        "start": (start, INTERACTIVE, None), "analiz": (analiz, INTERACTIVE, None),
+        "score": (score_cmd, INTERACTIVE, None), "liste": (liste, INTERACTIVE, None),
+        "izle": (izle, INTERACTIVE, None), "tara": (tara, BULK, None), "top10": (top10, BULK, None),
+        "top10kisa": (top10kisa, BULK, None), "top10orta": (top10orta, BULK, None),
+        "top10uzun": (top10uzun, BULK, None), "top10mtf": (top10mtf, BULK, None),
+        "backtest": (backtest_cmd, BULK, _deadline("DEADLINE_BACKTEST", 3600)),
+    }
+    for name, (fn, cls, deadline) in commands.items():
+        app.add_handler(CommandHandler(name, scheduled(name, tracked(name, fn), cls, deadline)))
+    app.add_handler(CommandHandler("stats", stats_cmd))
+    return app
+
 def main():
     if not TOKEN:
         raise RuntimeError("TELEGRAM_BOT_TOKEN yok. .env dosyasını doldur.")
-    app = Application.builder().token(TOKEN).build()
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("analiz", analiz))
-    app.add_handler(CommandHandler("score", score_cmd))
-    app.add_handler(CommandHandler("top10", top10))
-    app.add_handler(CommandHandler("top10kisa", top10kisa))
-    app.add_handler(CommandHandler("top10orta", top10orta))
-    app.add_handler(CommandHandler("top10uzun", top10uzun))
-
-    logger.info("Bot çalışıyor…")
-    app.run_polling(drop_pending_updates=True)
+    app = build_app(TOKEN)
+    url = os.getenv("WEBHOOK_URL", "").strip()
+    if not url:
+        logger.info("Bot çalışıyor (polling)…")
+        app.run_polling(drop_pending_updates=True)
+        return
+    # webhook: ters vekil (nginx, caddy …) TLS'i sonlandırıp WEBHOOK_LISTEN:WEBHOOK_PORT'a iletir
+    path = os.getenv("WEBHOOK_PATH", "").strip() or urlsplit(url).path
+    listen, port = os.getenv("WEBHOOK_LISTEN", "127.0.0.1"), int(os.getenv("WEBHOOK_PORT", "8443"))
+    logger.info(f"Bot çalışıyor (webhook {url} → {listen}:{port}/{path.strip('/')})…")
+    app.run_webhook(listen=listen, port=port, url_path=path.strip("/"), webhook_url=url,
+                    secret_token=os.getenv("WEBHOOK_SECRET") or None, drop_pending_updates=True)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,253 @@
+# metrics.py
+import asyncio
+import bisect
+import contextlib
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# METRICS=0/off → tüm kayıtlar no-op (zamanlayıcılar tek bir nullcontext döner)
+ENABLED = os.getenv("METRICS", "on").strip().lower() not in ("0", "off", "false")
+PREFIX = "borsa"
+# saniye; Telegram gönderimi ve uçtan uca tarama için üst kovalar geniş
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, v)] += 1
+        self.count += 1
+        self.sum += v
+
+    def quantile(self, q: float) -> float:
+        """Kova sınırlarından kaba yüzdelik (kova üst sınırı)."""
+        if not self.count:
+            return 0.0
+        rank, acc = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+        return float("inf")
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hist: dict[tuple[str, tuple], Histogram] = {}
+        self.counters: dict[tuple[str, tuple], float] = {}
+        self.gauges: dict[tuple[str, tuple], float] = {}
+        self.collectors: dict[str, Callable[[], dict]] = {}
+
+    def observe(self, name: str, v: float, labels: tuple = ()) -> None:
+        with self._lock:
+            h = self.hist.get((name, labels))
+            if h is None:
+                h = self.hist[(name, labels)] = Histogram()
+            h.observe(v)
+
+    def inc(self, name: str, v: float = 1.0, labels: tuple = ()) -> None:
+        with self._lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0.0) + v
+
+    def gauge_add(self, name: str, v: float, labels: tuple = ()) -> None:
+        with self._lock:
+            self.gauges[(name, labels)] = self.gauges.get((name, labels), 0.0) + v
+
+    def gauge_set(self, name: str, v: float, labels: tuple = ()) -> None:
+        with self._lock:
+            self.gauges[(name, labels)] = v
+
+REGISTRY = Registry()
+_local = threading.local()
+
+def _labels(kw: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in kw.items()))
+
+# --- kayıt API'si ---
+
+def observe(stage: str, seconds: float, **labels) -> None:
+    if not ENABLED:
+        return
+    cap = getattr(_local, "capture", None)
+    if cap is not None:
+        cap.append((stage, seconds, labels))
+    else:
+        REGISTRY.observe("stage_seconds", seconds, _labels({"stage": stage, **labels}))
+
+def inc(name: str, v: float = 1.0, **labels) -> None:
+    if ENABLED:
+        REGISTRY.inc(name, v, _labels(labels))
+
+def gauge_add(name: str, v: float, **labels) -> None:
+    if ENABLED:
+        REGISTRY.gauge_add(name, v, _labels(labels))
+
+def gauge_set(name: str, v: float, **labels) -> None:
+    if ENABLED:
+        REGISTRY.gauge_set(name, v, _labels(labels))
+
+class _Timer:
+    __slots__ = ("stage", "labels", "t0")
+
+    def __init__(self, stage: str, labels: dict):
+        self.stage, self.labels = stage, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.t0, **self.labels)
+        return False
+
+_NOOP = contextlib.nullcontext()
+
+def timer(stage: str, **labels):
+    """with metrics.timer("indicators"): ... — kapalıyken paylaşılan no-op bağlam."""
+    return _Timer(stage, labels) if ENABLED else _NOOP
+
+@contextlib.contextmanager
+def inflight(name: str, **labels):
+    """Süren iş sayısı göstergesi (gauge)."""
+    if not ENABLED:
+        yield
+        return
+    gauge_add(name, 1, **labels)
+    try:
+        yield
+    finally:
+        gauge_add(name, -1, **labels)
+
+@contextlib.contextmanager
+def capture():
+    """
+    Süreç havuzu işçilerinde: gözlemler yerel listeye toplanır, sonuçla birlikte ana
+    sürece döner ve merge() ile kaydedilir (işçinin kendi registry'si görünmez).
+    """
+    prev = getattr(_local, "capture", None)
+    items: list = []
+    _local.capture = items
+    try:
+        yield items
+    finally:
+        _local.capture = prev
+
+def merge(items) -> None:
+    for stage, seconds, labels in items or ():
+        observe(stage, seconds, **labels)
+
+def register_collector(name: str, fn: Callable[[], dict]) -> None:
+    """Okuma anında değer üreten kaynak (önbellek, sınırlayıcı, havuz istatistikleri)."""
+    REGISTRY.collectors[name] = fn
+
+# --- okuma ---
+
+def snapshot() -> dict:
+    r = REGISTRY
+    with r._lock:
+        hist = {(n, l): (h.count, h.sum, h.quantile(0.5), h.quantile(0.95), list(h.counts)) for (n, l), h in r.hist.items()}
+        counters, gauges = dict(r.counters), dict(r.gauges)
+    collected = {}
+    for name, fn in list(r.collectors.items()):
+        try:
+            collected[name] = fn()
+        except Exception as e:
+            collected[name] = {"error": str(e)}
+    return {"hist": hist, "counters": counters, "gauges": gauges, "collectors": collected}
+
+def _fmt_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = list(labels) + list(extra)
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+def _flatten(prefix: str, d: dict, out: list) -> None:
+    for k, v in d.items():
+        if isinstance(v, dict):
+            _flatten(f"{prefix}_{k}", v, out)
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out.append((f"{prefix}_{k}", v))
+
+def render_prometheus() -> str:
+    snap = snapshot()
+    lines = []
+    seen = set()
+    for (name, labels), (count, total, _, _, counts) in sorted(snap["hist"].items()):
+        full = f"{PREFIX}_{name}"
+        if full not in seen:
+            lines.append(f"# TYPE {full} histogram"); seen.add(full)
+        acc = 0
+        for le, c in zip([*map(str, BUCKETS), "+Inf"], counts):
+            acc += c
+            lines.append(f"{full}_bucket{_fmt_labels(labels, (('le', le),))} {acc}")
+        lines.append(f"{full}_sum{_fmt_labels(labels)} {total}")
+        lines.append(f"{full}_count{_fmt_labels(labels)} {count}")
+    for kind, data in (("counter", snap["counters"]), ("gauge", snap["gauges"])):
+        for (name, labels), v in sorted(data.items()):
+            full = f"{PREFIX}_{name}"
+            if full not in seen:
+                lines.append(f"# TYPE {full} {kind}"); seen.add(full)
+            lines.append(f"{full}{_fmt_labels(labels)} {v}")
+    for cname, d in sorted(snap["collectors"].items()):
+        flat: list = []
+        _flatten(f"{PREFIX}_{cname}", d, flat)
+        lines.extend(f"{k} {v}" for k, v in flat)
+    return "\n".join(lines) + "\n"
+
+def stats_text() -> str:
+    """/stats için düz metin özet."""
+    snap = snapshot()
+    lines = ["Aşama süreleri (adet | p50 | p95 | ort):"]
+    for (name, labels), (count, total, p50, p95, _) in sorted(snap["hist"].items()):
+        lab = ",".join(v for _, v in labels)
+        lines.append(f"  {lab:22s} {count:6d} | {p50*1e3:7.1f} | {p95*1e3:7.1f} | {total/count*1e3:7.1f} ms")
+    if snap["counters"]:
+        lines.append("Sayaçlar:")
+        for (name, labels), v in sorted(snap["counters"].items()):
+            lab = ",".join(f"{k}={v2}" for k, v2 in labels)
+            lines.append(f"  {name}{'{' + lab + '}' if lab else ''} = {v:g}")
+    if snap["gauges"]:
+        lines.append("Göstergeler:")
+        for (name, labels), v in sorted(snap["gauges"].items()):
+            lab = ",".join(f"{k}={v2}" for k, v2 in labels)
+            lines.append(f"  {name}{'{' + lab + '}' if lab else ''} = {v:g}")
+    for cname, d in sorted(snap["collectors"].items()):
+        lines.append(f"{cname}:")
+        for k, v in d.items():
+            if isinstance(v, dict):
+                v = " ".join(f"{k2}={v2:.2f}" if isinstance(v2, float) else f"{k2}={v2}" for k2, v2 in v.items())
+            lines.append(f"  {k}: {v}")
+    return "\n".join(lines)
+
+# --- Prometheus metin uç noktası (yerel) ---
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        req = await asyncio.wait_for(reader.readline(), 5)
+        while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+            pass
+        path = req.split()[1].decode() if len(req.split()) > 1 else "/"
+        if path.startswith("/metrics"):
+            body, status = render_prometheus().encode(), "200 OK"
+        else:
+            body, status = b"not found\n", "404 Not Found"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    except Exception:
+        pass
+    finally:
+        writer.close()
+
+async def start_http(port: int, host: str = "127.0.0.1") -> asyncio.AbstractServer:
+    server = await asyncio.start_server(_handle, host, port)
+    logger.info(f"Metrik uç noktası: http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,227 @@
+# priority.py
+"""
+İstek sınıfları ve yalıtım: etkileşimli tek sembol işleri (/analiz, /score) toplu
+taramaların önüne geçer. Sınıf bir contextvar'da taşınır; ortak kaynaklar (Yahoo hız
+sınırı, süreç havuzu) bekleyenleri önce sınıfa, sonra geliş sırasına göre uyandırır.
+JobBoard sohbet başına eşzamanlılık sınırını, aynı komutun yenisiyle eskisinin iptalini
+ve süre sınırını uygular.
+"""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import metrics
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, BULK = 0, 1
+CLASS_NAMES = ("interactive", "bulk")
+
+_CLASS: ContextVar[int] = ContextVar("priority_class", default=INTERACTIVE)
+_JOB: ContextVar["Job | None"] = ContextVar("job", default=None)
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    return int(raw) if raw.isdigit() else default
+
+def current() -> int:
+    return _CLASS.get()
+
+@contextlib.contextmanager
+def priority_class(cls: int):
+    """Bu bağlamda (ve buradan başlatılan görevlerde) açılan işler `cls` sınıfındadır."""
+    token = _CLASS.set(cls)
+    try:
+        yield
+    finally:
+        _CLASS.reset(token)
+
+def current_job() -> "Job | None":
+    return _JOB.get()
+
+class PriorityGate:
+    """
+    `slots` eşzamanlı yer; boş yer bekleyenlere (sınıf, geliş) sırasıyla verilir.
+    Yer devri doğrudan yapılır: bırakan, sıradakinin future'ını tamamlar.
+    """
+
+    def __init__(self, name: str, slots: int):
+        self.name = name
+        self.slots = slots
+        self.busy = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return sum(not f.done() for _, _, f in self._waiters)
+
+    async def acquire(self, cls: int | None = None) -> float:
+        """Dönüş: beklenen süre (sn)."""
+        cls = current() if cls is None else cls
+        if self.busy < self.slots and not len(self):
+            self.busy += 1
+            return 0.0
+        t0 = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (cls, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # yer devredilmişti ama alan vazgeçti → sıradakine geçir
+            raise
+        waited = time.monotonic() - t0
+        metrics.observe("gate_wait", waited, gate=self.name, cls=CLASS_NAMES[cls])
+        return waited
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)  # yer (busy) olduğu gibi devredilir
+                return
+        self.busy -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, cls: int | None = None):
+        await self.acquire(cls)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {"name": self.name, "slots": self.slots, "busy": self.busy, "queued": len(self)}
+
+# Engelleyen yardımcı işler (normalize, yeniden örnekleme, depo): etkileşimli sınıfın kendi
+# küçük thread havuzu var; toplu işler varsayılan havuzun kuyruğunu doldursa da araya girilir.
+_THREADS = {INTERACTIVE: ThreadPoolExecutor(_env_int("INTERACTIVE_THREADS", 2), thread_name_prefix="interactive")}
+
+async def to_thread(fn, *args):
+    """loop.run_in_executor(None, …) yerine: iş, o anki sınıfın thread havuzunda çalışır."""
+    return await asyncio.get_running_loop().run_in_executor(_THREADS.get(current()), fn, *args)
+
+# --- sohbet başına işler ---
+
+@dataclass
+class Job:
+    chat_id: int
+    command: str
+    cls: int
+    task: asyncio.Task | None = None
+    started: float = field(default_factory=time.monotonic)
+    reason: str | None = None     # iptal nedeni: "superseded" | "deadline" | "shutdown"
+
+    def cancel(self, reason: str) -> None:
+        if self.task is not None and not self.task.done():
+            self.reason = self.reason or reason
+            self.task.cancel()
+
+class JobBoard:
+    """
+    Komut işlerinin kaydı. Sohbet başına sınıf sınırı (CHAT_MAX_INTERACTIVE /
+    CHAT_MAX_BULK); aynı sohbette aynı komut yeniden gelirse eskisi "superseded"
+    nedeniyle iptal edilir; deadline dolunca "deadline" ile. İptal edilen işler
+    current_job().reason'a bakıp elindeki kısmi sonucu yazar.
+    """
+
+    def __init__(self):
+        self.caps = {INTERACTIVE: _env_int("CHAT_MAX_INTERACTIVE", 3), BULK: _env_int("CHAT_MAX_BULK", 1)}
+        self._jobs: dict[int, list[Job]] = {}
+        self.closed = False           # kapanışta (drain) yeni iş alınmaz
+
+    def active(self, chat_id: int | None = None) -> list[Job]:
+        chats = [chat_id] if chat_id is not None else list(self._jobs)
+        return [j for c in chats for j in self._jobs.get(c, []) if j.task is not None and not j.task.done()]
+
+    def start(self, chat_id: int, command: str, cls: int, coro_fn, deadline: float | None = None) -> Job | None:
+        """
+        coro_fn() işini ayrı görevde başlatır (toplu işler güncelleme işleyicisini bekletmez).
+        Sınır doluysa ya da kapanış sürüyorsa None döner.
+        """
+        if self.closed:
+            metrics.inc("jobs_rejected_total", cls=CLASS_NAMES[cls])
+            return None
+        for j in self.active(chat_id):
+            if j.command == command:
+                j.cancel("superseded")
+        running = [j for j in self.active(chat_id) if j.cls == cls and j.reason is None]
+        if len(running) >= self.caps[cls]:
+            metrics.inc("jobs_rejected_total", cls=CLASS_NAMES[cls])
+            return None
+
+        job = Job(chat_id, command, cls)
+        loop = asyncio.get_running_loop()
+
+        async def run():
+            _JOB.set(job)
+            timer = loop.call_later(deadline, job.cancel, "deadline") if deadline else None
+            try:
+                with priority_class(cls), metrics.inflight("jobs_inflight", cls=CLASS_NAMES[cls]):
+                    return await coro_fn()
+            except asyncio.CancelledError:
+                metrics.inc("jobs_cancelled_total", reason=job.reason or "other")
+                logger.info(f"İş iptal edildi ({command}, sohbet {chat_id}): {job.reason}")
+            except Exception as e:
+                # ayrı görev: hatayı burada kaydet, "never retrieved" uyarısına bırakma
+                logger.exception(f"İş hatası ({command}, sohbet {chat_id}): {e}")
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                jobs = self._jobs.get(chat_id, [])
+                if job in jobs:
+                    jobs.remove(job)
+                if not jobs:
+                    self._jobs.pop(chat_id, None)
+
+        self._jobs.setdefault(chat_id, []).append(job)
+        job.task = asyncio.create_task(run(), name=f"job:{command}:{chat_id}")
+        return job
+
+    async def run(self, chat_id: int, command: str, cls: int, coro_fn, deadline: float | None = None):
+        """start + bekle (etkileşimli işler). Sınır doluysa False."""
+        job = self.start(chat_id, command, cls, coro_fn, deadline)
+        if job is None:
+            return False
+        # işleyici iptal edilirse (kapanış) iş de iptal edilir
+        try:
+            await asyncio.shield(job.task)
+        except asyncio.CancelledError:
+            job.cancel("shutdown")
+            raise
+        return True
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Kapanış: yeni iş alınmaz, süren işlerin bitmesi en çok `timeout` sn beklenir;
+        kalanlar "shutdown" nedeniyle iptal edilir (kısmi sonuçlarını yazarlar).
+        Dönüş: iptal edilen iş sayısı.
+        """
+        self.closed = True
+        jobs = self.active()
+        if jobs and timeout > 0:
+            logger.info(f"Kapanış: {len(jobs)} iş bekleniyor (en çok {timeout:.0f} sn)")
+            await asyncio.wait([j.task for j in jobs], timeout=timeout)
+        left = self.active()
+        await self.cancel_all("shutdown")
+        return len(left)
+
+    async def cancel_all(self, reason: str = "shutdown") -> None:
+        jobs = self.active()
+        for j in jobs:
+            j.cancel(reason)
+        await asyncio.gather(*(j.task for j in jobs), return_exceptions=True)
+
+    def stats(self) -> dict:
+        act = self.active()
+        return {CLASS_NAMES[c]: sum(j.cls == c for j in act) for c in (INTERACTIVE, BULK)}
+
+JOBS = JobBoard()
+
+metrics.register_collector("jobs", lambda: JOBS.stats())
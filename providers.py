@@ -0,0 +1,72 @@
+# providers.py
+import pandas as pd
+
+class YahooProvider:
+    """yfinance üzerinden toplu indirme; sonucu sembol → ham DataFrame sözlüğüne böler."""
+    name = "yahoo"
+
+    def download(self, tickers: list[str], interval: str,
+                 period: str | None = None, start=None) -> dict[str, pd.DataFrame]:
+        import yfinance as yf
+        raw = yf.download(
+            tickers if len(tickers) > 1 else tickers[0],
+            interval=interval,
+            period=period if start is None else None,
+            start=start,
+            group_by="ticker",
+            progress=False,
+            auto_adjust=False,
+            threads=len(tickers) > 1,
+        )
+        return split_frames(raw, tickers)
+
+class FrameProvider:
+    """
+    Ağsız sağlayıcı: önceden verilmiş ham çerçeveleri döner (test/benchmark için).
+    frames: sembol → yfinance biçiminde DataFrame (Open/High/Low/Close/Adj Close/Volume).
+    """
+    name = "frames"
+
+    def __init__(self, frames: dict[str, pd.DataFrame]):
+        self.frames = frames
+        self.calls: list[tuple] = []
+
+    def download(self, tickers: list[str], interval: str,
+                 period: str | None = None, start=None) -> dict[str, pd.DataFrame]:
+        self.calls.append((tuple(tickers), interval, period, start))
+        out = {}
+        for t in tickers:
+            df = self.frames.get(t)
+            if df is None:
+                continue
+            if start is not None:
+                s = pd.Timestamp(start)
+                if df.index.tz is not None:
+                    s = s.tz_localize(df.index.tz) if s.tz is None else s.tz_convert(df.index.tz)
+                elif s.tz is not None:
+                    s = s.tz_localize(None)
+                df = df[df.index >= s]
+            out[t] = df
+        return out
+
+def split_frames(raw: pd.DataFrame | None, tickers: list[str]) -> dict[str, pd.DataFrame]:
+    """yf.download çıktısını (tekli ya da MultiIndex) sembol bazında böler."""
+    if raw is None or raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {tickers[0]: raw} if len(tickers) == 1 else {}
+
+    out = {}
+    lv0 = set(raw.columns.get_level_values(0))
+    lv1 = set(raw.columns.get_level_values(1))
+    for t in tickers:
+        if t in lv0:
+            df = raw[t]
+        elif t in lv1:
+            df = raw.xs(t, axis=1, level=1)
+        else:
+            continue
+        df = df.dropna(how="all")
+        if not df.empty:
+            out[t] = df
+    return out
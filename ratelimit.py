@@ -0,0 +1,217 @@
+# ratelimit.py
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+import metrics
+import priority
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    İstek hızı sınırı: saniyede `rate` jeton, en fazla `burst` birikir. Jeton yetmezse
+    bekleyenler (sınıf, geliş) sırasıyla tek bir dağıtıcı görevden jeton alır: sonradan
+    gelen etkileşimli istek, kuyruktaki toplu isteklerin önüne geçer.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._last = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump: asyncio.Task | None = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self, cls: int | None = None) -> float:
+        """Jeton alır; gerekirse bekler. Dönüş: beklenen süre (sn)."""
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        t0 = time.monotonic()
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        heapq.heappush(self._waiters, (priority.current() if cls is None else cls, next(self._seq), fut))
+        if self._pump is None or self._pump.done() or self._pump.get_loop() is not loop:
+            self._pump = loop.create_task(self._dispatch())
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.tokens += 1  # verilmiş jeton iade
+            raise
+        return time.monotonic() - t0
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            self._refill()
+            if self.tokens >= 1:
+                _, _, fut = heapq.heappop(self._waiters)
+                if not fut.done():
+                    self.tokens -= 1
+                    fut.set_result(None)
+                continue
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AimdLimiter:
+    """
+    Eşzamanlılık sınırı, AIMD ile: sağlıklı yanıtlarda sınır pencere başına ~1 artar,
+    hata/boş yanıtta `decrease` katıyla düşer (cooldown içinde bir kez).
+    Boşalan yer bekleyenlere (sınıf, geliş) sırasıyla devredilir.
+    """
+
+    def __init__(self, initial: float = 4, min_limit: float = 1, max_limit: float = 8,
+                 decrease: float = 0.5, cooldown: float = 2.0):
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.inflight = 0
+        self._last_cut = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(not f.done() for _, _, f in self._waiters)
+
+    async def acquire(self, cls: int | None = None) -> None:
+        if self.inflight < int(self.limit) and not self.queued:
+            self.inflight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority.current() if cls is None else cls, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.inflight -= 1  # devredilen yer geri
+                self._wake()
+            raise
+
+    def release(self, outcome: str) -> None:
+        """outcome: 'ok' | 'empty' | 'error' | 'cancelled' (sınır değişmez)"""
+        self.inflight -= 1
+        old = int(self.limit)
+        if outcome == "cancelled":
+            pass
+        elif outcome == "ok":
+            self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+        else:
+            now = time.monotonic()
+            if now - self._last_cut >= self.cooldown:
+                self._last_cut = now
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+        if int(self.limit) != old:
+            logger.info(f"YF eşzamanlılık sınırı {old} → {int(self.limit)} ({outcome})")
+        self._wake()
+
+    def _wake(self) -> None:
+        while self.inflight < int(self.limit) and self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                self.inflight += 1  # yer bekleyene devredilir
+                fut.set_result(None)
+
+class RateLimiter:
+    """
+    Tüm Yahoo istekleri için ortak kapı: jeton kovası (hız) + AIMD (eşzamanlılık) +
+    asenkron, jitter'lı üstel geri çekilmeli yeniden deneme. Engelleyen çağrı kendi
+    thread havuzunda (max_limit thread) çalışır: toplu indirmeler varsayılan havuzu
+    (türetme, yedek hesap) doldurmaz. Beklemeler event loop'u ve thread'leri meşgul etmez.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: float = 5.0, initial: float = 4, min_limit: float = 1,
+                 max_limit: float = 8, backoff: float = 0.6, backoff_cap: float = 10.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.aimd = AimdLimiter(initial, min_limit, max_limit)
+        self._executor = ThreadPoolExecutor(max(1, int(max_limit)), thread_name_prefix="yf")
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.requests = self.ok = self.empty = self.errors = self.retries = 0
+        self.wait_s = 0.0
+        self.busy_s = 0.0
+
+    def delay(self, attempt: int) -> float:
+        return min(self.backoff_cap, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def call(self, fn: Callable, *args, attempts: int = 3, is_empty: Callable[[Any], bool] = lambda r: not r,
+                   label: str = "", **kwargs):
+        """fn(*args, **kwargs)'ı sınırlar altında çalıştırır; son denemenin sonucunu döner (hata → None)."""
+        loop = asyncio.get_running_loop()
+        res = None
+        for attempt in range(attempts):
+            t0 = time.monotonic()
+            await self.bucket.acquire()
+            await self.aimd.acquire()
+            waited = time.monotonic() - t0
+            self.wait_s += waited
+            metrics.observe("fetch_wait", waited, cls=priority.CLASS_NAMES[priority.current()])
+            self.requests += 1
+            outcome = "error"
+            t0 = time.monotonic()
+            try:
+                res = await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+                outcome = "empty" if is_empty(res) else "ok"
+            except asyncio.CancelledError:
+                outcome = "cancelled"  # isteyen vazgeçti: Yahoo'nun sağlığı hakkında bilgi yok
+                raise
+            except Exception as e:
+                res = None
+                logger.warning(f"YF indirme hatası ({label}, deneme {attempt+1}/{attempts}): {e}")
+            finally:
+                busy = time.monotonic() - t0
+                self.busy_s += busy
+                metrics.observe("fetch", busy)
+                metrics.inc("fetch_requests_total", outcome=outcome)
+                self.aimd.release(outcome)
+            if outcome == "ok":
+                self.ok += 1
+                return res
+            if outcome == "empty":
+                self.empty += 1
+            else:
+                self.errors += 1
+            if attempt + 1 < attempts:
+                self.retries += 1
+                metrics.inc("retries_total")
+                d = self.delay(attempt)
+                logger.info(f"YF yeniden deneme ({label}) {d:.1f} sn sonra [{outcome}]")
+                await asyncio.sleep(d)
+        return res
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests, "ok": self.ok, "empty": self.empty, "errors": self.errors,
+            "retries": self.retries, "limit": int(self.aimd.limit), "inflight": self.aimd.inflight,
+            "queued": self.aimd.queued, "rate": self.bucket.rate, "wait_s": round(self.wait_s, 2),
+            "busy_s": round(self.busy_s, 2),
+        }
+
+def _env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+# YF_RATE: istek/sn, YF_BURST: ani istek payı, YF_CONC / YF_MIN_CONC / YF_MAX_CONC: eşzamanlılık
+LIMITER = RateLimiter(
+    rate=_env("YF_RATE", 2.0), burst=_env("YF_BURST", 5.0), initial=_env("YF_CONC", 4),
+    min_limit=_env("YF_MIN_CONC", 1), max_limit=_env("YF_MAX_CONC", 8),
+)
+
+metrics.register_collector("limiter", lambda: LIMITER.stats())
@@ -1,27 +1,254 @@
 # scanner.py
 import asyncio
-from typing import List, Tuple, Optional
-from data import fetch_ohlcv
-from analyzers.indicators import add_indicators
-from analyzers.patterns import detect_all_patterns
-from analyzers.scoring import build_signal_summary
+import heapq
+import logging
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Tuple, Optional
+import numpy as np
+import pandas as pd
+from data import fetch_ohlcv, fetch_frames
+from timeframes import MINUTES, plan_fetches
+from bist_calendar import is_open, last_bar_close
+from compute import LOW_MEMORY, run_analyze, run_analyze_frames
+from cache import SUMMARIES, ANALYSES, FETCHES, SCANS
+from shards import get_shards
+import metrics
+from analyzers.signal import Signal, empty_records, rank, stack
 
-_SEM = asyncio.Semaphore(5)
-_DELAY = 0.2
+logger = logging.getLogger(__name__)
 
-async def analyze_one(ticker: str, interval: str, period: str, loop) -> Optional[Tuple[str, dict]]:
+MAX_SCORE = 100.0
+# (interval, period) → sembol → (son taramadaki skor, hesaplandığı kapanmış bar);
+# erken durdurma üst sınırları için. Bar None ise skor canlı bara aittir (sınır olamaz).
+_LAST_SCORES: dict[tuple[str, str], dict[str, tuple[float, pd.Timestamp | None]]] = {}
+# düşük bellek modunda (compute.LOW_MEMORY) aynı anda indirilip analiz edilen sembol sayısı
+LOW_MEMORY_CHUNK = max(1, int(os.getenv("LOW_MEMORY_CHUNK", "100")))
+
+# /top10kisa|orta|uzun ön ayarları: ad → (başlık, [(interval, period), ...])
+PRESETS = {
+    "kisa": ("Kısa Vade", [("15m", "14d"), ("30m", "30d")]),
+    # 120m/90m Yahoo'da seansa hizalı yok → 30m tabandan yeniden örneklenir (timeframes)
+    "orta": ("Orta Vade", [("60m", "60d"), ("90m", "90d")]),
+    "uzun": ("Uzun Vade", [("1d", "180d"), ("1d", "365d")]),
+}
+
+async def analyze_df(ticker: str, df: pd.DataFrame | None, loop) -> Tuple[str, Optional[Signal]]:
     try:
-        async with _SEM:
-            await asyncio.sleep(_DELAY)
-            df = await loop.run_in_executor(None, fetch_ohlcv, ticker, interval, period)
         if df is None or df.empty:
-            return None
-        df = await loop.run_in_executor(None, add_indicators, df)
-        pats = await loop.run_in_executor(None, detect_all_patterns, df)
-        summary = await loop.run_in_executor(None, build_signal_summary, df, pats)
+            return ticker, None
+        summary, _ = await run_analyze(df)
         return ticker, summary
-    except Exception:
+    except Exception as e:
+        logger.warning(f"Analiz hatası ({ticker}): {e}")
+        metrics.inc("skipped_total", reason="error")
+        return ticker, None
+
+async def analyze_one(ticker: str, interval: str, period: str, loop) -> Optional[Tuple[str, Signal]]:
+    # hız/eşzamanlılık sınırı data katmanında (ratelimit.LIMITER)
+    try:
+        df = await fetch_one(ticker, interval, period)
+    except Exception as e:
+        logger.warning(f"İndirme hatası ({ticker} {interval}/{period}): {e}")
+        metrics.inc("skipped_total", reason="no_data")
+        return None
+    tic, summary = await analyze_df(ticker, df, loop)
+    return (tic, summary) if summary else None
+
+def _bar_key(df: pd.DataFrame) -> int:
+    # son kapanmış barın zaman damgası (ns) → yeni bar kapanınca anahtar değişir
+    return int(df.index[-1].value)
+
+async def fetch_one(ticker: str, interval: str, period: str) -> pd.DataFrame | None:
+    """Aynı (ticker, interval, period) için eşzamanlı indirmeleri tek isteğe indirir."""
+    return await FETCHES.get_or_compute((ticker, interval, period), lambda: fetch_ohlcv(ticker, interval, period))
+
+async def analysis_key(ticker: str, interval: str, period: str):
+    """İndirir; dönüş (df, (ticker, interval, period, son bar ts)). Veri yoksa (None, None)."""
+    df = await fetch_one(ticker, interval, period)
+    if df is None or df.empty:
+        return None, None
+    return df, (ticker, interval, period, _bar_key(df))
+
+async def analyze_ticker(ticker: str, interval: str, period: str, render: bool = False, df=None, key=None):
+    """
+    /analiz ve /score için: indir → (önbellekten ya da hesaplayarak) özet [+ grafik].
+    df/key: analysis_key ile önceden alındıysa yeniden indirilmez.
+    Dönüş: (df, Signal, img); veri yoksa (None, None, None).
+    """
+    if df is None or key is None:
+        df, key = await analysis_key(ticker, interval, period)
+    if df is None:
+        return None, None, None
+    if render:
+        sig, img = await ANALYSES.get_or_compute(key, lambda: run_analyze(df, interval, render=True))
+        SUMMARIES.put(key, sig.record(ticker))
+        return df, sig, img
+
+    async def compute():
+        return (await run_analyze(df))[0].record(ticker)
+    return df, Signal.from_record(await SUMMARIES.get_or_compute(key, compute)), None
+
+async def _summaries(frames: dict[str, pd.DataFrame], tickers: List[str], interval, period) -> np.ndarray:
+    if interval is None:
+        return await run_analyze_frames(frames, tickers)
+    keys = {t: (t, interval, period, _bar_key(frames[t])) for t in tickers if frames.get(t) is not None}
+    by_key = {k: t for t, k in keys.items()}
+
+    async def compute(missing):
+        # yalnızca önbellekte olmayan semboller panel olarak analiz edilir
+        res = await run_analyze_frames(frames, [by_key[k] for k in missing])
+        rows = dict(zip(res["ticker"].tolist(), res))
+        return {k: rows.get(by_key[k]) for k in missing}
+
+    # önbellek değerleri SIGNAL_DTYPE satırları (np.void) → tek diziye birleşir
+    got = await SUMMARIES.get_many(keys.values(), compute)
+    return stack(v for v in got.values() if v is not None)
+
+async def scan_frames(
+    frames: dict[str, pd.DataFrame],
+    tickers: List[str],
+    limit: int | None = None,
+    return_skipped: bool = False,
+    interval: str | None = None,
+    period: str | None = None,
+):
+    """
+    Hazır çerçeveler üzerinde analiz aşaması (indirme yapmaz). interval/period → özet önbelleği.
+    results: SIGNAL_DTYPE kayıt dizisi, skor ↓ / sembol ↓ sıralı.
+    """
+    failed = False
+    try:
+        recs = await _summaries(frames, list(tickers), interval, period)
+    except Exception as e:
+        logger.exception(f"Tarama analizi hatası ({interval}/{period}, {len(tickers)} sembol): {e}")
+        recs, failed = empty_records(), True
+    names = recs["ticker"].tolist()
+    if interval is not None:
+        _remember((interval, period), recs)
+    present = set(names)
+    skipped: List[str] = [t for t in tickers if t not in present]
+    if skipped:
+        # neden: veri gelmedi / analiz hatası / sonuç yok (ısınma için yetersiz bar vb.)
+        reasons: dict[str, int] = {}
+        for t in skipped:
+            r = "no_data" if frames.get(t) is None else ("error" if failed else "no_result")
+            reasons[r] = reasons.get(r, 0) + 1
+        for r, n in reasons.items():
+            metrics.inc("skipped_total", n, reason=r)
+
+    results = rank(recs)
+
+    if limit is not None:
+        results = results[:limit]
+
+    return (results, skipped) if return_skipped else results
+
+def _fetch_groups(specs: list[tuple[str, str]]) -> list[list[tuple[str, str]]]:
+    """Dilimleri ortak taban indirmesine göre gruplar (timeframes.plan_fetches)."""
+    try:
+        return [[(itv, want) for itv, _, want in plan.targets] for plan in plan_fetches(specs)]
+    except ValueError:
+        return [specs]  # tanımsız interval: data katmanı kendi eşlemesini yapar
+
+async def scan_local(tickers: List[str], specs: List[Tuple[str, str]]) -> dict:
+    """
+    Bu süreçte tarama: taban indirmeleri eşzamanlı yürür; her grubun dilimleri kendi
+    verisi gelir gelmez süreç havuzunda (ortak bütçe) analiz edilir → toplam süre ≈ en
+    yavaş tek dilim. Düşük bellek modunda evren LOW_MEMORY_CHUNK'lık parçalarla sırayla
+    taranır: bellekte aynı anda yalnızca bir parçanın çerçeveleri ve paneli bulunur.
+    Dönüş: (interval, period) → (results, skipped)
+    """
+    specs = list(dict.fromkeys(tuple(s) for s in specs))
+    if LOW_MEMORY and len(tickers) > LOW_MEMORY_CHUNK:
+        return _merge([await _scan_part(part, specs) for part in _chunks(tickers)], specs)
+    return await _scan_part(tickers, specs)
+
+def _chunks(tickers: List[str]) -> list[list[str]]:
+    return [list(tickers[i:i + LOW_MEMORY_CHUNK]) for i in range(0, len(tickers), LOW_MEMORY_CHUNK)]
+
+async def _scan_part(tickers: List[str], specs: List[Tuple[str, str]]) -> dict:
+
+    async def group(part):
+        try:
+            with metrics.timer("fetch_frames"):
+                by_spec = await fetch_frames(list(tickers), part)
+        except Exception as e:
+            logger.exception(f"Tarama indirme hatası ({part}): {e}")
+            by_spec = {}
+        res = await asyncio.gather(*(scan_frames(by_spec.get(s, {}), tickers, return_skipped=True,
+                                                 interval=s[0], period=s[1]) for s in part))
+        return dict(zip(part, res))
+
+    out = {}
+    for part in await asyncio.gather(*(group(g) for g in _fetch_groups(specs))):
+        out.update(part)
+    return {s: out[s] for s in specs}
+
+def _closed_bar(interval: str) -> pd.Timestamp | None:
+    """Skorun dayandığı son kapanmış bar; günlükte seans açıkken son bar canlıdır → None."""
+    if interval not in MINUTES or (interval == "1d" and is_open()):
         return None
+    return last_bar_close(interval)
+
+def _remember(spec, results: np.ndarray) -> None:
+    # parçalı taramada scan_frames işçide çalışır → erken durdurma sınırları burada da güncellenir
+    bar = _closed_bar(spec[0])
+    _LAST_SCORES.setdefault(tuple(spec), {}).update(
+        (t, (s, bar)) for t, s in zip(results["ticker"].tolist(), results["score"].tolist()))
+
+def _merge(parts: list[dict], specs) -> dict:
+    out = {}
+    for s in specs:
+        rows = [p[s][0] for p in parts]
+        out[s] = (rank(np.concatenate(rows)) if rows else empty_records(), [t for p in parts for t in p[s][1]])
+        _remember(s, out[s][0])
+    return out
+
+async def scan_sharded(shards, tickers: List[str], specs) -> dict:
+    """Evreni parçalara bölüp tarama işçilerine dağıtır, sonuçları birleştirir."""
+    specs = list(dict.fromkeys(tuple(s) for s in specs))
+    parts = await asyncio.gather(*(shards.run(part, specs) for part in shards.split(tickers)))
+    return _merge(list(parts), specs)
+
+async def scan_presets(tickers: List[str], specs: List[Tuple[str, str]]):
+    """
+    Birden çok (interval, period) için evreni tarar; veri bir kez çekilir (timeframes planı).
+    Tarama işçileri varsa (shards, SCAN_WORKERS) evren parçalanıp onlara dağıtılır.
+    Dönüş: (interval, period) → (results, skipped)
+    """
+    specs = list(dict.fromkeys(tuple(s) for s in specs))
+
+    async def run():
+        with metrics.timer("scan"), metrics.inflight("scans_inflight"):
+            shards = get_shards()
+            if shards is not None and len(tickers) > shards.size:
+                return await scan_sharded(shards, tickers, specs)
+            return await scan_local(tickers, specs)
+
+    # aynı evren + aynı dilimler için eşzamanlı taramalar tek taramayı bekler
+    return await SCANS.get_or_compute((tuple(tickers), tuple(specs)), run)
+
+async def scan_fused(tickers: List[str], specs: List[Tuple[str, str]], k: int = 10) -> np.ndarray:
+    """
+    Düşük bellek modunda /top10kisa|orta|uzun|mtf: evren parça parça taranır, her parça
+    kendi içinde birleştirilir (fusion.fuse sembol bazında çalışır, parçalar ayrık) ve
+    parçalar arasında yalnızca en iyi k birleşik satır yaşar. Dönüş: fuse ile aynı sıralı dizi.
+    """
+    from fusion import fuse
+    specs = list(dict.fromkeys(tuple(s) for s in specs))
+
+    async def run():
+        best = None
+        with metrics.timer("scan"), metrics.inflight("scans_inflight"):
+            for part in _chunks(tickers):
+                rows = fuse(await _scan_part(part, specs), specs)
+                if best is not None:
+                    rows = np.concatenate([best, rows])
+                best = rows[np.lexsort((rows["ticker"], rows["fused"]))[::-1][:k]]
+        return best if best is not None else fuse({s: (empty_records(), []) for s in specs}, specs)
+
+    return await SCANS.get_or_compute(("fused", tuple(tickers), tuple(specs), k), run)
 
 async def scan_many(
     tickers: List[str],
@@ -30,22 +257,147 @@ async def scan_many(
     limit: int | None = None,
     return_skipped: bool = False,
 ):
-    loop = asyncio.get_running_loop()
-    tasks = [analyze_one(t, interval, period, loop) for t in tickers]
-    results: List[Tuple[str, dict]] = []
-    skipped: List[str] = []
-
-    for t, coro in zip(tickers, asyncio.as_completed(tasks)):
-        res = await coro
-        if res:
-            results.append(res)
+    spec = (interval, period)
+    results, skipped = (await scan_presets(tickers, [spec]))[spec]
+    if limit is not None:
+        results = results[:limit]
+    return (results, skipped) if return_skipped else results
+
+class TopK:
+    """(skor, sembol) sırasına göre en iyi k sonucu tutan sabit boyutlu min-yığın."""
+
+    def __init__(self, k: int = 10):
+        self.k = k
+        self._heap: list[tuple[float, str]] = []
+        self._data: dict[str, np.void] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    def floor(self) -> tuple[float, str] | None:
+        """Listeye girmek için geçilmesi gereken (skor, sembol); liste dolu değilse None."""
+        return self._heap[0] if self.full else None
+
+    def can_enter(self, score: float, ticker: str) -> bool:
+        return not self.full or (score, ticker) > self._heap[0]
+
+    def push(self, row: np.void) -> bool:
+        """row: SIGNAL_DTYPE satırı."""
+        ticker = str(row["ticker"])
+        if ticker in self._data:
+            return False
+        key = (float(row["score"]), ticker)
+        if not self.full:
+            heapq.heappush(self._heap, key)
+        elif key > self._heap[0]:
+            _, out = heapq.heapreplace(self._heap, key)
+            del self._data[out]
         else:
-            skipped.append(t)
+            return False
+        self._data[ticker] = row
+        return True
 
-    # deterministik: skor ↓, eşitse sembol adı ↓
-    results.sort(key=lambda kv: (kv[1].get("score", 0), kv[0]), reverse=True)
+    def items(self) -> np.ndarray:
+        """scan_frames ile aynı sıra: skor ↓, eşitse sembol adı ↓."""
+        return stack(self._data[t] for _, t in sorted(self._heap, reverse=True))
 
-    if limit is not None:
-        results = results[:limit]
+async def scan_iter(tickers: List[str], interval: str, period: str,
+                    chunk: int = 25) -> AsyncIterator[tuple[list[str], list, list[str]]]:
+    """
+    Evreni parça parça tarar; her parça bitince (parça, sonuçlar, atlananlar) verir.
+    Bir sonraki parçanın indirmesi, mevcut parçanın analiziyle örtüşür.
+    """
+    spec = (interval, period)
+    parts = [list(tickers[i:i + chunk]) for i in range(0, len(tickers), chunk)]
+    shards = get_shards()
+    if shards is not None and len(tickers) > chunk:
+        async for item in _shard_iter(shards, parts, spec):
+            yield item
+        return
+    fetch = lambda part: asyncio.ensure_future(fetch_frames(part, [spec]))
+    nxt = fetch(parts[0]) if parts else None
+    try:
+        for i, part in enumerate(parts):
+            try:
+                with metrics.timer("fetch_frames"):
+                    by_spec = await nxt
+            except Exception as e:
+                logger.exception(f"Tarama indirme hatası ({spec}, {len(part)} sembol): {e}")
+                by_spec = {}
+            nxt = fetch(parts[i + 1]) if i + 1 < len(parts) else None
+            results, skipped = await scan_frames(by_spec.get(spec, {}), part, return_skipped=True,
+                                                 interval=interval, period=period)
+            yield part, results, skipped
+    finally:
+        # erken durdurmada önceden başlatılmış indirme iptal edilir
+        if nxt is not None and not nxt.done():
+            nxt.cancel()
 
-    return (results, skipped) if return_skipped else results
+async def _shard_iter(shards, parts: list[list[str]], spec):
+    # tüm parçalar işçilere hemen gider; sonuçlar sırayla verilir (erken durdurma sırayı varsayar)
+    futs = [asyncio.ensure_future(shards.run(p, [spec])) for p in parts]
+    try:
+        for part, fut in zip(parts, futs):
+            try:
+                res = (await fut)[spec]
+            except Exception as e:
+                logger.warning(f"Parça hatası ({spec}, {len(part)} sembol): {e}")
+                res = (empty_records(), list(part))
+            _remember(spec, res[0])
+            yield part, res[0], res[1]
+    finally:
+        for f in futs:
+            f.cancel()
+
+@dataclass
+class ScanProgress:
+    done: int
+    total: int
+    top: TopK
+    skipped: list[str]
+    stopped: bool = False     # kalan semboller top-k'yı değiştiremeyeceği için erken bitti
+
+def score_bounds(interval: str, period: str, slack: float) -> dict[str, float]:
+    """
+    Sembol başına skor üst sınırı. Yalnızca aynı kapanmış bar üzerinde hesaplanmış önceki
+    skorlar sınır olur (skor + slack; slack veri düzeltmelerine pay bırakır). Bar
+    değişmişse, canlı bara aitse ya da skor yoksa sembol listede yer almaz → MAX_SCORE.
+    """
+    bar = _closed_bar(interval)
+    if bar is None:
+        return {}
+    prev = _LAST_SCORES.get((interval, period), {})
+    return {t: min(MAX_SCORE, s + slack) for t, (s, b) in prev.items() if b == bar}
+
+async def scan_stream(tickers: List[str], interval: str, period: str, k: int = 10,
+                      chunk: int = 25, slack: float | None = None) -> AsyncIterator[ScanProgress]:
+    """
+    scan_iter + TopK: her parçadan sonra ilerlemeyi ve geçici top-k'yı verir.
+    slack verilirse semboller üst sınıra (score_bounds) göre azalan sırada taranır;
+    kalanların en iyisi bile top-k tabanını geçemiyorsa tarama erken biter. Sınırı
+    bilinmeyen semboller MAX_SCORE ile en başa dizilir, erken bitiş onlardan sonra olabilir.
+    """
+    bounds = score_bounds(interval, period, slack) if slack is not None else {}
+    bound = lambda t: bounds.get(t, MAX_SCORE)
+    tickers = list(tickers)
+    if bounds:
+        tickers.sort(key=lambda t: (bound(t), t), reverse=True)
+
+    top, skipped, done = TopK(k), [], 0
+    gen = scan_iter(tickers, interval, period, chunk)
+    try:
+        async for part, results, skip in gen:
+            done += len(part)
+            for row in results:
+                top.push(row)
+            skipped.extend(skip)
+            stop = bool(bounds) and done < len(tickers) and not top.can_enter(bound(tickers[done]), tickers[done])
+            yield ScanProgress(done, len(tickers), top, skipped, stopped=stop)
+            if stop:
+                break
+    finally:
+        await gen.aclose()
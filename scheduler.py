@@ -0,0 +1,249 @@
+# scheduler.py
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from bist_calendar import TZ, is_open, last_bar_close, next_bar_close
+from fusion import fuse
+from priority import BULK, priority_class
+from analyzers.scoring import summarize_last
+from analyzers.signal import empty_records, stack
+from data import fetch_frames
+from scanner import PRESETS, scan_presets
+
+logger = logging.getLogger(__name__)
+
+ALERT_PREFIX = "izle:"
+
+def spec_key(interval: str, period: str) -> str:
+    return f"{interval}/{period}"
+
+@dataclass
+class Snapshot:
+    key: str                  # "60m/60d" ya da ön ayar adı ("kisa" …)
+    rows: np.ndarray          # dilim: SIGNAL_DTYPE (scan_frames); ön ayar: fusion.fused_dtype (fuse)
+    skipped: list[str]
+    asof: pd.Timestamp        # işlenen son bar kapanışı
+    built_at: pd.Timestamp = field(default_factory=lambda: pd.Timestamp.now(tz=TZ))
+
+class SnapshotStore:
+    """Anahtar başına en yeni sıralı tarama sonucu (süreç içi)."""
+
+    def __init__(self):
+        self._snaps: dict[str, Snapshot] = {}
+
+    def get(self, key: str) -> Snapshot | None:
+        return self._snaps.get(key)
+
+    def put(self, snap: Snapshot) -> None:
+        cur = self._snaps.get(snap.key)
+        if cur is None or snap.asof >= cur.asof:
+            self._snaps[snap.key] = snap
+
+SNAPSHOTS = SnapshotStore()
+
+def parse_specs(raw: str) -> list[tuple[str, str]]:
+    """'60m:60d,1d:1y' → [('60m', '60d'), ('1d', '1y')]"""
+    out = []
+    for tok in raw.split(","):
+        itv, _, per = tok.strip().partition(":")
+        if itv and per:
+            out.append((itv, per))
+    return out
+
+class BarCloseScheduler:
+    """
+    Bar kapanışlarında (yalnızca BIST seans saatlerinde) evreni yeniden tarar ve
+    her dilim/ön ayar için sıralı anlık görüntüyü SnapshotStore'a yazar.
+    Aynı anda kapanan tüm grupların dilimleri tek scan_presets çağrısıyla (tek indirme planı) işlenir.
+    alerts verilirse (alerts.AlertBook) abone olunan interval'ler de "izle:<interval>" grubu
+    olarak kapanışta değerlendirilir; bildirimler notify(chat_id, html) ile gider.
+    states verilirse (analyzers.streaming.IndicatorStateStore) evren taramasında olmayan ve
+    yalnızca RSI kuralı olan semboller tam analiz yerine akışkan indikatör durumuyla
+    (bar başına O(1), canlı günlük barın düzeltmeleri dahil) değerlendirilir.
+    """
+
+    def __init__(self, universe: list[str], specs: list[tuple[str, str]], presets: dict,
+                 store: SnapshotStore = SNAPSHOTS, delay: float = 60.0, alerts=None, notify=None,
+                 states=None):
+        self.universe = list(universe)
+        self.store = store
+        self.delay = pd.Timedelta(seconds=delay)
+        self.groups: dict[str, list[tuple[str, str]]] = {spec_key(*s): [s] for s in specs}
+        self.groups.update({name: list(sp) for name, (_, sp) in presets.items()})
+        self.alerts = alerts
+        self.notify = notify
+        self.states = states
+        self._running = False
+        # tarama sürerken kapanan alarm interval'leri → en yeni kapanış; tarama bitince değerlendirilir
+        self._queued_alerts: dict[str, pd.Timestamp] = {}
+
+    def _all_groups(self) -> dict[str, list[tuple[str, str]]]:
+        # alarm grupları abonelikler değiştikçe değişir → her planlamada yeniden
+        groups = dict(self.groups)
+        if self.alerts is not None:
+            groups.update({ALERT_PREFIX + itv: [self.alerts.spec(itv)] for itv in self.alerts.intervals()})
+        return groups
+
+    def _next(self, now: pd.Timestamp) -> tuple[pd.Timestamp | None, list[str]]:
+        nexts = {}
+        for name, specs in self._all_groups().items():
+            ts = [t for t in (next_bar_close(itv, now) for itv, _ in specs) if t is not None]
+            if ts:
+                nexts[name] = min(ts)
+        if not nexts:
+            return None, []
+        when = min(nexts.values())
+        return when, [n for n, t in nexts.items() if t == when]
+
+    def start(self, job_queue) -> None:
+        if is_open():
+            # seans içinde açılış: beklemeden son kapanmış barla doldur
+            job_queue.run_once(self._initial, when=1, name="bar_close_initial")
+        self._schedule(job_queue)
+
+    def _schedule(self, job_queue) -> None:
+        # Yahoo barı kapanıştan kısa süre sonra yayınlar → `delay` kadar bekle
+        now = pd.Timestamp.now(tz=TZ) - self.delay
+        when, due = self._next(now)
+        if when is None:
+            job_queue.run_once(self._idle, when=86400, name="bar_close_idle")
+            return
+        job_queue.run_once(self._tick, when=(when + self.delay).to_pydatetime(),
+                           data=(when, due), name="bar_close")
+        logger.info(f"Sonraki tarama: {when:%Y-%m-%d %H:%M} → {', '.join(due)}")
+
+    async def _idle(self, context) -> None:
+        self._schedule(context.job_queue)
+
+    async def _initial(self, context) -> None:
+        now = pd.Timestamp.now(tz=TZ)
+        groups = self._all_groups()
+        closes = [t for t in (last_bar_close(s[0][0], now) for s in groups.values()) if t is not None]
+        if closes:
+            await self.refresh(list(groups), max(closes))
+
+    async def _tick(self, context) -> None:
+        when, due = context.job.data
+        try:
+            await self.refresh(due, when)
+        finally:
+            self._schedule(context.job_queue)
+
+    async def refresh(self, names: list[str], asof: pd.Timestamp) -> None:
+        if self._running:
+            # anlık görüntüler bir sonraki kapanışta tazelenir; alarmlar kaybolmasın → sıraya
+            queued = [n[len(ALERT_PREFIX):] for n in names if n.startswith(ALERT_PREFIX)]
+            for itv in queued:
+                self._queued_alerts[itv] = max(asof, self._queued_alerts.get(itv, asof))
+            logger.warning("Önceki tarama sürüyor, bu kapanışın anlık görüntüleri atlandı"
+                           + (f"; alarmlar sırada: {', '.join(queued)}" if queued else "."))
+            return
+        self._running = True
+        try:
+            snaps = [n for n in names if n in self.groups]
+            specs = list(dict.fromkeys(s for n in snaps for s in self.groups[n]))
+            with priority_class(BULK):
+                by_spec = await scan_presets(self.universe, specs) if specs else {}
+            for name in snaps:
+                specs = self.groups[name]
+                if name in PRESETS:
+                    rows = fuse(by_spec, specs)
+                    skipped = sorted(set().union(*(by_spec[s][1] for s in specs)))
+                else:
+                    rows, skipped = by_spec[specs[0]]
+                self.store.put(Snapshot(name, rows, skipped, asof))
+            if snaps:
+                logger.info(f"Anlık görüntüler güncellendi ({asof:%H:%M}): {', '.join(snaps)}")
+            alert_itvs = [n[len(ALERT_PREFIX):] for n in names if n.startswith(ALERT_PREFIX)]
+            if alert_itvs and self.alerts is not None:
+                await self._alerts(alert_itvs, by_spec, asof)
+        except Exception as e:
+            logger.exception(f"Zamanlanmış tarama hatası: {e}")
+        finally:
+            try:
+                await self._drain_alerts()
+            finally:
+                self._running = False
+
+    async def _drain_alerts(self) -> None:
+        # sıradaki alarmlar: yalnızca abone sembolleri taranır (evren taraması beklenmez)
+        while self._queued_alerts and self.alerts is not None:
+            queued, self._queued_alerts = self._queued_alerts, {}
+            by_asof: dict[pd.Timestamp, list[str]] = {}
+            for itv, ts in queued.items():
+                by_asof.setdefault(ts, []).append(itv)
+            for ts, itvs in sorted(by_asof.items()):
+                try:
+                    await self._alerts(itvs, {}, ts)
+                except Exception as e:
+                    logger.exception(f"Sıradaki alarm değerlendirme hatası ({', '.join(itvs)}): {e}")
+
+    async def _alerts(self, intervals: list[str], by_spec: dict, asof: pd.Timestamp) -> None:
+        for itv in intervals:
+            spec = self.alerts.spec(itv)
+            tickers = self.alerts.tickers(itv)
+            if not tickers:
+                continue
+            # evren taramasında zaten analiz edilen semboller yeniden analiz edilmez
+            rows = by_spec[spec][0] if spec in by_spec else empty_records()
+            have = set(rows["ticker"].tolist())
+            missing = [t for t in tickers if t not in have]
+            light = self.alerts.rsi_only(itv) if self.states is not None else set()
+            full = [t for t in missing if t not in light]
+            if full:
+                with priority_class(BULK):
+                    extra = (await scan_presets(full, [spec]))[spec][0]
+                rows = np.concatenate([rows, extra])
+            if len(full) < len(missing):
+                rows = np.concatenate([rows, await self._streamed([t for t in missing if t in light], spec)])
+            fired = self.alerts.evaluate(itv, rows, asof)
+            if fired:
+                logger.info(f"Alarmlar ({itv} {asof:%H:%M}): {sum(map(len, fired.values()))} bildirim")
+            for chat, texts in fired.items():
+                if self.notify is None:
+                    continue
+                try:
+                    await self.notify(chat, "\n\n".join(texts))
+                except Exception as e:
+                    logger.warning(f"Alarm bildirimi gönderilemedi (sohbet {chat}): {e}")
+
+    async def _streamed(self, tickers: list[str], spec: tuple[str, str]) -> np.ndarray:
+        # yalnızca indikatör gereken semboller: akışkan durum yeni (ve düzeltilmiş) barları işler
+        with priority_class(BULK):
+            frames = (await fetch_frames(tickers, [spec]))[spec]
+        recs = []
+        for t in tickers:
+            df = frames.get(t)
+            if df is None:
+                continue
+            snap = self.states.sync(t, spec[0], df)
+            if snap["valid"]:
+                recs.append(summarize_last(snap, []).record(t))
+        self.states.save()
+        return stack(recs)
+
+def build_scheduler(universe: list[str], notify=None) -> BarCloseScheduler | None:
+    """
+    SCHED env: "0"/"off" → kapalı (alarmlar da değerlendirilmez). SCHED_SPECS: /top10 için
+    ön hesaplanacak dilimler (varsayılan 60m:60d). SCHED_DELAY: bar kapanışından sonra
+    bekleme (sn, varsayılan 60). notify verilirse /izle alarmları da kapanışta değerlendirilir;
+    RSI alarmlarının akışkan indikatör durumları INDICATOR_STATE_PATH dosyasında saklanır.
+    """
+    if os.getenv("SCHED", "on").strip().lower() in ("0", "off", "false"):
+        return None
+    specs = parse_specs(os.getenv("SCHED_SPECS", "60m:60d"))
+    try:
+        delay = float(os.getenv("SCHED_DELAY", "60"))
+    except ValueError:
+        delay = 60.0
+    alerts = states = None
+    if notify is not None:
+        from alerts import ALERTS as alerts
+        from analyzers.streaming import IndicatorStateStore
+        states = IndicatorStateStore(os.getenv(
+            "INDICATOR_STATE_PATH", str(Path(__file__).with_name("cache") / "indicator_state.json")))
+    return BarCloseScheduler(universe, specs, PRESETS, delay=delay, alerts=alerts, notify=notify, states=states)
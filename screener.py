@@ -0,0 +1,198 @@
+# screener.py
+"""
+/tara sorgu dili: `rsi > 60 and 20 <= adx <= 60 and cmf > 0 and volume > 1.5*vol_ma20
+and pattern == "triangle"`. İfade bir kez ast ile ayrıştırılır (yalnızca izinli düğümler)
+ve sütun dizileri üzerinde çalışan kapanışlara derlenir; derlenmiş sorgular önbellekte.
+Veri: evrenin son bar anlık görüntüsü (SCREEN_DTYPE; panel yolunda tek geçiş) bar
+kapanışı başına bir kez hesaplanır → tarama birkaç NumPy maskesi, milisaniyeler.
+"""
+import ast
+import functools
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+import metrics
+from bist_calendar import last_bar_close
+from cache import SCREENS
+from compute import run_analyze_frames
+from data import fetch_frames
+from analyzers.scoring import SCREEN_DTYPE
+from analyzers.signal import BIAS_TEXT, PATTERN_NAMES
+
+# sorgu ve sıralamada kullanılabilen alanlar
+FIELDS = tuple(n for n in SCREEN_DTYPE.names if n != "ticker")
+ALIASES = {"skor": "score", "fiyat": "price", "hacim": "volume", "formasyon": "pattern", "oneri": "bias",
+           "öneri": "bias", "kapanis": "close", "kapanış": "close", "guven": "confidence", "güven": "confidence"}
+BIAS_CODES = {"al": 1, "long": 1, "notr": 0, "nötr": 0, "izle": 0, "sat": -1, "short": -1}
+_WORDS = {"ve": "and", "veya": "or", "degil": "not", "değil": "not"}
+
+QUERY_CACHE = int(os.getenv("SCREEN_QUERY_CACHE", "256"))
+MAX_QUERY = 400
+
+_CMP = {ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Lt: np.less, ast.LtE: np.less_equal,
+        ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_ARITH = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide}
+
+USAGE = ("Kullanım: /tara [evren] [interval period] ifade [sırala alan [artan]]\n"
+         "Örnek: /tara bist100 1d 180d rsi > 60 ve 20 <= adx <= 60 ve cmf > 0 "
+         "ve volume > 1.5*vol_ma20 ve pattern == triangle sırala adx\n"
+         f"Alanlar: {', '.join(FIELDS)}")
+
+def field_name(name: str) -> str:
+    key = ALIASES.get(name.lower(), name.lower())
+    if key not in FIELDS:
+        raise ValueError(f"Bilinmeyen alan: {name}")
+    return key
+
+def _codes(field: str, text: str) -> list[int]:
+    """Metin değerleri koda çevirir: pattern alt dizgeyle eşleşir ("triangle" → iki üçgen formasyonu)."""
+    t = text.strip().lower()
+    if field == "pattern":
+        codes = [-1] if t in ("", "yok", "none") else [i for i, n in enumerate(PATTERN_NAMES) if t in n.lower()]
+    elif field == "bias":
+        codes = [BIAS_CODES[t]] if t in BIAS_CODES else []
+    else:
+        raise ValueError(f"{field} metinle karşılaştırılamaz")
+    if not codes:
+        raise ValueError(f"Bilinmeyen {field} değeri: {text}")
+    return codes
+
+def _key(node) -> str | None:
+    return ALIASES.get(node.id.lower(), node.id.lower()) if isinstance(node, ast.Name) else None
+
+def _text_operand(node, other) -> str | None:
+    # pattern/bias karşısında tırnaksız da yazılabilir (pattern == triangle)
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if _key(other) in ("pattern", "bias") and isinstance(node, ast.Name) and _key(node) not in FIELDS:
+        return node.id
+    return None
+
+def _value(node, used: set) -> Callable:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        c = float(node.value)
+        return lambda a: c
+    if isinstance(node, ast.Name):
+        f = field_name(node.id)
+        used.add(f)
+        return lambda a: a[f]
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITH:
+        fn, l, r = _ARITH[type(node.op)], _value(node.left, used), _value(node.right, used)
+        return lambda a: fn(l(a), r(a))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        inner = _value(node.operand, used)
+        return lambda a: -inner(a)
+    raise ValueError(f"Desteklenmeyen ifade: {ast.unparse(node)}")
+
+def _compare(left, op, right, used: set) -> Callable:
+    lt, rt = _text_operand(left, right), _text_operand(right, left)
+    if lt is not None or rt is not None:
+        name, text = (right, lt) if lt is not None else (left, rt)
+        if not isinstance(name, ast.Name) or type(op) not in (ast.Eq, ast.NotEq):
+            raise ValueError("Metin yalnızca pattern/bias ile == ya da != karşılaştırılır")
+        f = field_name(name.id)
+        used.add(f)
+        codes = _codes(f, text)
+        neg = isinstance(op, ast.NotEq)
+        return lambda a: np.isin(a[f], codes) != neg
+    if type(op) not in _CMP:
+        raise ValueError(f"Desteklenmeyen karşılaştırma: {type(op).__name__}")
+    fn, l, r = _CMP[type(op)], _value(left, used), _value(right, used)
+    return lambda a: fn(l(a), r(a))
+
+def _mask(node, used: set) -> Callable:
+    if isinstance(node, ast.BoolOp):
+        parts = [_mask(v, used) for v in node.values]
+        op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return lambda a: functools.reduce(op, (p(a) for p in parts))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        inner = _mask(node.operand, used)
+        return lambda a: ~inner(a)
+    if isinstance(node, ast.Compare):
+        # zincir: 20 <= adx <= 60 → (20 <= adx) & (adx <= 60)
+        terms = [node.left, *node.comparators]
+        parts = [_compare(l, op, r, used) for l, op, r in zip(terms, node.ops, terms[1:])]
+        return lambda a: functools.reduce(np.logical_and, (p(a) for p in parts))
+    raise ValueError(f"Koşul bekleniyor: {ast.unparse(node)}")
+
+@dataclass(frozen=True)
+class Query:
+    text: str
+    fields: tuple[str, ...]          # ifadede geçen alanlar (gösterim için, geçiş sırasıyla)
+    fn: Callable
+
+    def mask(self, snap: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.broadcast_to(np.asarray(self.fn(snap), dtype=bool), len(snap))
+
+def _normalize(text: str) -> str:
+    text = text.translate(str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'", "≥": ">=", "≤": "<="}))
+    text = re.sub(r"\b(ve|veya|değil|degil)\b", lambda m: _WORDS[m.group(1).lower()], text, flags=re.IGNORECASE)
+    text = re.sub(r"(?<![<>=!])=(?!=)", "==", text)   # tek "=" → eşitlik
+    return " ".join(text.split())
+
+@functools.lru_cache(maxsize=QUERY_CACHE)
+def _compile(text: str) -> Query:
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Sözdizimi hatası: {e.msg}") from None
+    used: set = set()
+    fn = _mask(tree.body, used)
+    names = sorted((n for n in ast.walk(tree.body) if isinstance(n, ast.Name)), key=lambda n: n.col_offset)
+    keys = (_key(n) for n in names)
+    fields = tuple(dict.fromkeys(k for k in keys if k in used))
+    return Query(text, fields, fn)
+
+def compile_query(text: str) -> Query:
+    """İfade → Query (önbellekli: aynı metin yeniden ayrıştırılmaz). Geçersiz → ValueError."""
+    text = _normalize(text)
+    if not text:
+        raise ValueError("Boş ifade")
+    if len(text) > MAX_QUERY:
+        raise ValueError(f"İfade çok uzun (en fazla {MAX_QUERY} karakter)")
+    return _compile(text)
+
+def split_sort(text: str) -> tuple[str, str | None, bool]:
+    """'… sırala adx artan' → (ifade, "adx", azalan mı). Sıralama yoksa alan None."""
+    m = re.search(r"(?:^|\s)(?:sırala|sirala|sort)\s+(\S+)(?:\s+(\S+))?\s*$", text, flags=re.IGNORECASE)
+    if m is None:
+        return text.strip(), None, True
+    desc = (m.group(2) or "").lower() not in ("artan", "asc")
+    return text[:m.start()].strip(), field_name(m.group(1)), desc
+
+async def snapshot(tickers: list[str], interval: str, period: str) -> np.ndarray:
+    """
+    Evrenin son bar sütunları (SCREEN_DTYPE). Veri indirme katmanı ortak (FETCHES); hesap
+    panel yolunda tek geçiş. Bar kapanışı başına bir kez: anahtar son kapanışı içerir.
+    """
+    key = (tuple(tickers), interval, period, last_bar_close(interval))
+
+    async def build():
+        with metrics.timer("screen_snapshot"):
+            frames = (await fetch_frames(list(tickers), [(interval, period)]))[(interval, period)]
+            return await run_analyze_frames(frames, list(tickers), columns=True)
+    return await SCREENS.get_or_compute(key, build)
+
+def screen(snap: np.ndarray, query: Query, sort: str | None = None, desc: bool = True) -> np.ndarray:
+    """Eşleşen satırlar, `sort` alanına göre (NaN sonda; eşitlikte sembol adı) sıralı."""
+    t0 = time.perf_counter()
+    rows = snap[query.mask(snap)]
+    vals = rows[sort or "score"].astype("f8")
+    key = np.where(np.isnan(vals), np.inf, -vals if desc else vals)
+    out = rows[np.lexsort((rows["ticker"], key))]
+    metrics.observe("screen", time.perf_counter() - t0)
+    return out
+
+def fmt_value(field: str, v) -> str:
+    if field == "pattern":
+        return PATTERN_NAMES[int(v)].split()[0] if v >= 0 else "–"
+    if field == "bias":
+        return BIAS_TEXT[int(v)].split()[0]
+    v = float(v)
+    if np.isnan(v):
+        return "–"
+    return f"{v:,.0f}" if abs(v) >= 10000 else f"{v:.2f}" if abs(v) < 100 else f"{v:.1f}"
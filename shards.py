@@ -0,0 +1,287 @@
+# shards.py
+"""
+Parçalı tarama: evren parçalara bölünür, her parça (indir + analiz) bir tarama
+işçisinde çalışır; bot yalnızca sonuçları birleştirir. Bot ile işçiler bir aracı
+(broker) üzerinden yalnızca mesaj alışverişi yapar: görev = sembol listesi + dilimler,
+sonuç = dilim başına .npy baytları (SIGNAL_DTYPE) + atlananlar. Paylaşılan bellek ya da
+nesne yok; aracı ileride ağ üzerinden bir kuyrukla (Redis, AMQP …) değiştirilip işçiler
+başka makinelere taşınabilir. LocalBroker bu aracının yerel karşılığıdır.
+"""
+import asyncio
+import importlib
+import io
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import numpy as np
+import metrics
+
+logger = logging.getLogger(__name__)
+
+def pack(rows: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, rows, allow_pickle=False)
+    return buf.getvalue()
+
+def unpack(data: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+def spec_id(spec) -> str:
+    return f"{spec[0]}/{spec[1]}"
+
+# --- işçi tarafı ---
+
+async def _handle(msg: dict) -> dict:
+    from scanner import scan_local
+    t0 = time.perf_counter()
+    specs = [tuple(s) for s in msg["specs"]]
+    out = {"id": msg["id"], "worker": os.getpid(), "started": time.time()}
+    try:
+        res = await scan_local(msg["tickers"], specs)
+        out["parts"] = {spec_id(s): {"rows": pack(rows), "skipped": skipped} for s, (rows, skipped) in res.items()}
+    except Exception as e:
+        logger.exception(f"Parça hatası ({msg['id']}): {e}")
+        out["error"] = str(e)
+    out["seconds"] = time.perf_counter() - t0
+    return out
+
+async def _serve(tasks, results, concurrency: int) -> None:
+    # aynı anda `concurrency` parça: birinin indirmesi diğerinin analiziyle örtüşür
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    running: set[asyncio.Task] = set()
+
+    async def one(msg):
+        try:
+            results.put(await _handle(msg))
+        finally:
+            slots.release()
+
+    while True:
+        await slots.acquire()
+        msg = await loop.run_in_executor(None, tasks.get)
+        if msg is None:
+            break
+        # alındı bildirimi: bot, işçi ölürse hangi parçaların yarım kaldığını bilir
+        results.put({"id": msg["id"], "ack": os.getpid()})
+        t = asyncio.create_task(one(msg))
+        running.add(t)
+        t.add_done_callback(running.discard)
+    await asyncio.gather(*running)
+
+def worker_main(tasks, results, env: dict | None = None, setup: str | None = None) -> None:
+    """
+    Tarama işçisi giriş noktası (ayrı süreç ya da ayrı makine). env: ağır modüller
+    yüklenmeden önce uygulanır (ör. işçi başına hız sınırı). setup: "modül:fonksiyon",
+    işçi açılışında çağrılır (ör. benchmark'ta sahte sağlayıcı).
+    """
+    os.environ.update(env or {})
+    # işçi kendi içinde ikinci süreç havuzu ya da parçalama açmaz
+    os.environ["COMPUTE_WORKERS"] = "0"
+    os.environ["SCAN_WORKERS"] = "0"
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    if setup:
+        mod, _, fn = setup.partition(":")
+        getattr(importlib.import_module(mod), fn)()
+    asyncio.run(_serve(tasks, results, int(os.getenv("SHARD_CONCURRENCY", "2"))))
+
+# --- aracı ---
+
+class LocalBroker:
+    """Aracı yerine multiprocessing kuyrukları + bu makinede `workers` işçi süreci (spawn)."""
+
+    def __init__(self, workers: int, env: dict | None = None, setup: str | None = None):
+        # spawn: işçiler temiz yorumlayıcıyla açılır, env (hız sınırı vb.) import'tan önce uygulanır
+        self._ctx = mp.get_context("spawn")
+        self._env, self._setup = env, setup
+        self._closing = False
+        self.tasks = self._ctx.Queue()
+        self.results = self._ctx.Queue()
+        self.procs = [self._spawn(i) for i in range(workers)]
+
+    def _spawn(self, i: int):
+        p = self._ctx.Process(target=worker_main, args=(self.tasks, self.results, self._env, self._setup),
+                              name=f"scan-worker-{i}", daemon=True)
+        p.start()
+        return p
+
+    def reap(self) -> list[int]:
+        """Ölen işçilerin pid'leri (OOM, segfault …); yerlerine yenisi açılır."""
+        dead = []
+        for i, p in enumerate(self.procs):
+            if not self._closing and not p.is_alive():
+                logger.warning(f"Tarama işçisi öldü (pid {p.pid}, çıkış {p.exitcode}); yeniden açılıyor")
+                dead.append(p.pid)
+                self.procs[i] = self._spawn(i)
+        return dead
+
+    def publish(self, msg: dict) -> None:
+        self.tasks.put(msg)
+
+    def consume(self, timeout: float) -> dict | None:
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self._closing = True
+        for _ in self.procs:
+            self.tasks.put(None)
+        for p in self.procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+
+# --- bot tarafı ---
+
+class ShardPool:
+    """
+    Parçaları aracıya yayınlar, sonuçları bir okuyucu thread'de toplayıp bekleyen
+    future'lara dağıtır. Sonuç iptal edilmiş/bilinmeyen bir parçaya aitse atılır.
+    İşçi ölürse elindeki parçalar `retries` kez yeniden yayınlanır, sonra hata olur;
+    hiç sonuç gelmezse parça `timeout` sn sonra hata verir (tarama sonsuza dek asılı kalmaz).
+    """
+
+    def __init__(self, broker, workers: int, size: int, timeout: float = 300.0, retries: int = 1):
+        self.broker = broker
+        self.workers = workers
+        self.size = size
+        self.timeout = timeout
+        self.retries = retries
+        self._ids = itertools.count()
+        self._pending: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Future, float]] = {}
+        self._msgs: dict[str, dict] = {}      # yeniden yayın için görev mesajı
+        self._owner: dict[str, int] = {}      # parça → onu alan işçinin pid'i
+        self._tries: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.done = self.failed = self.dropped = self.requeued = self.timeouts = 0
+        self._reader = threading.Thread(target=self._read, name="shard-results", daemon=True)
+        self._reader.start()
+
+    def _read(self) -> None:
+        while not self._closed:
+            msg = self.broker.consume(timeout=0.5)
+            self._check_workers()
+            if msg is None:
+                continue
+            if "ack" in msg:
+                with self._lock:
+                    if msg["id"] in self._pending:
+                        self._owner[msg["id"]] = msg["ack"]
+                continue
+            with self._lock:
+                ent = self._pending.pop(msg["id"], None)
+            if ent is None:
+                self.dropped += 1
+                continue
+            loop, fut, sent = ent
+            metrics.observe("shard_queue", max(0.0, msg.get("started", sent) - sent))
+            metrics.observe("shard", msg.get("seconds", 0.0))
+            loop.call_soon_threadsafe(lambda f=fut, m=msg: f.done() or f.set_result(m))
+
+    def _check_workers(self) -> None:
+        reap = getattr(self.broker, "reap", None)
+        dead = set(reap()) if reap is not None else set()
+        if not dead:
+            return
+        with self._lock:
+            lost = [tid for tid, pid in self._owner.items() if pid in dead and tid in self._pending]
+            for tid in lost:
+                del self._owner[tid]
+                self._tries[tid] = self._tries.get(tid, 0) + 1
+                if self._tries[tid] <= self.retries:
+                    self.requeued += 1
+                    logger.warning(f"Parça {tid} ölen işçide kaldı, yeniden yayınlanıyor")
+                    self.broker.publish(self._msgs[tid])
+                else:
+                    loop, fut, _ = self._pending.pop(tid)
+                    err = RuntimeError(f"parça {tid}: işçi {self.retries + 1} kez öldü")
+                    loop.call_soon_threadsafe(lambda f=fut, e=err: f.done() or f.set_exception(e))
+
+    async def run(self, tickers: list[str], specs) -> dict:
+        """Tek parça. Dönüş: (interval, period) → (rows, skipped)."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        tid = f"{os.getpid()}-{next(self._ids)}"
+        msg = {"id": tid, "tickers": list(tickers), "specs": [list(s) for s in specs]}
+        with self._lock:
+            self._pending[tid] = (loop, fut, time.time())
+            self._msgs[tid] = msg
+        self.broker.publish(msg)
+        try:
+            msg = await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.failed += 1
+            raise RuntimeError(f"parça zaman aşımı ({self.timeout:g} sn, {len(tickers)} sembol)") from None
+        except RuntimeError:
+            self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                # iptal/zaman aşımında geç gelen sonuç atılır
+                self._pending.pop(tid, None)
+                for d in (self._msgs, self._owner, self._tries):
+                    d.pop(tid, None)
+        if "error" in msg:
+            self.failed += 1
+            raise RuntimeError(f"parça hatası: {msg['error']}")
+        self.done += 1
+        return {s: (unpack(msg["parts"][spec_id(s)]["rows"]), msg["parts"][spec_id(s)]["skipped"])
+                for s in specs}
+
+    def split(self, tickers: list[str], size: int | None = None) -> list[list[str]]:
+        size = size or self.size
+        return [list(tickers[i:i + size]) for i in range(0, len(tickers), size)]
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "shard_size": self.size, "pending": len(self._pending),
+                "done": self.done, "failed": self.failed, "dropped": self.dropped,
+                "requeued": self.requeued, "timeouts": self.timeouts}
+
+    def close(self) -> None:
+        self._closed = True
+        self.broker.close()
+        self._reader.join(timeout=2)
+
+_shards: ShardPool | None = None
+_shards_ready = False
+_shards_lock = threading.Lock()   # ısınma thread'i ile ilk tarama aynı anda açmasın
+
+def get_shards() -> ShardPool | None:
+    """
+    SCAN_WORKERS env: tarama işçisi sayısı (varsayılan 0 → tarama bot sürecinde).
+    SHARD_SIZE: parça başına sembol (varsayılan 50). SHARD_TIMEOUT: parça başına en uzun
+    bekleme (sn, varsayılan 300). İşçiler aynı makinede ve aynı IP'den çıktığı için Yahoo
+    hız sınırı (YF_RATE/YF_BURST) aralarında bölünür.
+    """
+    global _shards, _shards_ready
+    with _shards_lock:
+        if _shards_ready:
+            return _shards
+        _shards_ready = True
+        raw = os.getenv("SCAN_WORKERS", "").strip()
+        workers = int(raw) if raw.isdigit() else 0
+        if workers > 0:
+            env = {"YF_RATE": str(float(os.getenv("YF_RATE", 2.0)) / workers),
+                   "YF_BURST": str(max(1.0, float(os.getenv("YF_BURST", 5.0)) / workers))}
+            try:
+                _shards = ShardPool(LocalBroker(workers, env, os.getenv("SHARD_SETUP") or None), workers,
+                                    int(os.getenv("SHARD_SIZE", "50")), float(os.getenv("SHARD_TIMEOUT", "300")))
+            except Exception as e:
+                logger.warning(f"Tarama işçileri başlatılamadı, tarama bot sürecinde yapılacak: {e}")
+    return _shards
+
+def shutdown_shards() -> None:
+    global _shards, _shards_ready
+    if _shards is not None:
+        _shards.close()
+    _shards, _shards_ready = None, False
+
+metrics.register_collector("shards", lambda: _shards.stats() if _shards is not None else {})
@@ -0,0 +1,111 @@
+# store.py
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import pandas as pd
+
+_COLS = ("open", "high", "low", "close", "adj_close", "volume")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL, interval TEXT NOT NULL, ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL,
+    PRIMARY KEY (ticker, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    ticker TEXT NOT NULL, interval TEXT NOT NULL,
+    tz TEXT NOT NULL,            -- '' → tz-naive index
+    covered_from INTEGER,        -- bu zamandan itibaren tüm barlar indirildi (NULL → max)
+    updated_at REAL NOT NULL,    -- son başarılı ağ yenilemesi (epoch sn)
+    PRIMARY KEY (ticker, interval)
+);
+"""
+
+class OhlcvStore:
+    """
+    (ticker, interval) bazında kapanmış OHLCV barlarını SQLite'ta tutar.
+    Zaman damgaları UTC epoch-ns olarak saklanır; orijinal tz meta'da durur.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.execute("PRAGMA synchronous=NORMAL")
+            self._con.executescript(_SCHEMA)
+
+    def meta(self, ticker: str, interval: str) -> dict | None:
+        with self._lock:
+            row = self._con.execute(
+                "SELECT tz, covered_from, updated_at FROM meta WHERE ticker=? AND interval=?",
+                (ticker, interval),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"tz": row[0], "covered_from": row[1], "updated_at": row[2]}
+
+    def last_ts(self, ticker: str, interval: str) -> int | None:
+        with self._lock:
+            row = self._con.execute(
+                "SELECT MAX(ts) FROM bars WHERE ticker=? AND interval=?", (ticker, interval)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(self, ticker: str, interval: str, start_ns: int | None = None) -> pd.DataFrame | None:
+        m = self.meta(ticker, interval)
+        if m is None:
+            return None
+        q = f"SELECT ts, {', '.join(_COLS)} FROM bars WHERE ticker=? AND interval=?"
+        args: tuple = (ticker, interval)
+        if start_ns is not None:
+            q += " AND ts >= ?"; args += (int(start_ns),)
+        with self._lock:
+            rows = self._con.execute(q + " ORDER BY ts", args).fetchall()
+        if not rows:
+            return None
+
+        df = pd.DataFrame.from_records(rows, columns=("ts",) + _COLS)
+        idx = pd.to_datetime(df.pop("ts"), unit="ns", utc=bool(m["tz"]))
+        if m["tz"]:
+            idx = idx.dt.tz_convert(m["tz"])
+        df.index = pd.DatetimeIndex(idx, name="Datetime" if m["tz"] else "Date")
+        if df["adj_close"].isna().all():
+            df = df.drop(columns="adj_close")
+        return df.astype("float64")
+
+    def save(self, ticker: str, interval: str, df: pd.DataFrame,
+             covered_from: int | None, keep_coverage: bool = False) -> None:
+        """Barları upsert eder (aynı ts'li bar güncellenir) ve meta'yı yazar."""
+        idx = df.index
+        tz = "" if idx.tz is None else str(idx.tz)
+        ts = (idx.tz_convert("UTC") if idx.tz is not None else idx).as_unit("ns").asi8
+        cols = [df[c].to_numpy(dtype="float64") if c in df.columns else [None] * len(df) for c in _COLS]
+        rows = [(ticker, interval, int(t), *(None if v is None or v != v else float(v) for v in vals))
+                for t, *vals in zip(ts, *cols)]
+
+        with self._lock, self._con:
+            self._con.executemany(
+                "INSERT OR REPLACE INTO bars VALUES (?,?,?,?,?,?,?,?,?)", rows
+            )
+            if keep_coverage:
+                self._con.execute(
+                    "UPDATE meta SET updated_at=?, tz=? WHERE ticker=? AND interval=?",
+                    (time.time(), tz, ticker, interval),
+                )
+            else:
+                self._con.execute(
+                    "INSERT OR REPLACE INTO meta VALUES (?,?,?,?,?)",
+                    (ticker, interval, tz, covered_from, time.time()),
+                )
+
+    def touch(self, ticker: str, interval: str) -> None:
+        """Yeni bar gelmese de 'son kontrol' zamanını günceller."""
+        with self._lock, self._con:
+            self._con.execute(
+                "UPDATE meta SET updated_at=? WHERE ticker=? AND interval=?",
+                (time.time(), ticker, interval),
+            )
@@ -1,4 +1,5 @@
 # symbols.py
+import os
 from pathlib import Path
 
 # İstersen bu dosyanın yanına "symbols_bist250.txt" koy (her satır bir sembol, .IS ile)
@@ -10,12 +11,47 @@ DEFAULT_BIST250 = [
     # ... burayı kendi BIST-250 listenle genişletebilirsin
 ]
 
+def _read(name: str) -> list[str] | None:
+    p = Path(os.getenv("UNIVERSE_DIR", Path(__file__).parent)) / f"symbols_{name}.txt"
+    if not p.exists():
+        return None
+    syms = [ln.strip().upper() for ln in p.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    return list(dict.fromkeys(s if s.endswith(".IS") else s + ".IS" for s in syms if not s.startswith("#")))
+
 def load_bist_list() -> list[str]:
-    p = Path(__file__).with_name("symbols_bist250.txt")
-    if p.exists():
-        syms = [ln.strip() for ln in p.read_text(encoding="utf-8").splitlines() if ln.strip()]
-        return [s if s.endswith(".IS") else s + ".IS" for s in syms]
-    return DEFAULT_BIST250
+    return _read("bist250") or DEFAULT_BIST250
 
 # 🔑 önemli: bu satır mutlaka olmalı
 BIST_LIST = load_bist_list()
+
+# Evrenler: ad → symbols_<ad>.txt (UNIVERSE_DIR, varsayılan bu klasör). Endeks bileşimleri
+# dönemsel değişir; dosyayı güncellemek yeter. "birlesik": bilinen listelerin birleşimi
+# (~250 sembol). "tum": yalnızca symbols_tum.txt (tüm pay piyasası) ile; dosya yoksa
+# birleşime sessizce düşmez, hata verir (tam piyasa taraması sanılmasın).
+UNIVERSES = ("bist30", "bist100", "bist250", "birlesik", "tum")
+_UNION = ("bist30", "bist100", "bist250")
+DEFAULT_UNIVERSE = os.getenv("UNIVERSE", "bist250")
+_ALIASES = {"xu030": "bist30", "xu100": "bist100", "all": "tum", "hepsi": "tum"}
+_cache: dict[str, list[str]] = {"bist250": BIST_LIST}
+
+def universe_name(name: str | None = None) -> str | None:
+    """Takma adları çözer (xu100 → bist100); bilinmeyen ad → None."""
+    name = (name or DEFAULT_UNIVERSE).strip().lower()
+    name = _ALIASES.get(name, name)
+    return name if name in UNIVERSES else None
+
+def universe(name: str | None = None) -> list[str]:
+    """Evren adı → sembol listesi (.IS ekli). Bilinmeyen ad → KeyError; listesi olmayan tum → ValueError."""
+    key = universe_name(name)
+    if key is None:
+        raise KeyError(name)
+    if key not in _cache:
+        if key == "birlesik":
+            syms = list(dict.fromkeys(s for n in _UNION for s in universe(n)))
+        else:
+            syms = _read(key)
+        if syms is None and key == "tum":
+            raise ValueError("tum evreni için symbols_tum.txt gerekli (tüm pay piyasası listesi); "
+                             "bilinen listelerin birleşimi için: birlesik")
+        _cache[key] = syms or []
+    return _cache[key]
@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+
+# ağsız, tek süreç: modüller env'i import anında okur → testlerden önce
+os.environ.update({"OHLCV_STORE": "off", "COMPUTE_WORKERS": "0", "SCAN_WORKERS": "0", "SCHED": "off",
+                   "WARMUP": "off", "METRICS_PORT": "", "TELEGRAM_BOT_TOKEN": "1:test",
+                   "YF_RATE": "1000", "YF_BURST": "1000"})
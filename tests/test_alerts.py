@@ -0,0 +1,76 @@
+# tests/test_alerts.py
+import pandas as pd
+import pytest
+from alerts import RSI, SCORE, TARGET, AlertBook
+from analyzers.signal import empty_records
+
+T0 = pd.Timestamp("2025-06-02 10:00", tz="Europe/Istanbul")
+
+def bar(k: int) -> pd.Timestamp:
+    return T0 + pd.Timedelta(hours=k)
+
+def rec(ticker: str = "AAA.IS", price: float = 100.0, **kw):
+    """Tek sembollük SIGNAL_DTYPE kaydı; varsayılan: long, ATR 2, H1 103 / H2 106 / stop 97."""
+    a = empty_records(1)
+    vals = {"ticker": ticker, "price": price, "atr": 2.0, "score": 50.0, "bias": 1,
+            "t1": 103.0, "t2": 106.0, "stop": 97.0, **kw}
+    for k, v in vals.items():
+        a[k] = v
+    return a
+
+@pytest.fixture
+def book(tmp_path):
+    return AlertBook(tmp_path / "alerts.json")
+
+def fired(book, k: int, **kw) -> list[str]:
+    return book.evaluate("60m", rec(**kw), bar(k)).get(7, [])
+
+def test_score_fires_once_and_rearms_past_band(book):
+    book.add(7, "AAA.IS", SCORE, 1, 75.0, "60m")
+    assert len(fired(book, 0, score=80.0)) == 1
+    assert fired(book, 0, score=80.0) == []       # aynı kapanış ikinci kez işlenirse bildirim yok
+    assert fired(book, 1, score=78.0) == []       # eşiğin üstünde kaldı: kurulu değil
+    assert fired(book, 2, score=72.0) == []       # 75 - 5 bandının içinde: hâlâ kurulmadı
+    assert fired(book, 3, score=69.0) == []       # bandın dışına çıktı → yeniden kuruldu
+    assert len(fired(book, 4, score=76.0)) == 1
+    assert fired(book, 4, score=76.0) == []
+
+def test_state_survives_reload(book):
+    book.add(7, "AAA.IS", SCORE, 1, 75.0, "60m")
+    assert len(fired(book, 0, score=80.0)) == 1
+    again = AlertBook(book.path)
+    assert again.evaluate("60m", rec(score=80.0), bar(0)) == {}
+    assert again.evaluate("60m", rec(score=60.0), bar(1)) == {}
+    assert len(again.evaluate("60m", rec(score=80.0), bar(2))[7]) == 1
+
+def test_rsi_cross_arms_on_first_observation(book):
+    book.add(7, "AAA.IS", RSI, 1, 50.0, "60m")
+    book.add(7, "BBB.IS", RSI, 1, 50.0, "60m")
+    assert book.rsi_only("60m") == {"AAA.IS", "BBB.IS"}
+    # AAA ilk gözlemde zaten üstte: o anki durum bildirilmez, kesişim beklenir
+    assert fired(book, 0, rsi=60.0) == []
+    assert fired(book, 1, rsi=49.0) == []         # 50 - 2 bandının içinde
+    assert fired(book, 2, rsi=47.0) == []         # bandın altı → kuruldu
+    assert len(fired(book, 3, rsi=52.0)) == 1
+    # BBB altta başlar: ilk yukarı kesişimde tetiklenir
+    assert fired(book, 0, ticker="BBB.IS", rsi=40.0) == []
+    assert len(fired(book, 1, ticker="BBB.IS", rsi=51.0)) == 1
+
+@pytest.mark.parametrize("high, low, what", [(103.5, 100.0, "H1 103.00 ulaşıldı"),
+                                             (102.0, 96.5, "stop 97.00 görüldü"),
+                                             (104.0, 96.0, "stop 97.00 görüldü")])   # ikisi birden: stop
+def test_target_hit_intrabar_and_one_shot(book, high, low, what):
+    book.add(7, "AAA.IS", TARGET, 1, 0.0, "60m")
+    assert fired(book, 0, high=104.0, low=96.0) == []   # ilk gözlem H1/stop'u sabitler, bildirmez
+    assert fired(book, 1, price=101.0, high=102.0, low=99.0) == []
+    # kapanış H1 ile stop arasında; hedef/stop bar içi yüksek/düşükte görülür
+    (msg,) = fired(book, 2, price=101.0, high=high, low=low)
+    assert what in msg and "giriş 100.00" in msg
+    assert len(book) == 0                                # hedef kuralı tek seferlik
+
+def test_short_target_uses_low_for_t1(book):
+    book.add(7, "AAA.IS", TARGET, 1, 0.0, "60m")
+    fired(book, 0, bias=-1, t1=97.0, t2=94.0, stop=103.0)
+    assert fired(book, 1, bias=-1, price=99.0, high=100.0, low=97.5) == []
+    (msg,) = fired(book, 2, bias=-1, price=98.0, high=99.0, low=96.9)
+    assert "H1 97.00 ulaşıldı" in msg
@@ -0,0 +1,79 @@
+# tests/test_analiz_photos.py
+import asyncio
+from types import SimpleNamespace as NS
+import pytest
+from telegram.error import BadRequest
+import main
+import scanner
+from bench.synthetic import make_ohlcv, normalized
+from cache import ANALYSES, FETCHES, PHOTOS
+
+class Note:
+    async def delete(self):
+        pass
+
+    async def edit_text(self, text, **kw):
+        raise AssertionError(f"beklenmeyen hata mesajı: {text}")
+
+class Message:
+    """reply_photo taklidi: gönderilenleri kaydeder; bad_file_id → file_id reddedilir."""
+
+    def __init__(self):
+        self.sent: list = []
+        self.bad_file_id = False
+
+    async def reply_text(self, text, **kw):
+        return Note()
+
+    async def reply_photo(self, photo, caption, **kw):
+        if isinstance(photo, str) and self.bad_file_id:
+            raise BadRequest("Wrong file identifier/http url specified")
+        self.sent.append(photo)
+        n = len(self.sent)
+        return NS(photo=[NS(file_id=f"small-{n}"), NS(file_id=f"photo-{n}")])
+
+@pytest.fixture
+def bars(monkeypatch):
+    """İndirme yerine sabit çerçeve; bars["df"] değiştirilerek yeni bar kapanışı taklit edilir."""
+    df = normalized(make_ohlcv(400, "60m", 11, "pennant"))
+    state = {"df": df.iloc[:-1]}
+
+    async def fetch_one(ticker, interval, period):
+        return state["df"]
+
+    monkeypatch.setattr(scanner, "fetch_one", fetch_one)
+    for c in (PHOTOS, ANALYSES, FETCHES):
+        c.invalidate(lambda k: True)
+    state["next"] = df
+    return state
+
+def _analiz(msg: Message):
+    asyncio.run(main.analiz(NS(message=msg), NS(args=["THYAO", "60m", "60d"])))
+
+def test_second_request_sends_file_id(bars):
+    msg = Message()
+    _analiz(msg)
+    assert isinstance(msg.sent[0], bytes)
+    assert len(ANALYSES) == 0   # yüklendikten sonra PNG tutulmaz
+    _analiz(msg)
+    assert msg.sent[1] == "photo-1"
+
+def test_bad_file_id_renders_again(bars):
+    msg = Message()
+    _analiz(msg)
+    msg.bad_file_id = True
+    _analiz(msg)
+    assert len(msg.sent) == 2 and isinstance(msg.sent[1], bytes)
+    msg.bad_file_id = False
+    _analiz(msg)
+    assert msg.sent[2] == "photo-2"
+
+def test_bar_rollover_evicts_old_key(bars):
+    msg = Message()
+    _analiz(msg)
+    (old,) = list(PHOTOS._data)
+    bars["df"] = bars["next"]
+    _analiz(msg)
+    assert isinstance(msg.sent[1], bytes)
+    (new,) = list(PHOTOS._data)
+    assert new[:3] == old[:3] and new[3] > old[3]
@@ -0,0 +1,34 @@
+# tests/test_backtest.py
+import numpy as np
+import pytest
+import backtest
+from analyzers.indicators import add_indicators
+from analyzers.patterns import detect_all_patterns
+from analyzers.scoring import build_signal_summary
+from analyzers.targets import normalize_targets
+from bench.synthetic import SHAPES, make_ohlcv, normalized, stable_seed
+
+def _reference(ind, t: int):
+    """Canlı zincir: t barında biten geçmişle build_signal_summary + normalize_targets."""
+    upto = ind.iloc[:t + 1]
+    return normalize_targets(build_signal_summary(upto, detect_all_patterns(upto)))
+
+@pytest.mark.parametrize("shape", [*SHAPES, None])
+def test_signals_match_build_signal_summary(shape):
+    df = normalized(make_ohlcv(320, "1d", stable_seed(16, shape), shape))
+    ind = add_indicators(df)
+    # son 60 bar: formasyon oluşurken/kırılırken; ilk değerlendirilebilir bar da dahil
+    t = np.r_[backtest.WARMUP - 1, np.arange(len(ind) - 60, len(ind))]
+    sig = backtest.signals(backtest.columns(ind), t)
+    patterned = 0
+    for j, tj in enumerate(t):
+        want = _reference(ind, int(tj))
+        assert sig["price"][j] == want.price
+        assert (sig["bias"][j], sig["pattern"][j]) == (want.bias, want.pattern), tj
+        assert sig["score"][j] == pytest.approx(want.score, rel=1e-12), tj
+        # hedefler kuruşa yuvarlı: iki yol aynı değeri üretmeli
+        assert [sig["t1"][j], sig["t2"][j], sig["stop"][j]] == pytest.approx(
+            [want.t1, want.t2, want.stop], abs=1e-9), tj
+        patterned += want.pattern >= 0
+    if shape is not None:
+        assert patterned   # sentetik formasyon en az bir barda özete giriyor
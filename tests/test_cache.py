@@ -0,0 +1,138 @@
+# tests/test_cache.py
+import asyncio
+import pytest
+from cache import AsyncCache
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_concurrent_requests_share_one_computation():
+    c, calls = AsyncCache("t", ttl=60), []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "v"
+
+    async def go():
+        got = await asyncio.gather(*(c.get_or_compute("k", factory) for _ in range(5)))
+        return got, await c.get_or_compute("k", factory)
+
+    got, again = run(go())
+    assert got == ["v"] * 5 and again == "v" and len(calls) == 1
+    assert (c.misses, c.joins, c.hits) == (1, 4, 1)
+
+def test_ttl_zero_only_coalesces_and_errors_reach_all_waiters():
+    c, calls = AsyncCache("t", ttl=0), []
+
+    async def boom():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("x")
+
+    async def go():
+        res = await asyncio.gather(*(c.get_or_compute("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in res) and len(calls) == 1
+        await c.get_or_compute("n", lambda: asyncio.sleep(0, "v"))
+        assert len(c) == 0 and not c._inflight   # ttl 0 → saklanmaz
+
+    run(go())
+
+def test_first_caller_cancel_does_not_cancel_others():
+    c = AsyncCache("t", ttl=60)
+
+    async def go():
+        first = asyncio.ensure_future(c.get_or_compute("k", lambda: asyncio.sleep(0.02, "v")))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(c.get_or_compute("k", lambda: asyncio.sleep(0, "other")))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "v"
+        assert first.cancelled()
+
+    run(go())
+
+def test_lru_eviction_and_none():
+    c = AsyncCache("t", maxsize=2, ttl=60)
+    c.put("a", 1); c.put("b", 2)
+    assert c.get("a") == 1   # a en yeni
+    c.put("c", 3)
+    assert c.get("b") is None and c.get("a") == 1 and c.evictions == 1
+    c.put("n", None)
+    assert "n" not in c._data
+    assert c.invalidate(lambda k: k == "a") == 1 and len(c) == 1
+
+def test_get_many_computes_only_missing_and_joins_inflight():
+    c, batches = AsyncCache("t", ttl=60), []
+    c.put("a", "A")
+
+    async def compute(keys):
+        batches.append(list(keys))
+        await asyncio.sleep(0.01)
+        return {k: k.upper() for k in keys if k != "z"}
+
+    async def go():
+        single = asyncio.ensure_future(c.get_or_compute("b", lambda: asyncio.sleep(0.005, "B")))
+        await asyncio.sleep(0)
+        many = await c.get_many(["a", "b", "c", "d", "c", "z"], compute)
+        return many, await single
+
+    many, single = run(go())
+    assert many == {"a": "A", "b": "B", "c": "C", "d": "D", "z": None}
+    assert single == "B" and batches == [["c", "d", "z"]]
+    assert c.get("z") is None and c.get("c") == "C"
+
+def test_get_many_failure_only_misses_for_waiters():
+    c = AsyncCache("t", ttl=60)
+
+    async def slow_fail(keys):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("down")
+
+    async def go():
+        owner = asyncio.ensure_future(c.get_many(["x"], slow_fail))
+        await asyncio.sleep(0)
+        joined = await c.get_many(["x"], slow_fail)
+        with pytest.raises(RuntimeError):
+            await owner
+        return joined
+
+    assert run(go()) == {"x": None}
+
+def test_orphaned_computation_is_cancelled_after_grace():
+    c = AsyncCache("t", ttl=0, orphan_grace=0.02)
+    state = {}
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def go():
+        t = asyncio.ensure_future(c.get_or_compute("k", work))
+        await asyncio.sleep(0)
+        t.cancel()
+        await asyncio.sleep(0.05)
+
+    run(go())
+    assert state.get("cancelled") and c.orphans == 1
+
+def test_rejoin_within_grace_keeps_computation():
+    c = AsyncCache("t", ttl=0, orphan_grace=0.05)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.03)
+        return "v"
+
+    async def go():
+        t = asyncio.ensure_future(c.get_or_compute("k", work))
+        await asyncio.sleep(0)
+        t.cancel()
+        await asyncio.sleep(0.01)
+        return await c.get_or_compute("k", work)
+
+    assert run(go()) == "v" and len(calls) == 1 and c.orphans == 0
@@ -0,0 +1,37 @@
+# tests/test_panel.py
+import numpy as np
+import pytest
+from analyzers.indicators import add_indicators
+from analyzers.panel import INDICATOR_COLUMNS, build_panel, latest, panel_indicators, valid_mask
+from bench.synthetic import make_ohlcv, normalized, shape_for, stable_seed, universe
+
+def _frames(interval: str, n: int = 40) -> dict:
+    # farklı uzunluklar (kısa geçmişler panelde NaN ile dolar) + formasyonlu satırlar
+    out = {}
+    for i, t in enumerate(universe(n)):
+        bars = 60 + (i * 37) % 540
+        out[t] = normalized(make_ohlcv(bars, interval, stable_seed(0, t, interval), shape_for(t, 2)))
+    return out
+
+@pytest.mark.parametrize("interval", ["60m", "1d"])
+def test_panel_indicators_match_add_indicators(interval):
+    frames = _frames(interval)
+    p = build_panel(frames)
+    ind = panel_indicators(p)
+    mask = valid_mask(p, ind)
+    last, vals = latest(p, ind, mask)
+    for i, t in enumerate(p.symbols):
+        ref = add_indicators(frames[t])
+        n = int(p.lengths[i])
+        keep = mask[i, :n]
+        # dropna ile aynı barlar
+        assert frames[t].index[keep].equals(ref.index), t
+        assert not mask[i, n:].any()
+        for c in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(ind[c][i, :n][keep], ref[c].to_numpy(), rtol=1e-9, atol=1e-9, err_msg=f"{t} {c}")
+        if len(ref):
+            assert frames[t].index[last[i]] == ref.index[-1]
+            for c in INDICATOR_COLUMNS:
+                assert vals[c][i] == pytest.approx(ref[c].iloc[-1], rel=1e-9, abs=1e-9)
+        else:
+            assert last[i] < 0
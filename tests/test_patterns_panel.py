@@ -0,0 +1,35 @@
+# tests/test_patterns_panel.py
+import pytest
+from analyzers.indicators import add_indicators
+from analyzers.panel import build_panel, panel_indicators, valid_mask
+from analyzers.patterns import detect_all_patterns
+from analyzers.patterns_panel import detect_panel
+from bench.synthetic import make_ohlcv, normalized, shape_for, stable_seed, universe
+
+def _frames(interval: str, n: int = 60) -> dict:
+    out = {}
+    for i, t in enumerate(universe(n)):
+        bars = 60 + (i * 53) % 540
+        out[t] = normalized(make_ohlcv(bars, interval, stable_seed(1, t, interval), shape_for(t, 2)))
+    return out
+
+def _same(got, want):
+    # karar alanları birebir; fiyatlar/doğru katsayıları toplama sırası kadar (ulp) farklı olabilir
+    assert [(g.name, g.direction, g.confidence) for g in got] == [(w.name, w.direction, w.confidence) for w in want]
+    for g, w in zip(got, want):
+        assert g.meta.keys() == w.meta.keys()
+        assert [g.breakout_price, g.stop, *g.targets] == pytest.approx([w.breakout_price, w.stop, *w.targets], rel=1e-12)
+        for k, v in w.meta.items():
+            assert g.meta[k] == pytest.approx(v, rel=1e-12, abs=1e-9), k
+
+@pytest.mark.parametrize("interval", ["60m", "1d"])
+def test_detect_panel_matches_scalar(interval):
+    frames = _frames(interval)
+    p = build_panel(frames)
+    pats = detect_panel(p, valid_mask(p, panel_indicators(p)))
+    found = 0
+    for t, got in zip(p.symbols, pats):
+        want = detect_all_patterns(add_indicators(frames[t]))
+        _same(got, want)
+        found += len(want)
+    assert found   # sentetik formasyonlar gerçekten bulunuyor
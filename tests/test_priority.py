@@ -0,0 +1,82 @@
+# tests/test_priority.py
+import asyncio
+from priority import BULK, INTERACTIVE, JobBoard, current, current_job
+
+def run(coro):
+    return asyncio.run(coro)
+
+def board(interactive: int = 3, bulk: int = 1) -> JobBoard:
+    b = JobBoard()
+    b.caps = {INTERACTIVE: interactive, BULK: bulk}
+    return b
+
+def work(log: list, name: str, seconds: float = 10.0):
+    """İptalde nedeni (current_job().reason) kaydeden iş; kısmi sonuç yazan komutlar gibi."""
+    async def fn():
+        try:
+            await asyncio.sleep(seconds)
+            log.append((name, "done", current()))
+        except asyncio.CancelledError:
+            log.append((name, current_job().reason, current()))
+            raise
+    return fn
+
+def test_same_command_supersedes_older_job():
+    async def go():
+        b, log = board(), []
+        old = b.start(1, "tara", BULK, work(log, "old"))
+        other = b.start(1, "backtest", INTERACTIVE, work(log, "other", 0.01))
+        await asyncio.sleep(0)
+        new = b.start(1, "tara", BULK, work(log, "new", 0.01))
+        assert new is not None and old.reason == "superseded"
+        await asyncio.gather(old.task, other.task, new.task)
+        assert sorted(log) == [("new", "done", BULK), ("old", "superseded", BULK), ("other", "done", INTERACTIVE)]
+        assert not b.active() and not b._jobs   # biten işler kayıttan düşer
+    run(go())
+
+def test_per_chat_class_caps():
+    async def go():
+        b, log = board(interactive=2, bulk=1), []
+        assert b.start(1, "tara", BULK, work(log, "a")) is not None
+        assert b.start(1, "hepsi", BULK, work(log, "b")) is None           # sohbet 1'in toplu sınırı dolu
+        assert b.start(2, "hepsi", BULK, work(log, "c")) is not None       # sınır sohbet başına
+        i1 = b.start(1, "analiz", INTERACTIVE, work(log, "i1", 0.01))
+        assert i1 is not None and b.start(1, "score", INTERACTIVE, work(log, "i2")) is not None
+        assert b.start(1, "grafik", INTERACTIVE, work(log, "i3")) is None  # etkileşimli sınır ayrı: 2
+        assert b.stats() == {"interactive": 2, "bulk": 2}
+        await i1.task
+        assert b.start(1, "grafik", INTERACTIVE, work(log, "i3")) is not None   # biten yer boşalır
+        await b.cancel_all()
+        assert not b.active()
+    run(go())
+
+def test_deadline_cancels_with_reason():
+    async def go():
+        b, log = board(), []
+        job = b.start(1, "tara", BULK, work(log, "slow"), deadline=0.02)
+        fast = b.start(1, "analiz", INTERACTIVE, work(log, "fast", 0.005), deadline=1.0)
+        await asyncio.gather(job.task, fast.task)
+        assert job.reason == "deadline" and fast.reason is None
+        assert sorted(log) == [("fast", "done", INTERACTIVE), ("slow", "deadline", BULK)]
+    run(go())
+
+def test_run_waits_and_reports_rejection():
+    async def go():
+        b, log = board(bulk=1), []
+        b.start(1, "tara", BULK, work(log, "held"))
+        assert await b.run(1, "hepsi", BULK, work(log, "rejected")) is False
+        assert await b.run(1, "analiz", INTERACTIVE, work(log, "ok", 0.0)) is True
+        assert log == [("ok", "done", INTERACTIVE)]
+        await b.cancel_all()
+    run(go())
+
+def test_drain_waits_then_cancels_and_closes():
+    async def go():
+        b, log = board(), []
+        b.start(1, "analiz", INTERACTIVE, work(log, "quick", 0.01))
+        b.start(2, "tara", BULK, work(log, "long"))
+        left = await b.drain(0.1)
+        assert left == 1 and b.closed and not b.active()
+        assert sorted(log) == [("long", "shutdown", BULK), ("quick", "done", INTERACTIVE)]
+        assert b.start(3, "analiz", INTERACTIVE, work(log, "late")) is None   # kapanışta yeni iş yok
+    run(go())
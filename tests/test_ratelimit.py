@@ -0,0 +1,105 @@
+# tests/test_ratelimit.py
+import asyncio
+import pytest
+from priority import BULK, INTERACTIVE
+from ratelimit import AimdLimiter, RateLimiter, TokenBucket
+
+def test_bucket_serves_interactive_before_queued_bulk():
+    async def go():
+        b = TokenBucket(rate=100, burst=1)
+        await b.acquire(BULK)            # kova boşaldı
+        order = []
+
+        async def one(name, cls):
+            await b.acquire(cls)
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(one(f"bulk{i}", BULK)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(one("interactive", INTERACTIVE)))
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(go())
+    assert order[0] == "interactive" and order[1:] == ["bulk0", "bulk1", "bulk2"]
+
+def test_bucket_rate_and_burst():
+    async def go():
+        b = TokenBucket(rate=50, burst=3)
+        waits = [await b.acquire(BULK) for _ in range(6)]
+        return waits
+
+    waits = asyncio.run(go())
+    assert waits[:3] == [0.0, 0.0, 0.0]   # birikmiş jetonlar beklemeden
+    assert 0.8 * 3 / 50 <= sum(waits[3:]) < 1.0   # sonrakiler rate ile (alt sınır kesin)
+
+def test_aimd_additive_increase_and_multiplicative_decrease():
+    lim = AimdLimiter(initial=4, min_limit=1, max_limit=6, decrease=0.5, cooldown=0.0)
+
+    async def go():
+        for _ in range(4):
+            await lim.acquire(BULK)
+            lim.release("ok")
+
+    asyncio.run(go())
+    grown = lim.limit
+    assert grown == pytest.approx(5.0, abs=0.1)   # pencere (limit kadar başarılı yanıt) başına ~+1
+    lim.inflight = 1
+    lim.release("error")
+    assert lim.limit == grown * 0.5
+    lim.inflight = 1
+    lim.release("cancelled")
+    assert lim.limit == grown * 0.5
+    for _ in range(3):
+        lim.inflight = 1
+        lim.release("empty")
+    assert lim.limit == 1.0   # taban
+    lim.limit = 5.9
+    lim.inflight = 1
+    lim.release("ok")
+    assert lim.limit == 6.0   # tavan
+
+def test_aimd_cuts_once_per_cooldown():
+    lim = AimdLimiter(initial=8, max_limit=8, cooldown=60.0)
+    for _ in range(3):
+        lim.inflight = 1
+        lim.release("error")
+    assert lim.limit == 4.0
+
+def test_aimd_hands_slots_to_interactive_first():
+    async def go():
+        lim = AimdLimiter(initial=1, max_limit=1)
+        await lim.acquire(BULK)
+        order = []
+
+        async def one(name, cls):
+            await lim.acquire(cls)
+            order.append(name)
+            lim.release("cancelled")
+
+        tasks = [asyncio.ensure_future(one("bulk", BULK))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(one("interactive", INTERACTIVE)))
+        await asyncio.sleep(0)
+        assert lim.queued == 2
+        lim.release("cancelled")
+        await asyncio.gather(*tasks)
+        return order, lim.inflight
+
+    assert asyncio.run(go()) == (["interactive", "bulk"], 0)
+
+def test_limiter_retries_then_returns_last_result(monkeypatch):
+    rl = RateLimiter(rate=1000, burst=1000)
+    monkeypatch.setattr(rl, "delay", lambda attempt: 0.0)
+    calls = []
+
+    def flaky(x):
+        calls.append(x)
+        if len(calls) < 3:
+            raise RuntimeError("429")
+        return {"ok": x}
+
+    assert asyncio.run(rl.call(flaky, 1, attempts=3)) == {"ok": 1}
+    assert (rl.errors, rl.retries, rl.ok) == (2, 2, 1)
+    assert asyncio.run(rl.call(lambda: {}, attempts=2)) == {} and rl.empty == 2
+    assert rl.aimd.inflight == 0
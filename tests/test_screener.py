@@ -0,0 +1,58 @@
+# tests/test_screener.py
+import numpy as np
+import pytest
+from analyzers.scoring import SCREEN_DTYPE
+from analyzers.signal import PATTERN_CODES
+from screener import compile_query, screen, split_sort
+
+def snap(**cols) -> np.ndarray:
+    n = len(next(iter(cols.values())))
+    a = np.zeros(n, dtype=SCREEN_DTYPE)
+    a["ticker"] = [f"S{i}.IS" for i in range(n)]
+    a["pattern"] = -1
+    for k, v in cols.items():
+        a[k] = v
+    return a
+
+def match(query: str, a: np.ndarray) -> list[str]:
+    return a["ticker"][compile_query(query).mask(a)].tolist()
+
+@pytest.mark.parametrize("query", ["rsi.real > 1", "close.__class__ > 1", "abs(rsi) > 50",
+                                   "__import__('os')", "rsi[0] > 1", "rsi > vol_ma20[-1]",
+                                   "(lambda: rsi)() > 1", "rsi > 1 if adx else cmf"])
+def test_rejects_attributes_calls_and_subscripts(query):
+    with pytest.raises(ValueError):
+        compile_query(query)
+
+@pytest.mark.parametrize("query", ["", "rsi >", "foo > 1", "rsi > 'a'", "pattern > triangle",
+                                   "pattern == kare", "rsi > 1" + " and rsi > 1" * 60])
+def test_rejects_invalid_queries(query):
+    with pytest.raises(ValueError):
+        compile_query(query)
+
+def test_chained_comparison_is_conjunction():
+    a = snap(adx=[10, 20, 40, 60, 70], rsi=[50, 50, 50, 50, 50])
+    assert match("20 <= adx <= 60", a) == ["S1.IS", "S2.IS", "S3.IS"]
+    assert match("20 < adx < 60", a) == ["S2.IS"]
+    assert match("10 < adx <= rsi < 55", a) == ["S1.IS", "S2.IS"]
+    # Türkçe bağlaçlar ve ≤: aynı derlenmiş sorgu
+    assert compile_query("20 ≤ adx ≤ 60 ve rsi > 0") is compile_query("20 <= adx <= 60 and rsi > 0")
+
+def test_pattern_text_maps_to_codes():
+    a = snap(pattern=[-1, 0, 1, 2, 3, 4])
+    tri = ("Ascending/Symmetric Triangle Breakout", "Descending/Symmetric Triangle Breakdown")
+    assert {PATTERN_CODES[n] for n in tri} == {2, 3}
+    assert match("pattern == triangle", a) == ["S3.IS", "S4.IS"]
+    assert match('formasyon = "Triangle"', a) == ["S3.IS", "S4.IS"]      # takma ad, tek =, büyük harf
+    assert match("pattern != triangle", a) == ["S0.IS", "S1.IS", "S2.IS", "S5.IS"]
+    assert match("pattern == pennant", a) == ["S1.IS", "S2.IS"]
+    assert match("pattern == yok", a) == ["S0.IS"]
+    assert match("öneri == al and pattern == double", snap(pattern=[4, 4], bias=[1, -1])) == ["S0.IS"]
+
+def test_arithmetic_and_sort():
+    a = snap(volume=[100, 200, 300], vol_ma20=[100, 100, 100], score=[70, 90, np.nan])
+    assert match("volume > 1.5*vol_ma20", a) == ["S1.IS", "S2.IS"]
+    q, field, desc = split_sort("rsi > 0 sırala skor")
+    assert (q, field, desc) == ("rsi > 0", "score", True)
+    got = screen(a, compile_query("volume > 0"), field, desc)["ticker"].tolist()
+    assert got == ["S1.IS", "S0.IS", "S2.IS"]                          # NaN sonda
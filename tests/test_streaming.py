@@ -0,0 +1,66 @@
+# tests/test_streaming.py
+import json
+import pytest
+from analyzers.indicators import add_indicators
+from analyzers.panel import INDICATOR_COLUMNS
+from analyzers.streaming import IndicatorState, IndicatorStateStore
+from bench.synthetic import make_ohlcv, normalized
+
+def _frame(interval="60m", shape="pennant", n=300, seed=7):
+    return normalized(make_ohlcv(n, interval, seed, shape))
+
+def _close(snap, row):
+    for c in INDICATOR_COLUMNS:
+        assert snap[c] == pytest.approx(row[c], rel=1e-9, abs=1e-9), c
+
+@pytest.mark.parametrize("interval,shape", [("60m", "pennant"), ("15m", "triangle"), ("1d", None)])
+def test_bar_by_bar_matches_add_indicators(interval, shape):
+    df = _frame(interval, shape)
+    st = IndicatorState.from_frame(df.iloc[:150])
+    for i in range(150, len(df)):
+        snap = st.update({**df.iloc[i].to_dict(), "ts": df.index[i]})
+        full = add_indicators(df.iloc[:i + 1])
+        assert snap["valid"] == (len(full) and full.index[-1] == df.index[i])
+        _close(snap, full.iloc[-1])
+
+def test_revised_last_bar_replaces_it():
+    df = _frame("1d", "double_bottom")
+    st = IndicatorState.from_frame(df)
+    rev = df.copy()
+    last = rev.index[-1]
+    rev.loc[last, "close"] *= 1.04
+    rev.loc[last, "high"] = max(rev.loc[last, "high"], rev.loc[last, "close"])
+    rev.loc[last, "volume"] *= 2
+    snap = st.extend(rev)
+    assert st.n == len(df)
+    assert snap["close"] == rev.loc[last, "close"]
+    _close(snap, add_indicators(rev).iloc[-1])
+    # geri alınan düzeltme de aynı şekilde işlenir; eski bar yok sayılır
+    _close(st.extend(df), add_indicators(df).iloc[-1])
+    assert st.update({**rev.iloc[-2].to_dict(), "ts": rev.index[-2]})["close"] == df["close"].iloc[-1]
+
+def test_store_round_trip_and_gap(tmp_path):
+    df = _frame("60m", None)
+    store = IndicatorStateStore(tmp_path / "state.json")
+    store.sync("AAA.IS", "60m", df.iloc[:-1])
+    store.save()
+    json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+
+    again = IndicatorStateStore(tmp_path / "state.json")
+    rev = df.copy()
+    rev.iloc[-2, rev.columns.get_loc("close")] *= 0.98
+    _close(again.sync("AAA.IS", "60m", rev), add_indicators(rev).iloc[-1])
+    # durumun son barı çerçevede yoksa (arada bar kaçtı) baştan kurulur
+    gap = df.drop(index=df.index[-2])
+    _close(IndicatorStateStore(tmp_path / "state.json").sync("AAA.IS", "60m", gap), add_indicators(gap).iloc[-1])
+
+def test_store_sync_daily_revision(tmp_path):
+    # günlük index tz'sizdir; son bar ikili aramayla bulunur, düzeltme yeniden hesaplanır
+    df = _frame("1d", "triangle")
+    store = IndicatorStateStore(tmp_path / "state.json")
+    store.sync("AAA.IS", "1d", df)
+    rev = df.copy()
+    rev.iloc[-1, rev.columns.get_loc("close")] *= 1.02
+    snap = store.sync("AAA.IS", "1d", rev)
+    assert store.get("AAA.IS", "1d").n == len(df)
+    _close(snap, add_indicators(rev).iloc[-1])
@@ -0,0 +1,23 @@
+# tests/test_symbols.py
+import pytest
+import symbols
+
+@pytest.fixture
+def fresh(monkeypatch, tmp_path):
+    monkeypatch.setattr(symbols, "_cache", {})
+    monkeypatch.setenv("UNIVERSE_DIR", str(tmp_path))
+    (tmp_path / "symbols_bist30.txt").write_text("THYAO\nASELS.IS\n", encoding="utf-8")
+    (tmp_path / "symbols_bist100.txt").write_text("# yorum\nthyao\nGARAN\n", encoding="utf-8")
+    (tmp_path / "symbols_bist250.txt").write_text("GARAN\nSISE\n", encoding="utf-8")
+    return tmp_path
+
+def test_birlesik_is_the_union(fresh):
+    assert symbols.universe("birlesik") == ["THYAO.IS", "ASELS.IS", "GARAN.IS", "SISE.IS"]
+    assert symbols.universe_name("xu100") == "bist100"
+
+def test_tum_needs_its_own_list(fresh):
+    # tam piyasa listesi yoksa birleşime sessizce düşülmez
+    with pytest.raises(ValueError, match="symbols_tum.txt"):
+        symbols.universe("hepsi")
+    (fresh / "symbols_tum.txt").write_text("THYAO\nA1CAP\n", encoding="utf-8")
+    assert symbols.universe("tum") == ["THYAO.IS", "A1CAP.IS"]
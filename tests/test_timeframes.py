@@ -0,0 +1,68 @@
+# tests/test_timeframes.py
+import pandas as pd
+import pytest
+from bench.synthetic import DEFAULT_END, make_ohlcv, normalized
+from timeframes import MINUTES, NATIVE_LIMIT_DAYS, SESSION_CLOSE, SESSION_OPEN, period_days, plan_fetches, resample_ohlcv
+
+def _served(plans):
+    return [(t[0], t[2]) for p in plans for t in p.targets]
+
+def test_presets_share_one_intraday_fetch():
+    specs = [("15m", "14d"), ("30m", "30d"), ("60m", "60d"), ("90m", "90d"), ("1d", "180d"), ("1d", "365d")]
+    plans = plan_fetches(specs)
+    assert sorted(_served(plans)) == sorted(specs)   # her hedef tam bir kez
+    by_base = {p.base: p for p in plans}
+    assert set(by_base) == {"15m", "1d"}
+    assert by_base["15m"].period == "60d" and by_base["1d"].period == "365d"
+    # 90m/90d hiçbir intraday tabanın sınırına sığmaz → erişilebilir en geniş period'a kısılır
+    assert ("90m", "60d", "90d") in by_base["15m"].targets
+
+@pytest.mark.parametrize("specs", [
+    [("120m", "120d"), ("60m", "60d")],
+    [("60m", "730d"), ("30m", "30d")],
+    [("90m", "30d"), ("30m", "14d"), ("1d", "max")],
+])
+def test_bases_divide_targets_and_respect_limits(specs):
+    plans = plan_fetches(specs)
+    assert sorted(_served(plans)) == sorted(dict.fromkeys(specs))
+    for p in plans:
+        lim = NATIVE_LIMIT_DAYS[p.base]
+        assert lim is None or period_days(p.period) <= lim
+        for itv, per, _ in p.targets:
+            assert MINUTES[itv] % MINUTES[p.base] == 0
+            assert period_days(per) <= period_days(p.period)
+    # 60m/730d yalnızca 60m tabanından gelebilir (30m 60 günle sınırlı)
+    if ("60m", "730d") in specs:
+        assert [p.base for p in plans if ("60m", "730d", "730d") in p.targets] == ["60m"]
+
+def test_unknown_interval_is_rejected():
+    with pytest.raises(ValueError):
+        plan_fetches([("7m", "5d")])
+
+@pytest.mark.parametrize("base,interval", [("30m", "90m"), ("15m", "60m"), ("60m", "120m")])
+def test_resample_aligns_to_session_open(base, interval):
+    df = normalized(make_ohlcv(160, base, 3, None))
+    out = resample_ohlcv(df, interval, now=DEFAULT_END)
+    n = pd.Timedelta(minutes=MINUTES[interval])
+    since_open = out.index - (out.index.normalize() + SESSION_OPEN)
+    assert (since_open % n == pd.Timedelta(0)).all() and (since_open >= pd.Timedelta(0)).all()
+    assert (since_open < SESSION_CLOSE - SESSION_OPEN).all()
+    # her kova kendi taban barlarının OHLCV toplamı
+    for ts, row in out.iloc[[0, len(out) // 2, -1]].iterrows():
+        part = df[(df.index >= ts) & (df.index < ts + n)]
+        assert row["open"] == part["open"].iloc[0] and row["close"] == part["close"].iloc[-1]
+        assert row["high"] == part["high"].max() and row["low"] == part["low"].min()
+        assert row["volume"] == pytest.approx(part["volume"].sum())
+
+def test_resample_drops_unclosed_last_bucket():
+    df = normalized(make_ohlcv(160, "30m", 3, None))
+    # son gün 10:00-11:30 kovası 11:30'da kapanır
+    day = df.index[-1].normalize()
+    upto = df[df.index < day + pd.Timedelta(hours=11)]   # 10:00 ve 10:30 barları
+    assert resample_ohlcv(upto, "90m", now=day + pd.Timedelta(hours=11, minutes=29)).index[-1] < day
+    closed = resample_ohlcv(df[df.index < day + pd.Timedelta(hours=11, minutes=30)], "90m",
+                            now=day + pd.Timedelta(hours=11, minutes=30))
+    assert closed.index[-1] == day + SESSION_OPEN
+    # seans sonundaki kısa kova (17:30-18:00) 18:00'de kapanmış sayılır
+    last = resample_ohlcv(df, "90m", now=df.index[-1].normalize() + SESSION_CLOSE)
+    assert last.index[-1] == df.index[-1].normalize() + pd.Timedelta(hours=17, minutes=30)
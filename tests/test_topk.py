@@ -0,0 +1,67 @@
+# tests/test_topk.py
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+import data
+import scanner
+from analyzers.signal import empty_records, rank
+from bench.fakeprovider import FakeProvider
+from bench.synthetic import universe
+from scanner import MAX_SCORE, TopK
+
+def _rows(scores):
+    a = empty_records(len(scores))
+    a["ticker"] = [f"T{i:03d}" for i in range(len(scores))]
+    a["score"] = scores
+    return a
+
+def test_topk_matches_full_rank_with_ties():
+    rng = np.random.default_rng(0)
+    rows = _rows(rng.integers(0, 20, 200).astype("f8"))   # çok sayıda eşit skor
+    top = TopK(10)
+    for r in rows[rng.permutation(len(rows))]:
+        top.push(r)
+    assert top.items()["ticker"].tolist() == rank(rows)[:10]["ticker"].tolist()
+    fs, ft = top.floor()
+    assert not top.can_enter(fs, ft) and top.can_enter(fs, ft + "Z")
+
+def test_topk_ignores_duplicates_and_reports_floor_only_when_full():
+    top = TopK(3)
+    rows = _rows([5.0, 7.0, 9.0])
+    assert top.floor() is None and top.can_enter(-1.0, "x")
+    for r in rows:
+        assert top.push(r)
+    assert not top.push(rows[2]) and len(top) == 3
+    assert top.floor() == (5.0, "T000")
+
+@pytest.fixture
+def fixed_bar(monkeypatch):
+    bar = {"ts": pd.Timestamp("2025-06-02 17:00", tz="Europe/Istanbul")}
+    monkeypatch.setattr(scanner, "_closed_bar", lambda interval: bar["ts"])
+    monkeypatch.setattr(scanner, "_LAST_SCORES", {})
+    return bar
+
+def test_score_bounds_only_trust_the_same_bar(fixed_bar):
+    scanner._remember(("60m", "60d"), _rows([40.0, 99.5]))
+    assert scanner.score_bounds("60m", "60d", 1.0) == {"T000": 41.0, "T001": MAX_SCORE}
+    fixed_bar["ts"] += pd.Timedelta(hours=1)   # yeni bar kapandı → eski skorlar sınır değil
+    assert scanner.score_bounds("60m", "60d", 1.0) == {}
+    fixed_bar["ts"] = None                     # canlı günlük bar
+    assert scanner.score_bounds("60m", "60d", 1.0) == {}
+
+def test_early_stop_keeps_the_full_scan_top10(fixed_bar, monkeypatch):
+    monkeypatch.setattr(data, "_provider", FakeProvider(bars=300))
+    tickers = universe(60)
+
+    async def stream(slack):
+        out = None
+        async for pr in scanner.scan_stream(tickers, "60m", "60d", k=10, chunk=10, slack=slack):
+            out = pr
+        return out
+
+    full = asyncio.run(stream(None))
+    assert full.done == full.total and not full.stopped
+    early = asyncio.run(stream(0.0))
+    assert early.stopped and early.done < early.total
+    assert early.top.items()["ticker"].tolist() == full.top.items()["ticker"].tolist()
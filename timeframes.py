@@ -0,0 +1,113 @@
+# timeframes.py
+import re
+from dataclasses import dataclass, field
+import pandas as pd
+
+# Desteklenen zaman dilimleri (dakika)
+MINUTES = {"15m": 15, "30m": 30, "60m": 60, "90m": 90, "120m": 120, "1d": 1440}
+# Yahoo'dan doğrudan çekilen taban dilimler ve geriye dönük sınırları (gün; None → sınırsız).
+# 90m Yahoo'da seansa hizalı gelmediği için taban olarak kullanılmaz, 30m'den üretilir.
+NATIVE_LIMIT_DAYS = {"15m": 60, "30m": 60, "60m": 730, "1d": None}
+
+# Borsa İstanbul pay piyasası sürekli işlem seansı (Europe/Istanbul)
+SESSION_OPEN = pd.Timedelta(hours=10)
+SESSION_CLOSE = pd.Timedelta(hours=18)
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+def period_start(period: str, now: pd.Timestamp) -> pd.Timestamp | None:
+    """Yahoo 'period' metnini başlangıç zamanına çevirir ('max' → None)."""
+    p = (period or "").strip().lower()
+    if p == "max":
+        return None
+    if p == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    m = _PERIOD_RE.match(p)
+    if not m:
+        raise ValueError(f"Geçersiz period: {period}")
+    n, unit = int(m.group(1)), m.group(2)
+    off = {"d": pd.DateOffset(days=n), "wk": pd.DateOffset(weeks=n),
+           "mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n)}[unit]
+    return now - off
+
+def period_days(period: str) -> float:
+    now = pd.Timestamp.now().normalize()
+    start = period_start(period, now)
+    return float("inf") if start is None else float((now - start).days)
+
+@dataclass
+class FetchPlan:
+    base: str                 # Yahoo'dan çekilecek dilim
+    period: str               # hedeflerin en genişi
+    targets: list[tuple[str, str, str]] = field(default_factory=list)  # (interval, period, istenen period)
+
+def _bases_for(interval: str) -> list[str]:
+    n = MINUTES[interval]
+    if interval == "1d":
+        return ["1d"]
+    return [b for b in NATIVE_LIMIT_DAYS if b != "1d" and n % MINUTES[b] == 0]
+
+def _clamp(interval: str, period: str) -> str:
+    # Hiçbir tabanın erişemeyeceği period'u erişilebilir en geniş değere indir (ör. 90m/90d → 60d)
+    limits = [NATIVE_LIMIT_DAYS[b] for b in _bases_for(interval)]
+    if any(lim is None for lim in limits):
+        return period
+    best = max(limits)
+    return period if period_days(period) <= best else f"{best}d"
+
+def plan_fetches(specs: list[tuple[str, str]]) -> list[FetchPlan]:
+    """
+    (interval, period) listesini en az indirmeyle karşılayacak taban çekimlere böler.
+    Her çekim tüm hedeflerini bölen en kaba tabanı, hedeflerin en geniş period'uyla çeker;
+    daha kaba dilimler yeniden örneklenir, kısa period'lar dilimlenerek verilir.
+    """
+    remaining = []
+    for itv, per in dict.fromkeys(specs):
+        if itv not in MINUTES:
+            raise ValueError(f"Desteklenmeyen interval: {itv}")
+        remaining.append((itv, _clamp(itv, per), per))
+
+    def serves(base, tgt):
+        lim = NATIVE_LIMIT_DAYS[base]
+        return base in _bases_for(tgt[0]) and (lim is None or period_days(tgt[1]) <= lim)
+
+    plans: list[FetchPlan] = []
+    while remaining:
+        cands = {b for t in remaining for b in _bases_for(t[0]) if serves(b, t)}
+        # en çok hedefe hizmet eden taban; eşitlikte daha kaba olan (daha az bar)
+        base = max(cands, key=lambda b: (sum(serves(b, t) for t in remaining), MINUTES[b]))
+        mine = [t for t in remaining if serves(base, t)]
+        remaining = [t for t in remaining if not serves(base, t)]
+        widest = max(mine, key=lambda t: period_days(t[1]))[1]
+        plans.append(FetchPlan(base, widest, mine))
+    return plans
+
+def resample_ohlcv(df: pd.DataFrame, interval: str, now: pd.Timestamp | None = None) -> pd.DataFrame:
+    """
+    Taban intraday barlarından daha kaba barlar üretir. Kovalar her gün seans açılışına
+    (10:00) hizalanır; son kova henüz kapanmadıysa atılır (kapanmamış bar kuralı).
+    """
+    n = pd.Timedelta(minutes=MINUTES[interval])
+    idx = df.index
+    day = idx.normalize()
+    opened = day + SESSION_OPEN
+    labels = opened + ((idx - opened) // n) * n
+
+    g = df.groupby(labels, sort=True)
+    out = pd.DataFrame({
+        "open": g["open"].first(), "high": g["high"].max(),
+        "low": g["low"].min(), "close": g["close"].last(),
+    })
+    if "adj_close" in df.columns:
+        out["adj_close"] = g["adj_close"].last()
+    out["volume"] = g["volume"].sum()
+    out.index = pd.DatetimeIndex(out.index, name=idx.name)
+
+    if len(out):
+        last = out.index[-1]
+        end = min(last + n, last.normalize() + SESSION_CLOSE)
+        if now is None:
+            now = pd.Timestamp.now(tz=idx.tz)
+        if end > now:
+            out = out.iloc[:-1]
+    return out
@@ -0,0 +1,47 @@
+# warmup.py
+"""
+Açılış ısınması: bot polling'e hemen başlar; ağır modüller (pandas, ta, matplotlib …),
+hesap işçileri ve ilk grafik arka planda hazırlanır. Isınma bitmeden gelen komutlar
+ihtiyaç duydukları modülü kendileri yükler (import kilidi çifte yüklemeyi önler).
+"""
+import asyncio
+import importlib
+import logging
+import time
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# komutların ilk çağrıda yükleyeceği modüller (yükleme sırası bağımlılık sırasıdır)
+HEAVY_MODULES = ("pandas", "analyzers.signal", "analyzers.targets", "data", "compute", "shards", "scanner",
+                 "fusion", "screener", "scheduler", "alerts", "backtest", "analyzers.plotting")
+
+def preload() -> None:
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+
+async def warm_up() -> dict[str, float]:
+    """Modülleri thread havuzunda yükler, süreç havuzunu başlatır, bir grafik çizer. Dönüş: adım → sn."""
+    loop = asyncio.get_running_loop()
+    timings: dict[str, float] = {}
+
+    async def step(name: str, fn):
+        t0 = time.perf_counter()
+        await loop.run_in_executor(None, fn)
+        timings[name] = time.perf_counter() - t0
+        metrics.observe("warmup", timings[name], step=name)
+
+    await step("imports", preload)
+    from compute import get_pool
+    pool = get_pool()
+    if pool is not None:
+        # işçiler forkserver'dan hazır modüllerle çatallanır; ilk grafik her işçide çizilir
+        await step("workers", pool.warm)
+    else:
+        from analyzers.plotting import warm
+        await step("chart", warm)
+    from shards import get_shards
+    # tarama işçileri (SCAN_WORKERS) spawn ile açılır: ilk taramayı bekletmesin
+    await step("shards", get_shards)
+    logger.info("Isınma tamam: " + ", ".join(f"{k} {v:.2f} sn" for k, v in timings.items()))
+    return timings
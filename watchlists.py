@@ -0,0 +1,65 @@
+# watchlists.py
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from utils import normalize_bist
+
+logger = logging.getLogger(__name__)
+
+MAX_SYMBOLS = int(os.getenv("WATCHLIST_MAX", "100"))
+
+class Watchlists:
+    """
+    Sohbet başına izleme listesi (sembol sırası korunur). JSON dosyasında tutulur;
+    her değişiklikte geçici dosyaya yazılıp yerine konur (yarım yazılmış dosya kalmaz).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._lists: dict[str, list[str]] = {}
+        try:
+            self._lists = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"İzleme listeleri okunamadı ({self.path}): {e}")
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._lists, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def get(self, chat_id: int) -> list[str]:
+        return list(self._lists.get(str(chat_id), []))
+
+    def add(self, chat_id: int, symbols: list[str]) -> list[str]:
+        """Dönüş: güncel liste. Sınırı (WATCHLIST_MAX) aşan semboller eklenmez."""
+        with self._lock:
+            cur = self._lists.setdefault(str(chat_id), [])
+            for s in map(normalize_bist, symbols):
+                if s not in cur and len(cur) < MAX_SYMBOLS:
+                    cur.append(s)
+            self._save()
+            return list(cur)
+
+    def remove(self, chat_id: int, symbols: list[str]) -> list[str]:
+        with self._lock:
+            drop = set(map(normalize_bist, symbols))
+            cur = [s for s in self._lists.get(str(chat_id), []) if s not in drop]
+            if cur:
+                self._lists[str(chat_id)] = cur
+            else:
+                self._lists.pop(str(chat_id), None)
+            self._save()
+            return cur
+
+    def clear(self, chat_id: int) -> None:
+        with self._lock:
+            if self._lists.pop(str(chat_id), None) is not None:
+                self._save()
+
+WATCHLISTS = Watchlists(os.getenv("WATCHLIST_PATH", str(Path(__file__).with_name("cache") / "watchlists.json")))